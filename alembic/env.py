@@ -10,7 +10,8 @@ from alembic import context
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Use backend_service settings and metadata
-from backend_service.database import Base, DATABASE_URL
+from backend_service.config import DATABASE_URL_DIRECT
+from backend_service.database import Base
 
 config = context.config
 
@@ -18,8 +19,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# Set SQLAlchemy URL from backend_service.database
-config.set_main_option('sqlalchemy.url', DATABASE_URL)
+# Straight to Postgres, never through PgBouncer: DDL and the migration lock
+# need one session throughout.
+config.set_main_option('sqlalchemy.url', DATABASE_URL_DIRECT)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,178 @@
+"""partition weather_data and market_prices by month
+
+Revision ID: 0003_partition_timeseries
+Revises: 0002_add_farmlands
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0003_partition_timeseries'
+down_revision = '0002_add_farmlands'
+branch_labels = None
+depends_on = None
+
+# Self-contained on purpose: the partition DDL below is a frozen copy of
+# backend_service/partitions.py at this revision. Later months are created by
+# the worker's daily ensure_partitions run.
+PARTITION_KEYS = {
+    'weather_data': 'recorded_at',
+    'market_prices': 'created_at',
+}
+MONTHS_AHEAD = 2
+
+
+def _month_start(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    total = dt.year * 12 + (dt.month - 1) + months
+    return dt.replace(year=total // 12, month=total % 12 + 1)
+
+
+def _create_partitions(table: str, oldest: datetime, newest: datetime) -> None:
+    op.execute(f'CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT')
+    month, last = _month_start(oldest), _month_start(newest)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE IF NOT EXISTS {table}_y{month.year}m{month.month:02d} PARTITION OF {table} '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+
+def _is_partitioned(conn, table: str) -> bool:
+    return conn.execute(
+        sa.text(
+            'SELECT 1 FROM pg_partitioned_table pt '
+            'JOIN pg_class c ON c.oid = pt.partrelid '
+            'WHERE c.relname = :t AND c.relnamespace = current_schema()::regnamespace'
+        ),
+        {'t': table},
+    ).first() is not None
+
+
+def _weather_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('village_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('city', sa.String(length=128), nullable=True),
+        sa.Column('temperature', sa.Float(), nullable=False),
+        sa.Column('humidity', sa.Float(), nullable=False),
+        sa.Column('pressure', sa.Float(), nullable=True),
+        sa.Column('wind_speed', sa.Float(), nullable=True),
+        sa.Column('rainfall', sa.Float(), nullable=True),
+        sa.Column('uvi', sa.Float(), nullable=True),
+        sa.Column('description', sa.String(length=256), nullable=True),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def _market_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('village_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('commodity', sa.String(length=128), nullable=False),
+        sa.Column('variety', sa.String(length=128), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('modal_price', sa.Float(), nullable=True),
+        sa.Column('arrival_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('market_name', sa.String(length=128), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+_TABLES = {
+    'weather_data': {
+        'columns': _weather_columns,
+        'indexes': [
+            ('ix_weather_data_village_id', ['village_id']),
+            ('ix_weather_data_city', ['city']),
+            ('ix_weather_data_village_recorded', ['village_id', 'recorded_at']),
+        ],
+    },
+    'market_prices': {
+        'columns': _market_columns,
+        'indexes': [
+            ('ix_market_prices_village_id', ['village_id']),
+            ('ix_market_prices_commodity', ['commodity']),
+            ('ix_market_prices_arrival_date', ['arrival_date']),
+            ('ix_market_prices_created_at', ['created_at']),
+            ('ix_market_prices_commodity_arrival', ['commodity', 'arrival_date']),
+            ('ix_market_prices_village_created', ['village_id', 'created_at']),
+        ],
+    },
+}
+
+
+def _partition_table(conn, table: str) -> None:
+    spec = _TABLES[table]
+    key = PARTITION_KEYS[table]
+    legacy = f'{table}_unpartitioned'
+
+    # Move the old heap aside. Its PK index name would clash with the new one.
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+
+    op.create_table(
+        table,
+        *spec['columns'](),
+        sa.PrimaryKeyConstraint('id', key, name=f'{table}_pkey'),
+        postgresql_partition_by=f'RANGE ({key})',
+    )
+
+    oldest = conn.execute(sa.text(f'SELECT min({key}) FROM {legacy}')).scalar()
+    now = datetime.now(timezone.utc)
+    _create_partitions(table, oldest or now, _add_months(now, MONTHS_AHEAD))
+
+    cols = ', '.join(c.name for c in spec['columns']())
+    op.execute(f'INSERT INTO {table} ({cols}) SELECT {cols} FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+
+    for name, columns in spec['indexes']:
+        op.create_index(name, table, columns)
+
+
+def _unpartition_table(conn, table: str) -> None:
+    spec = _TABLES[table]
+    staging = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {staging}')
+    op.execute(f'ALTER TABLE {staging} RENAME CONSTRAINT {table}_pkey TO {staging}_pkey')
+    for name, _ in spec['indexes']:
+        op.execute(f'ALTER INDEX {name} RENAME TO {name}_p')
+
+    op.create_table(table, *spec['columns'](), sa.PrimaryKeyConstraint('id', name=f'{table}_pkey'))
+    cols = ', '.join(c.name for c in spec['columns']())
+    op.execute(f'INSERT INTO {table} ({cols}) SELECT {cols} FROM {staging}')
+    # Dropping the parent drops every partition with it.
+    op.execute(f'DROP TABLE {staging}')
+
+    for name, columns in spec['indexes']:
+        op.create_index(name, table, columns)
+
+
+def upgrade():
+    conn = op.get_bind()
+    for table in _TABLES:
+        # A fresh database bootstrapped via create_all is already partitioned.
+        if _is_partitioned(conn, table):
+            continue
+        _partition_table(conn, table)
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table in _TABLES:
+        if not _is_partitioned(conn, table):
+            continue
+        _unpartition_table(conn, table)
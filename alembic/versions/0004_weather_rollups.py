@@ -0,0 +1,49 @@
+"""add weather_hourly and weather_daily rollup tables
+
+Revision ID: 0004_weather_rollups
+Revises: 0003_partition_timeseries
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0004_weather_rollups'
+down_revision = '0003_partition_timeseries'
+branch_labels = None
+depends_on = None
+
+
+def _rollup_columns():
+    return [
+        sa.Column('village_id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        sa.Column('city', sa.String(length=128), nullable=True),
+        sa.Column('temp_min', sa.Float(), nullable=True),
+        sa.Column('temp_max', sa.Float(), nullable=True),
+        sa.Column('temp_avg', sa.Float(), nullable=True),
+        sa.Column('humidity_min', sa.Float(), nullable=True),
+        sa.Column('humidity_max', sa.Float(), nullable=True),
+        sa.Column('humidity_avg', sa.Float(), nullable=True),
+        sa.Column('rainfall_total', sa.Float(), nullable=True),
+        sa.Column('uvi_avg', sa.Float(), nullable=True),
+        sa.Column('uvi_max', sa.Float(), nullable=True),
+        sa.Column('wind_speed_avg', sa.Float(), nullable=True),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    ]
+
+
+def upgrade():
+    op.create_table('weather_hourly', *_rollup_columns())
+    op.create_index('ix_weather_hourly_bucket_start', 'weather_hourly', ['bucket_start'])
+    op.create_table('weather_daily', *_rollup_columns())
+    op.create_index('ix_weather_daily_bucket_start', 'weather_daily', ['bucket_start'])
+
+
+def downgrade():
+    op.drop_index('ix_weather_daily_bucket_start', table_name='weather_daily')
+    op.drop_table('weather_daily')
+    op.drop_index('ix_weather_hourly_bucket_start', table_name='weather_hourly')
+    op.drop_table('weather_hourly')
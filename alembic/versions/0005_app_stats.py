@@ -0,0 +1,56 @@
+"""add maintained statistics tables
+
+Revision ID: 0005_app_stats
+Revises: 0004_weather_rollups
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005_app_stats'
+down_revision = '0004_weather_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'app_stats',
+        sa.Column('key', sa.String(length=64), primary_key=True),
+        sa.Column('value', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    op.create_table(
+        'city_weather_stats',
+        sa.Column('city', sa.String(length=128), primary_key=True),
+        sa.Column('temperature_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    # Seed the counters from existing data (one-off full scan). The SQL is a
+    # frozen copy of stats_service.recompute_stats at this revision.
+    op.execute("""
+        INSERT INTO app_stats (key, value, updated_at)
+        SELECT key, value, now() FROM (
+            SELECT 'weather_entries' AS key, (SELECT count(*) FROM weather_data)::float AS value
+            UNION ALL SELECT 'market_entries', (SELECT count(*) FROM market_prices)
+            UNION ALL SELECT 'max_modal_price', (SELECT max(modal_price) FROM market_prices)
+            UNION ALL SELECT 'villages', (SELECT count(*) FROM villages)
+            UNION ALL SELECT 'risk_scores', (SELECT count(*) FROM risk_scores)
+            UNION ALL SELECT 'soil_entries', (SELECT count(*) FROM soil_health)
+            UNION ALL SELECT 'advisory_entries', (SELECT count(*) FROM ai_reports WHERE report_type = 'advisory')
+            UNION ALL SELECT 'farmer_count', (SELECT count(*) FROM users WHERE role = 'farmer')
+        ) AS counts
+        WHERE value IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO city_weather_stats (city, temperature_sum, sample_count, updated_at)
+        SELECT city, coalesce(sum(temperature), 0), count(temperature), now() FROM weather_data
+        WHERE city IS NOT NULL GROUP BY city
+    """)
+
+
+def downgrade():
+    op.drop_table('city_weather_stats')
+    op.drop_table('app_stats')
@@ -0,0 +1,44 @@
+"""add trend_aggregates table
+
+Revision ID: 0006_trend_aggregates
+Revises: 0005_app_stats
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0006_trend_aggregates'
+down_revision = '0005_app_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'trend_aggregates',
+        sa.Column('metric', sa.String(length=32), primary_key=True),
+        sa.Column('period', sa.String(length=8), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('value_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    # Backfill from existing market/risk history: a frozen copy of
+    # trend_service.rebuild_trends at this revision.
+    for metric, table, ts_col, value_col in (
+        ('market_modal_price', 'market_prices', 'created_at', 'modal_price'),
+        ('risk_score', 'risk_scores', 'calculated_at', 'score'),
+    ):
+        for period in ('month', 'week'):
+            op.execute(
+                'INSERT INTO trend_aggregates '
+                '(metric, period, bucket_start, value_sum, sample_count, updated_at) '
+                f"SELECT '{metric}', '{period}', date_trunc('{period}', {ts_col}, 'UTC') AS bucket, "
+                f'sum({value_col}), count({value_col}), now() '
+                f'FROM {table} WHERE {value_col} IS NOT NULL GROUP BY bucket'
+            )
+
+
+def downgrade():
+    op.drop_table('trend_aggregates')
@@ -0,0 +1,43 @@
+"""add latest_risk_scores upsert table
+
+Revision ID: 0007_latest_risk_scores
+Revises: 0006_trend_aggregates
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0007_latest_risk_scores'
+down_revision = '0006_trend_aggregates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'latest_risk_scores',
+        sa.Column('village_id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('farmer_id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('risk_level', sa.String(length=32), nullable=False),
+        sa.Column('breakdown', sa.JSON(), nullable=True),
+        sa.Column('calculated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    # Seed from the newest history row per (village, farmer); village-wide
+    # scores (no farmer) use the all-zero UUID scope. Compacting the
+    # duplicate history itself is left to scripts/compact_risk_history.py.
+    op.execute("""
+        INSERT INTO latest_risk_scores (village_id, farmer_id, score, risk_level, breakdown, calculated_at)
+        SELECT DISTINCT ON (village_id, coalesce(farmer_id, '00000000-0000-0000-0000-000000000000'::uuid))
+               village_id, coalesce(farmer_id, '00000000-0000-0000-0000-000000000000'::uuid),
+               score, risk_level, breakdown, calculated_at
+        FROM risk_scores
+        WHERE village_id IS NOT NULL
+        ORDER BY village_id, coalesce(farmer_id, '00000000-0000-0000-0000-000000000000'::uuid), calculated_at DESC
+    """)
+
+
+def downgrade():
+    op.drop_table('latest_risk_scores')
@@ -0,0 +1,24 @@
+"""add ai_reports.input_hash for the content-addressed response cache
+
+Revision ID: 0008_ai_report_input_hash
+Revises: 0007_latest_risk_scores
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008_ai_report_input_hash'
+down_revision = '0007_latest_risk_scores'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ai_reports', sa.Column('input_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_ai_reports_input_hash', 'ai_reports', ['input_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_ai_reports_input_hash', table_name='ai_reports')
+    op.drop_column('ai_reports', 'input_hash')
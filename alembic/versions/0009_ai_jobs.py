@@ -0,0 +1,42 @@
+"""add ai_jobs queue table
+
+Revision ID: 0009_ai_jobs
+Revises: 0008_ai_report_input_hash
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0009_ai_jobs'
+down_revision = '0008_ai_report_input_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ai_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False, server_default='queued'),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('callback_url', sa.String(length=1024), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(length=1024), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_ai_jobs_owner_id', 'ai_jobs', ['owner_id'])
+    op.create_index('ix_ai_jobs_status_run_after', 'ai_jobs', ['status', 'run_after'])
+
+
+def downgrade():
+    op.drop_index('ix_ai_jobs_status_run_after', table_name='ai_jobs')
+    op.drop_index('ix_ai_jobs_owner_id', table_name='ai_jobs')
+    op.drop_table('ai_jobs')
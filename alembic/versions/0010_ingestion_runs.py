@@ -0,0 +1,46 @@
+"""add ingestion_runs cycle telemetry table
+
+Revision ID: 0010_ingestion_runs
+Revises: 0009_ai_jobs
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0010_ingestion_runs'
+down_revision = '0009_ai_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ingestion_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('job', sa.String(length=32), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_s', sa.Float(), nullable=False),
+        sa.Column('interval_s', sa.Float(), nullable=False),
+        sa.Column('overran', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('villages_attempted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('villages_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('villages_failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('villages_written', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_written', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_per_second', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('upstream_calls', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('upstream_retries', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('upstream_p50_ms', sa.Float(), nullable=True),
+        sa.Column('upstream_p95_ms', sa.Float(), nullable=True),
+        sa.Column('upstream_max_ms', sa.Float(), nullable=True),
+        sa.Column('error', sa.String(length=1024), nullable=True),
+    )
+    op.create_index('ix_ingestion_runs_job_started_at', 'ingestion_runs', ['job', 'started_at'])
+
+
+def downgrade():
+    op.drop_index('ix_ingestion_runs_job_started_at', table_name='ingestion_runs')
+    op.drop_table('ingestion_runs')
@@ -0,0 +1,22 @@
+"""add ai_jobs.heartbeat_at for the stale-job reaper
+
+Revision ID: 0011_ai_job_heartbeat
+Revises: 0010_ingestion_runs
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0011_ai_job_heartbeat'
+down_revision = '0010_ingestion_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ai_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ai_jobs', 'heartbeat_at')
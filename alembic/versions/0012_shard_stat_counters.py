@@ -0,0 +1,43 @@
+"""shard app_stats / city_weather_stats counter rows
+
+Revision ID: 0012_shard_stat_counters
+Revises: 0011_ai_job_heartbeat
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0012_shard_stat_counters'
+down_revision = '0011_ai_job_heartbeat'
+branch_labels = None
+depends_on = None
+
+_TABLES = {'app_stats': 'key', 'city_weather_stats': 'city'}
+
+
+def upgrade():
+    for table, key in _TABLES.items():
+        op.add_column(table, sa.Column('shard', sa.SmallInteger(), nullable=False, server_default='0'))
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.create_primary_key(f'{table}_pkey', table, [key, 'shard'])
+
+
+def downgrade():
+    # Fold the shards back into shard 0 before dropping the column.
+    op.execute("""
+        UPDATE app_stats a SET value = s.value FROM (
+            SELECT key, CASE WHEN key = 'max_modal_price' THEN max(value) ELSE sum(value) END AS value
+            FROM app_stats GROUP BY key
+        ) s WHERE a.key = s.key AND a.shard = 0
+    """)
+    op.execute("""
+        UPDATE city_weather_stats c SET temperature_sum = s.t, sample_count = s.n FROM (
+            SELECT city, sum(temperature_sum) AS t, sum(sample_count) AS n FROM city_weather_stats GROUP BY city
+        ) s WHERE c.city = s.city AND c.shard = 0
+    """)
+    for table, key in _TABLES.items():
+        op.execute(f'DELETE FROM {table} WHERE shard <> 0')
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.create_primary_key(f'{table}_pkey', table, [key])
+        op.drop_column(table, 'shard')
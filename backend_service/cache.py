@@ -1,9 +1,13 @@
 import os
 import json
+import time
 from typing import Any, Optional
 import redis
 import redis.asyncio as aioredis
 
+from backend_service.core import tracing
+from backend_service.metrics import observe_redis
+
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
 _redis_sync: Optional[redis.Redis] = None
@@ -38,7 +42,12 @@ async def _get_async() -> aioredis.Redis:
 
 def get_cached_sync(key: str) -> Optional[Any]:
     r = _get_sync()
-    val = r.get(key)
+    start = time.perf_counter()
+    with tracing.span('redis.get', {'db.system': 'redis', 'cache.key': key}):
+        try:
+            val = r.get(key)
+        finally:
+            observe_redis('get', start)
     if val is None:
         return None
     try:
@@ -49,12 +58,22 @@ def get_cached_sync(key: str) -> Optional[Any]:
 
 def set_cached_sync(key: str, value: Any, ttl: int = 3600) -> None:
     r = _get_sync()
-    r.set(key, json.dumps(value), ex=ttl)
+    start = time.perf_counter()
+    with tracing.span('redis.set', {'db.system': 'redis', 'cache.key': key}):
+        try:
+            r.set(key, json.dumps(value), ex=ttl)
+        finally:
+            observe_redis('set', start)
 
 
 async def get_cached(key: str) -> Optional[Any]:
     r = await _get_async()
-    val = await r.get(key)
+    start = time.perf_counter()
+    with tracing.span('redis.get', {'db.system': 'redis', 'cache.key': key}):
+        try:
+            val = await r.get(key)
+        finally:
+            observe_redis('get', start)
     if val is None:
         return None
     try:
@@ -65,4 +84,9 @@ async def get_cached(key: str) -> Optional[Any]:
 
 async def set_cached(key: str, value: Any, ttl: int = 3600) -> None:
     r = await _get_async()
-    await r.set(key, json.dumps(value), ex=ttl)
+    start = time.perf_counter()
+    with tracing.span('redis.set', {'db.system': 'redis', 'cache.key': key}):
+        try:
+            await r.set(key, json.dumps(value), ex=ttl)
+        finally:
+            observe_redis('set', start)
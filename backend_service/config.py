@@ -34,3 +34,157 @@ DATABASE_URL_ASYNC = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{D
 DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
 DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
 
+# Connection budget (backend_service/pool_sizing.py): when > 0, replaces the
+# two settings above with an equal share per server process of this many
+# connections (WEB_CONCURRENCY processes), DB_ASYNC_POOL_SHARE of it for the
+# asyncpg engine. gunicorn.conf.py derives it from Postgres max_connections.
+DB_CONNECTION_BUDGET = int(os.getenv('DB_CONNECTION_BUDGET', '0'))
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+DB_ASYNC_POOL_SHARE = float(os.getenv('DB_ASYNC_POOL_SHARE', '0.3'))
+# Budget of the ingestion worker process. It runs with DB_CONNECTION_BUDGET set
+# to this (docker-compose.yml), and gunicorn.conf.py keeps it out of the API's.
+DB_WORKER_CONNECTION_BUDGET = int(os.getenv('DB_WORKER_CONNECTION_BUDGET', '16'))
+
+# PgBouncer in transaction mode between the app and Postgres: DB_HOST/DB_PORT
+# point at PgBouncer, asyncpg keeps no prepared-statement cache and Lambda
+# opens no pool of its own (backend_service/pool_sizing.py). Migrations need
+# one session for their advisory lock, so they bypass PgBouncer and use
+# DB_DIRECT_HOST/DB_DIRECT_PORT (by default the same host and port).
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes')
+DB_DIRECT_HOST = os.getenv('DB_DIRECT_HOST', DB_HOST)
+DB_DIRECT_PORT = os.getenv('DB_DIRECT_PORT', DB_PORT)
+DATABASE_URL_DIRECT = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_DIRECT_HOST}:{DB_DIRECT_PORT}/{DB_NAME}"
+
+
+# Time-series partitioning (weather_data / market_prices are range-partitioned
+# by month). The worker keeps this many future months pre-created.
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '2'))
+
+# "Latest" reads look this far back first so Postgres can prune old partitions,
+# and only scan further back for rows the window is short of
+# (partitions.latest_rows).
+WEATHER_LOOKBACK_DAYS = int(os.getenv('WEATHER_LOOKBACK_DAYS', '30'))
+MARKET_LOOKBACK_DAYS = int(os.getenv('MARKET_LOOKBACK_DAYS', '180'))
+
+# Weather history retention. Raw 15-minute rows older than the raw window are
+# purged once rolled up into weather_hourly / weather_daily; hourly rollups are
+# kept for WEATHER_HOURLY_RETENTION_DAYS and daily rollups forever.
+# Keep WEATHER_RAW_RETENTION_DAYS >= WEATHER_LOOKBACK_DAYS.
+WEATHER_RAW_RETENTION_DAYS = int(os.getenv('WEATHER_RAW_RETENTION_DAYS', '35'))
+WEATHER_HOURLY_RETENTION_DAYS = int(os.getenv('WEATHER_HOURLY_RETENTION_DAYS', '180'))
+
+# Seconds the /analytics/summary + /demo/status counters snapshot is cached.
+STATS_SNAPSHOT_TTL = int(os.getenv('STATS_SNAPSHOT_TTL', '30'))
+# Rows each maintained counter is spread over, so concurrent ingest
+# transactions rarely wait on the same row lock.
+STATS_COUNTER_SHARDS = max(1, int(os.getenv('STATS_COUNTER_SHARDS', '16')))
+
+# Seconds a Bedrock response stays in the content-addressed Redis cache.
+AI_RESPONSE_CACHE_TTL = int(os.getenv('AI_RESPONSE_CACHE_TTL', str(24 * 3600)))
+
+# Bedrock concurrency: dedicated pool size / AIMD ceiling, and the floor the
+# limiter backs off to when Bedrock throttles.
+BEDROCK_MAX_CONCURRENCY = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '8'))
+BEDROCK_MIN_CONCURRENCY = int(os.getenv('BEDROCK_MIN_CONCURRENCY', '1'))
+
+# Serve AI calls from a local fake streaming model instead of Bedrock
+# (development / tests; see services/fake_bedrock.py).
+AI_FAKE_MODEL = os.getenv('AI_FAKE_MODEL', 'false').lower() in ('1', 'true', 'yes')
+AI_FAKE_CHUNK_DELAY_MS = int(os.getenv('AI_FAKE_CHUNK_DELAY_MS', '40'))
+
+# Model backend for AI calls: 'bedrock' (AWS, via BEDROCK_TRANSPORT), 'fake'
+# (the in-process client above) or 'stub' (scripts/stub_model_server.py at
+# AI_STUB_URL; no AWS credentials needed). AI_FAKE_MODEL=true means 'fake'.
+AI_MODEL_BACKEND = os.getenv('AI_MODEL_BACKEND', 'fake' if AI_FAKE_MODEL else 'bedrock').lower()
+if AI_MODEL_BACKEND not in ('bedrock', 'fake', 'stub'):
+    raise RuntimeError(f"AI_MODEL_BACKEND must be 'bedrock', 'fake' or 'stub', not {AI_MODEL_BACKEND!r}")
+AI_STUB_URL = os.getenv('AI_STUB_URL', 'http://127.0.0.1:8788')
+
+# AI job queue (ai_jobs table). Worker concurrency, idle poll interval, retry
+# budget, and how long a 'running' job may go without a heartbeat before it
+# is considered abandoned and re-queued (or failed, once out of attempts).
+AI_JOB_CONCURRENCY = int(os.getenv('AI_JOB_CONCURRENCY', '4'))
+AI_JOB_POLL_SECONDS = float(os.getenv('AI_JOB_POLL_SECONDS', '1'))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', '3'))
+AI_JOB_STALE_SECONDS = int(os.getenv('AI_JOB_STALE_SECONDS', '300'))
+# Job callback hosts (comma-separated; '*.example.com' matches subdomains).
+# Callbacks must resolve to public addresses either way. With the list
+# empty, only admins may register a callback_url.
+AI_JOB_CALLBACK_HOSTS = [
+    h.strip().lower() for h in os.getenv('AI_JOB_CALLBACK_HOSTS', '').split(',') if h.strip()
+]
+
+# Bedrock pricing (USD per 1K tokens) used for cost estimates; defaults are
+# Nova Micro on-demand rates.
+BEDROCK_PRICE_INPUT_PER_1K = float(os.getenv('BEDROCK_PRICE_INPUT_PER_1K', '0.000035'))
+BEDROCK_PRICE_OUTPUT_PER_1K = float(os.getenv('BEDROCK_PRICE_OUTPUT_PER_1K', '0.00014'))
+
+# Nightly advisory precompute: UTC hour to run (default 00:00 UTC, i.e.
+# 05:30 IST, ahead of the morning peak), Bedrock calls allowed per run and
+# per minute, and how long warmed ai:village:* entries live.
+AI_PRECOMPUTE_HOUR_UTC = int(os.getenv('AI_PRECOMPUTE_HOUR_UTC', '0'))
+AI_PRECOMPUTE_MAX_CALLS = int(os.getenv('AI_PRECOMPUTE_MAX_CALLS', '200'))
+AI_PRECOMPUTE_CALLS_PER_MINUTE = float(os.getenv('AI_PRECOMPUTE_CALLS_PER_MINUTE', '30'))
+AI_PRECOMPUTE_CACHE_TTL = int(os.getenv('AI_PRECOMPUTE_CACHE_TTL', str(26 * 3600)))
+
+# Bedrock transport: 'httpx' (native async, SigV4-signed, keep-alive pool) or
+# 'boto3' (blocking client on the Bedrock thread pool). BEDROCK_ENDPOINT_URL
+# overrides the regional endpoint (e.g. a local stub for benchmarks).
+BEDROCK_TRANSPORT = os.getenv('BEDROCK_TRANSPORT', 'httpx').lower()
+BEDROCK_ENDPOINT_URL = os.getenv('BEDROCK_ENDPOINT_URL') or None
+BEDROCK_HTTP_MAX_RETRIES = int(os.getenv('BEDROCK_HTTP_MAX_RETRIES', '2'))
+
+# Circuit breaker around Bedrock: open after this many consecutive outage
+# failures, then probe after RESET seconds (doubling up to MAX while down).
+BEDROCK_BREAKER_FAILURES = int(os.getenv('BEDROCK_BREAKER_FAILURES', '5'))
+BEDROCK_BREAKER_RESET_SECONDS = float(os.getenv('BEDROCK_BREAKER_RESET_SECONDS', '30'))
+BEDROCK_BREAKER_MAX_RESET_SECONDS = float(os.getenv('BEDROCK_BREAKER_MAX_RESET_SECONDS', '300'))
+
+# Bulk village analysis: villages packed into one Bedrock request, and the
+# output-token cap for such a request.
+AI_BATCH_SIZE = int(os.getenv('AI_BATCH_SIZE', '4'))
+AI_BATCH_MAX_TOKENS = int(os.getenv('AI_BATCH_MAX_TOKENS', '5000'))
+
+# Prometheus metrics: request middleware + GET /metrics. Disable where no
+# scraper can reach the process (e.g. Lambda).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# SQL accounting (core/query_stats.py): statements slower than this are
+# logged with normalized SQL; DB_QUERY_BUDGET is what happens when an
+# endpoint exceeds its @query_budget — 'warn' (log), 'raise' (tests) or 'off'.
+DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+DB_QUERY_BUDGET = os.getenv('DB_QUERY_BUDGET', 'warn').lower()
+if DB_QUERY_BUDGET not in ('warn', 'raise', 'off'):
+    raise RuntimeError(f"DB_QUERY_BUDGET must be 'warn', 'raise' or 'off', not {DB_QUERY_BUDGET!r}")
+
+# Event-loop / thread-pool monitor (core/loop_monitor.py): sample interval in
+# seconds (0 disables), lag warning threshold, minimum seconds between
+# repeated warnings, and how long the loop must be stuck before the watchdog
+# logs its stack (0 = no stack sampling).
+LOOP_MONITOR_INTERVAL = float(os.getenv('LOOP_MONITOR_INTERVAL', '0.5'))
+LOOP_LAG_WARN_MS = float(os.getenv('LOOP_LAG_WARN_MS', '100'))
+LOOP_MONITOR_WARN_EVERY = float(os.getenv('LOOP_MONITOR_WARN_EVERY', '30'))
+LOOP_BLOCK_SAMPLE_MS = float(os.getenv('LOOP_BLOCK_SAMPLE_MS', '0'))
+
+# OpenTelemetry tracing (core/tracing.py; needs the opentelemetry packages):
+# '' (off), 'otlp' (OTEL_EXPORTER_OTLP_ENDPOINT), 'console' or 'file'
+# (JSON lines appended to TRACING_FILE).
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', '').lower()
+if TRACING_EXPORTER not in ('', 'otlp', 'console', 'file'):
+    raise RuntimeError(f"TRACING_EXPORTER must be 'otlp', 'console', 'file' or empty, not {TRACING_EXPORTER!r}")
+TRACING_FILE = os.getenv('TRACING_FILE', 'traces.jsonl')
+
+# Ingestion upstream calls (OpenWeather, data.gov.in): retries after a
+# timeout, connection error, 429 or 5xx, with jittered backoff from
+# INGEST_RETRY_BACKOFF_S.
+INGEST_FETCH_RETRIES = int(os.getenv('INGEST_FETCH_RETRIES', '1'))
+INGEST_RETRY_BACKOFF_S = float(os.getenv('INGEST_RETRY_BACKOFF_S', '1.0'))
+
+# What API and worker processes do about the schema at startup
+# (backend_service/migrate.py): 'check' (log if alembic_version is not the
+# code's head), 'strict' (refuse to start), 'create_all' (old bootstrap, for
+# throwaway local databases) or 'off'. Migrations themselves run once per
+# deploy via `python -m backend_service.migrate`.
+SCHEMA_STARTUP = os.getenv('SCHEMA_STARTUP', 'check').lower()
+if SCHEMA_STARTUP not in ('check', 'strict', 'create_all', 'off'):
+    raise RuntimeError(f"SCHEMA_STARTUP must be 'check', 'strict', 'create_all' or 'off', not {SCHEMA_STARTUP!r}")
@@ -3,11 +3,11 @@ import asyncio
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 
 from backend_service.services.auth_service import get_user_by_email
 from backend_service.models import RoleEnum
 from backend_service.config import SECRET_KEY
+from backend_service.core import tracing
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -21,19 +21,24 @@ def _raise_401():
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        if email is None:
+    from jose import JWTError, jwt  # imported on first use (cold starts)
+
+    with tracing.span('auth.get_current_user'):
+        with tracing.span('auth.jwt_decode'):
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+                email: str = payload.get("sub")
+                if email is None:
+                    _raise_401()
+            except JWTError:
+                _raise_401()
+
+        # Run the sync DB call in a thread to avoid blocking the event loop
+        with tracing.span('auth.user_lookup'):
+            user = await asyncio.to_thread(get_user_by_email, email)
+        if not user:
             _raise_401()
-    except JWTError:
-        _raise_401()
-
-    # Run the sync DB call in a thread to avoid blocking the event loop
-    user = await asyncio.to_thread(get_user_by_email, email)
-    if not user:
-        _raise_401()
-    return user
+        return user
 
 
 async def get_current_active_user(current_user=Depends(get_current_user)):
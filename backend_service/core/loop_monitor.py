@@ -0,0 +1,186 @@
+"""Event-loop lag and thread-pool saturation monitor.
+
+Sync ORM work reaches the thread pools in two ways. ``asyncio.to_thread``
+uses the loop's default executor, and FastAPI runs sync routes and
+dependencies on AnyIO's worker threads. When either pool is full, requests
+queue invisibly. When something blocks the loop, every request stalls.
+:class:`LoopMonitor` samples both, every ``LOOP_MONITOR_INTERVAL`` seconds:
+
+* loop lag — how late a ``sleep(interval)`` wakes up;
+* per pool — busy threads, queued work and the thread limit. To count the
+  default executor the monitor replaces it with a
+  :class:`CountingThreadPoolExecutor` of the same size.
+
+Both go to Prometheus (``gramsight_event_loop_lag_seconds``,
+``gramsight_threadpool_*``). Lag above ``LOOP_LAG_WARN_MS`` and a pool with
+queued work are logged as warnings, at most once per
+``LOOP_MONITOR_WARN_EVERY`` seconds each.
+
+With ``LOOP_BLOCK_SAMPLE_MS`` > 0 a watchdog thread also checks the
+monitor's heartbeat. If the loop has not run for that long, it logs the
+loop thread's current stack once per stall, which names the blocking
+callback.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from backend_service.config import (
+    LOOP_BLOCK_SAMPLE_MS, LOOP_LAG_WARN_MS, LOOP_MONITOR_INTERVAL, LOOP_MONITOR_WARN_EVERY,
+)
+from backend_service.metrics import EVENT_LOOP_LAG, THREADPOOL_BUSY, THREADPOOL_QUEUED, THREADPOOL_SIZE
+
+logger = logging.getLogger('backend.loop_monitor')
+
+
+class CountingThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that knows how many items are running and queued
+    (the stock one cannot tell idle threads from busy ones)."""
+
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ''):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.busy = 0
+        self.queued = 0
+        self._count_lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        def run():
+            with self._count_lock:
+                self.queued -= 1
+                self.busy += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._count_lock:
+                    self.busy -= 1
+
+        with self._count_lock:
+            self.queued += 1
+        try:
+            return super().submit(run)
+        except BaseException:
+            with self._count_lock:
+                self.queued -= 1
+            raise
+
+    def depth(self) -> Tuple[int, int, int]:
+        return self.busy, self.queued, self._max_workers
+
+
+def _install_counting_executor(loop: asyncio.AbstractEventLoop) -> CountingThreadPoolExecutor:
+    """Make the loop's default executor (``asyncio.to_thread``) countable,
+    with asyncio's default size."""
+    current = getattr(loop, '_default_executor', None)
+    if isinstance(current, CountingThreadPoolExecutor):
+        return current
+    executor = CountingThreadPoolExecutor(thread_name_prefix='asyncio')
+    loop.set_default_executor(executor)
+    if current is not None:
+        current.shutdown(wait=False)
+    return executor
+
+
+def _anyio_depth() -> Optional[Tuple[int, int, int]]:
+    """(busy, waiting, limit) of AnyIO's default thread limiter."""
+    try:
+        from anyio import to_thread
+        stats = to_thread.current_default_thread_limiter().statistics()
+    except Exception:
+        return None
+    return int(stats.borrowed_tokens), stats.tasks_waiting, int(stats.total_tokens)
+
+
+class LoopMonitor:
+    def __init__(self, name: str, interval: float = LOOP_MONITOR_INTERVAL,
+                 lag_warn_ms: float = LOOP_LAG_WARN_MS, block_sample_ms: float = LOOP_BLOCK_SAMPLE_MS,
+                 warn_every: float = LOOP_MONITOR_WARN_EVERY):
+        self.name = name
+        self.interval = interval
+        self.lag_warn_ms = lag_warn_ms
+        self.block_sample_ms = block_sample_ms
+        self.warn_every = warn_every
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[CountingThreadPoolExecutor] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._last_warned: Dict[str, float] = {}
+
+    def start(self) -> 'LoopMonitor':
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._executor = _install_counting_executor(loop)
+        self._task = loop.create_task(self._run())
+        if self.block_sample_ms > 0:
+            self._watchdog = threading.Thread(target=self._watch, name=f'loop-watchdog-{self.name}', daemon=True)
+            self._watchdog.start()
+        logger.info('Loop monitor started for %s (every %.1fs, stack sampling %s)', self.name, self.interval,
+                    f'after {self.block_sample_ms:.0f} ms' if self.block_sample_ms > 0 else 'off')
+        return self
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _warn(self, key: str, msg: str, *args) -> None:
+        now = time.monotonic()
+        if now - self._last_warned.get(key, 0.0) >= self.warn_every:
+            self._last_warned[key] = now
+            logger.warning(msg, *args)
+
+    async def _run(self) -> None:
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - due)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag * 1000 >= self.lag_warn_ms:
+                self._warn('lag', 'event_loop_lag_ms=%.1f process=%s', lag * 1000, self.name)
+            for pool, depth in (('default', self._executor.depth()), ('anyio', _anyio_depth())):
+                if depth is None:
+                    continue
+                busy, queued, limit = depth
+                THREADPOOL_BUSY.labels(pool).set(busy)
+                THREADPOOL_QUEUED.labels(pool).set(queued)
+                THREADPOOL_SIZE.labels(pool).set(limit)
+                if queued > 0:
+                    self._warn(pool, 'threadpool_saturated pool=%s busy=%d/%d queued=%d process=%s',
+                               pool, busy, limit, queued, self.name)
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop thread's stack while it is stuck."""
+        threshold = self.interval + self.block_sample_ms / 1000
+        reported_beat = None
+        while not self._stopped.wait(self.block_sample_ms / 2000):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat
+            if stalled < threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # one sample per stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame))
+            logger.warning('event_loop_blocked_ms=%.0f process=%s — loop thread stack:\n%s',
+                           (stalled - self.interval) * 1000, self.name, stack)
+
+
+def start_loop_monitor(name: str) -> Optional[LoopMonitor]:
+    """Start monitoring the running loop; None when disabled
+    (``LOOP_MONITOR_INTERVAL`` <= 0)."""
+    if LOOP_MONITOR_INTERVAL <= 0:
+        return None
+    return LoopMonitor(name).start()
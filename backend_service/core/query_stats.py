@@ -0,0 +1,149 @@
+"""Per-request SQL accounting.
+
+Cursor-execute events on the sync and async engines add every statement and
+its DB time to the current request's :class:`QueryStats`, which
+:class:`~backend_service.core.request_context.RequestContextMiddleware`
+keeps in a contextvar next to the request id (``asyncio.to_thread`` work
+shares it). The middleware reports the totals in the access-log line and a
+``Server-Timing`` header, so N+1 patterns show up per request.
+
+With tracing on, each statement is also a ``db.query`` span.
+
+Statements slower than ``DB_SLOW_QUERY_MS`` are logged with normalized SQL
+(placeholders and literals as ``?``, IN-lists and multi-row VALUES
+collapsed), in requests and background jobs alike.
+
+``@query_budget(n)`` declares how many statements an endpoint may issue.
+With ``DB_QUERY_BUDGET=raise`` (test runs) going over raises
+:class:`QueryBudgetExceeded` once the response is done; ``warn`` (default)
+logs it; ``off`` skips the check.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+from backend_service.config import DB_QUERY_BUDGET, DB_SLOW_QUERY_MS
+from backend_service.core import tracing
+
+logger = logging.getLogger('backend.sql')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """Statement count and DB time for one request."""
+
+    __slots__ = ('count', 'seconds', '_lock')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()  # to_thread calls of one request may overlap
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+
+    @property
+    def ms(self) -> float:
+        return self.seconds * 1000
+
+
+query_stats_var: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar('query_stats', default=None)
+
+
+# ── SQL normalization ───────────────────────────────────────────────
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|\$\d+|%s')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_ROWS = re.compile(r'(\((?:\?, )*\?\))(?:, \1)+')
+_SPACE = re.compile(r'\s+')
+_MAX_SQL_LENGTH = 2000
+
+
+def normalize_sql(statement: str) -> str:
+    """``statement`` with values replaced by ``?``, so repeats of the same
+    query look the same in logs."""
+    sql = _SPACE.sub(' ', statement).strip()
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _ROWS.sub(r'\1, ...', sql)
+    return sql[:_MAX_SQL_LENGTH]
+
+
+# ── Engine hooks ────────────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._gs_started = time.perf_counter()
+        if tracing.enabled():
+            context._gs_span = tracing.start_span('db.query', {
+                'db.system': conn.dialect.name, 'db.statement': normalize_sql(statement),
+            })
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_gs_started', None)
+    if started is None:
+        return
+    tracing.end_span(getattr(context, '_gs_span', None))
+    elapsed = time.perf_counter() - started
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.add(elapsed)
+    if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        logger.warning('slow_query duration_ms=%.1f sql=%s', elapsed * 1000, normalize_sql(statement))
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    tracing.end_span(getattr(context, '_gs_span', None), exception_context.original_exception)
+
+
+def instrument_engine(engine) -> None:
+    """Count, time and trace statements on ``engine`` (an ``AsyncEngine``
+    is instrumented through its ``sync_engine``)."""
+    target = getattr(engine, 'sync_engine', engine)
+    event.listen(target, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(target, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(target, 'handle_error', _handle_error)
+
+
+# ── Query budgets ───────────────────────────────────────────────────
+def query_budget(max_queries: int) -> Callable:
+    """Declare the most statements an endpoint should issue, auth included.
+
+    Put it under the route decorator; the function itself is returned
+    unchanged, so FastAPI sees the same signature::
+
+        @router.get('/admin/villages')
+        @query_budget(2)
+        def admin_villages(...): ...
+    """
+    def decorate(fn):
+        fn.__query_budget__ = max_queries
+        return fn
+    return decorate
+
+
+def check_budget(scope, stats: QueryStats) -> None:
+    """Compare the request's statements with its endpoint's budget."""
+    if DB_QUERY_BUDGET == 'off':
+        return
+    budget = getattr(getattr(scope.get('route'), 'endpoint', None), '__query_budget__', None)
+    if budget is None or stats.count <= budget:
+        return
+    message = f"{scope['method']} {scope['route'].path} issued {stats.count} SQL statements (budget {budget})"
+    if DB_QUERY_BUDGET == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning('query_budget_exceeded %s', message)
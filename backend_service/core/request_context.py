@@ -0,0 +1,122 @@
+"""Request id propagation.
+
+:class:`RequestContextMiddleware` takes the caller's ``X-Request-ID`` (or
+makes one), stores it in :data:`request_id_var`, echoes it on the response
+and writes the access-log line once the response body is complete. It is
+plain ASGI, so streaming responses and background tasks pass through
+untouched.
+
+Everything that runs in the request's context sees the same id: the route,
+``asyncio.to_thread`` and threadpool work, and the Bedrock pool. So:
+
+* log records carry it as ``%(request_id)s`` (:func:`install_log_record_factory`);
+* outbound HTTP calls send it on (:func:`outbound_headers`).
+
+Background work outside a request (scheduler, AI job workers) may set
+:data:`request_id_var` itself; otherwise it reads ``-``.
+
+The middleware also opens the request's SQL accounting
+(:mod:`backend_service.core.query_stats`): statement count and DB time go
+into the access-log line and a ``Server-Timing`` header, and endpoint query
+budgets are checked when the response is done.
+"""
+import contextvars
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+from backend_service.core import tracing
+from backend_service.core.query_stats import QueryStats, check_budget, query_stats_var
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_HEADER_KEY = REQUEST_ID_HEADER.lower().encode('latin-1')
+_MAX_ID_LENGTH = 128
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+
+access_logger = logging.getLogger('backend')
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+def outbound_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """``headers`` plus ``X-Request-ID`` when running inside a request, and
+    ``traceparent`` when tracing is on."""
+    headers = dict(headers or {})
+    request_id = request_id_var.get()
+    if request_id:
+        headers[REQUEST_ID_HEADER] = request_id
+    return tracing.inject(headers)
+
+
+def install_log_record_factory() -> None:
+    """Give every log record a ``request_id`` attribute. Idempotent."""
+    previous = logging.getLogRecordFactory()
+    if getattr(previous, '_adds_request_id', False):
+        return
+
+    def factory(*args, **kwargs):
+        record = previous(*args, **kwargs)
+        record.request_id = request_id_var.get() or '-'
+        return record
+
+    factory._adds_request_id = True
+    logging.setLogRecordFactory(factory)
+
+
+def _incoming_request_id(scope) -> Optional[str]:
+    for key, value in scope['headers']:
+        if key == _HEADER_KEY:
+            request_id = value.decode('latin-1')
+            # Ids end up in logs and outbound headers; drop anything odd.
+            if 0 < len(request_id) <= _MAX_ID_LENGTH and request_id.isprintable():
+                return request_id
+            return None
+    return None
+
+
+class RequestContextMiddleware:
+    """Request id, timing and SQL totals for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or str(uuid.uuid4())
+        header = (_HEADER_KEY, request_id.encode('latin-1'))
+        stats = QueryStats()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                # Queries made while a streaming body is produced come later;
+                # the access-log line has the full count.
+                timing = (f'db;dur={stats.ms:.1f};desc="{stats.count} queries", '
+                          f'app;dur={(time.perf_counter() - start) * 1000:.1f}')
+                message['headers'] = [*message.get('headers', ()), header,
+                                      (b'server-timing', timing.encode('latin-1'))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        stats_token = query_stats_var.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            access_logger.info(
+                "method=%s path=%s status=%s duration_ms=%.1f db_queries=%d db_ms=%.1f request_id=%s",
+                scope['method'], scope['path'], status, (time.perf_counter() - start) * 1000,
+                stats.count, stats.ms, request_id,
+            )
+            query_stats_var.reset(stats_token)
+            request_id_var.reset(token)
+        check_budget(scope, stats)
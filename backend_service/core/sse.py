@@ -0,0 +1,30 @@
+"""Server-Sent Events helpers for the streaming AI endpoints."""
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    # Stop nginx from buffering the stream (see frontend/nginx.conf).
+    'X-Accel-Buffering': 'no',
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Wrap an async iterator of ``(event, data)`` pairs as a ``text/event-stream``.
+
+    A comment line is sent first so proxies and the browser see a byte
+    immediately, before the model has produced anything.
+    """
+    async def body():
+        yield ': stream open\n\n'
+        async for event, data in events:
+            yield sse_event(event, data)
+
+    return StreamingResponse(body(), media_type='text/event-stream', headers=SSE_HEADERS)
@@ -0,0 +1,169 @@
+"""OpenTelemetry tracing (optional).
+
+Off unless ``TRACING_EXPORTER`` is set and the opentelemetry packages are
+installed:
+
+* ``otlp`` — OTLP/HTTP to ``OTEL_EXPORTER_OTLP_ENDPOINT`` (a local
+  collector, Jaeger, Tempo, ...);
+* ``console`` — spans printed to stdout;
+* ``file`` — one JSON span per line appended to ``TRACING_FILE``.
+
+While off, nothing from opentelemetry is imported, :func:`span` returns a
+shared no-op context manager and the other helpers return immediately.
+
+Spans come from:
+
+* :class:`TracingMiddleware` — one SERVER span per request, continuing an
+  incoming ``traceparent`` and named by route template;
+* ``get_current_user`` (JWT decode, user lookup), every cache get/set,
+  every SQL statement (the ``query_stats`` engine hooks), Bedrock invoke
+  and stream calls, and each village in the ingestion cycles;
+* AI jobs — :func:`inject` stores the enqueuing request's context in the
+  job payload (``_trace``) and the worker continues that trace with
+  :func:`continue_trace`.
+
+Outbound HTTP calls carry ``traceparent`` through ``outbound_headers()``.
+"""
+import logging
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Optional
+
+from backend_service.config import TRACING_EXPORTER, TRACING_FILE
+
+logger = logging.getLogger('backend.tracing')
+
+_tracer = None
+_trace = None       # opentelemetry.trace, once set up
+_propagate = None   # opentelemetry.propagate, once set up
+_NOOP = nullcontext()
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def _make_exporter():
+    if TRACING_EXPORTER == 'otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if TRACING_EXPORTER == 'file':
+        out = open(TRACING_FILE, 'a', buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + '\n')
+    return ConsoleSpanExporter()
+
+
+def setup_tracing(service_name: str) -> bool:
+    """Install the tracer provider for this process. Returns whether tracing
+    is on; safe to call more than once."""
+    global _tracer, _trace, _propagate
+    if _tracer is not None or not TRACING_EXPORTER:
+        return _tracer is not None
+    try:
+        from opentelemetry import propagate, trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        exporter = _make_exporter()
+    except ImportError as exc:
+        logger.warning('TRACING_EXPORTER=%s but %s is not installed — tracing disabled', TRACING_EXPORTER, exc.name)
+        return False
+    provider = TracerProvider(resource=Resource.create({'service.name': service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _trace, _propagate = trace, propagate
+    _tracer = trace.get_tracer('gramsight')
+    logger.info('Tracing enabled for %s (exporter=%s)', service_name, TRACING_EXPORTER)
+    return True
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager for a child span of the current one (no-op when off)."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """A span that is not made current — for code that cannot hold a context
+    manager open (async generators, engine event pairs). End it with
+    :func:`end_span`. None when off."""
+    if _tracer is None:
+        return None
+    return _tracer.start_span(name, attributes=attributes)
+
+
+def end_span(s, exc: Optional[BaseException] = None) -> None:
+    if s is None:
+        return
+    if exc is not None:
+        s.record_exception(exc)
+        s.set_status(_trace.Status(_trace.StatusCode.ERROR, str(exc)))
+    s.end()
+
+
+def annotate(attributes: Dict[str, Any]) -> None:
+    """Set attributes on the current span, if any."""
+    if _tracer is None:
+        return
+    current = _trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def inject(carrier: Dict[str, str]) -> Dict[str, str]:
+    """Add the current trace context (``traceparent``) to ``carrier``."""
+    if _tracer is not None:
+        _propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def continue_trace(carrier: Optional[Dict[str, str]], name: str,
+                   attributes: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+    """Run the block in a span that continues the trace in ``carrier`` (e.g.
+    a job's ``_trace``), or a new trace when there is none."""
+    if _tracer is None:
+        yield
+        return
+    ctx = _propagate.extract(carrier) if carrier else None
+    with _tracer.start_as_current_span(name, context=ctx, kind=_trace.SpanKind.CONSUMER, attributes=attributes):
+        yield
+
+
+class TracingMiddleware:
+    """SERVER span per HTTP request, continuing the caller's trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode('latin-1'): v.decode('latin-1') for k, v in scope['headers']}
+        method = scope['method']
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            method, context=_propagate.extract(carrier), kind=_trace.SpanKind.SERVER,
+            attributes={'http.method': method, 'http.target': scope['path']},
+        ) as s:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get('route'), 'path', None)
+                if route:
+                    s.update_name(f'{method} {route}')
+                    s.set_attribute('http.route', route)
+                s.set_attribute('http.status_code', status)
+                if status >= 500:
+                    s.set_status(_trace.Status(_trace.StatusCode.ERROR))
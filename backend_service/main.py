@@ -1,15 +1,18 @@
 import os
-import uuid as _uuid
 import logging
 import asyncio
-import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from backend_service.config import ALLOWED_ORIGINS
-from backend_service.database import engine, Base
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from backend_service.config import ALLOWED_ORIGINS, METRICS_ENABLED
+from backend_service.core.loop_monitor import start_loop_monitor
+from backend_service.core.request_context import RequestContextMiddleware, install_log_record_factory
+from backend_service.core.tracing import TracingMiddleware, setup_tracing
+from backend_service.database import engine
+from backend_service.migrate import SchemaVersionMismatch, check_schema_version
+from backend_service.metrics import MetricsMiddleware, render as render_metrics
 from backend_service.routers.weather import router as weather_router
 from backend_service.routers.market import router as market_router
 from backend_service.routers.analytics import router as analytics_router
@@ -20,46 +23,45 @@ from backend_service.routers.auth import router as auth_router
 from backend_service.routers.farmer import router as farmer_router
 from backend_service.routers.farmland import router as farmland_router
 from backend_service.routers.demo import router as demo_router
+from backend_service.routers.jobs import router as jobs_router
 
 # True when running inside AWS Lambda
 IS_LAMBDA = bool(os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
 
+install_log_record_factory()
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s %(levelname)s [%(name)s] %(message)s',
+    format='%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s',
 )
 logger = logging.getLogger('backend')
 
 
-# --------------- Middleware: Request-ID + timing ---------------
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get('X-Request-ID', str(_uuid.uuid4()))
-        start = time.perf_counter()
-        response = await call_next(request)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        response.headers['X-Request-ID'] = request_id
-        logger.info(
-            "method=%s path=%s status=%s duration_ms=%.1f request_id=%s",
-            request.method, request.url.path, response.status_code, elapsed_ms, request_id,
-        )
-        return response
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # In Lambda, Alembic handles migrations — skip the blocking create_all.
-    if not IS_LAMBDA:
-        try:
-            await asyncio.to_thread(Base.metadata.create_all, bind=engine)
-        except Exception:
-            logger.exception('Could not create DB tables at startup')
+    monitor = start_loop_monitor('api')
+    # Migrations run once per deploy (python -m backend_service.migrate);
+    # each process only compares alembic_version with the code's head.
+    try:
+        await asyncio.to_thread(check_schema_version)
+    except SchemaVersionMismatch:
+        raise
+    except Exception:
+        logger.exception('Could not check the DB schema version at startup')
     yield
+    if monitor is not None:
+        await monitor.stop()
+    # Close pooled connections now rather than leaving them for Postgres to
+    # notice (gunicorn recycles workers via max_requests).
+    from backend_service.database_async import async_engine
+    await async_engine.dispose()
+    await asyncio.to_thread(engine.dispose)
 
 
 app = FastAPI(title='GramSight Backend', lifespan=lifespan)
 
 app.add_middleware(RequestContextMiddleware)
+if setup_tracing('gramsight-api'):
+    app.add_middleware(TracingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -67,6 +69,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)  # outermost, so CORS and logging are timed too
 
 app.include_router(weather_router)
 app.include_router(market_router)
@@ -78,6 +82,7 @@ app.include_router(auth_router)
 app.include_router(farmer_router)
 app.include_router(farmland_router)
 app.include_router(demo_router)
+app.include_router(jobs_router)
 
 
 @app.get('/health')
@@ -101,7 +106,17 @@ async def health():
         checks['redis'] = str(exc)
 
     ok = checks['db'] == 'ok' and checks['redis'] == 'ok'
-    return {'status': 'ok' if ok else 'degraded', 'checks': checks}
+    # Reported, but not part of ``status``: AI endpoints serve fallbacks while
+    # Bedrock is down, so the instance itself is still healthy.
+    from backend_service.services.circuit_breaker import bedrock_breaker
+    return {'status': 'ok' if ok else 'degraded', 'checks': checks, 'bedrock': bedrock_breaker.snapshot()}
+
+
+if METRICS_ENABLED:
+    @app.get('/metrics', include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint (see backend_service/metrics.py)."""
+        return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 
 # AWS Lambda compatibility using Mangum. When running in Lambda, the handler
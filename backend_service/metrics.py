@@ -0,0 +1,194 @@
+"""Prometheus metrics, exposed at ``GET /metrics``.
+
+Per-request cost is kept to a histogram observation and a gauge inc/dec:
+
+* :class:`MetricsMiddleware` is plain ASGI (no ``BaseHTTPMiddleware`` task
+  or body wrapping). Requests are labelled by the matched route template
+  (``/farmer/{village_id}/advisory``), never the raw path, so label
+  cardinality is bounded by the number of routes; unmatched paths share
+  one ``<unmatched>`` label. Streaming responses are timed until the body
+  is complete.
+* DB pool, circuit-breaker and similar state is read only when Prometheus
+  scrapes, by :class:`StateCollector`, so it costs nothing per request.
+* Redis commands and outbound provider calls (Bedrock, OpenWeather,
+  data.gov.in, job webhooks) are timed where they are made, with
+  :func:`observe_redis` and :func:`track_outbound`.
+* Event-loop lag and thread-pool depth are sampled in the background by
+  :mod:`backend_service.core.loop_monitor`.
+
+Metrics are per process. With several workers, scrape each one or set
+``PROMETHEUS_MULTIPROC_DIR`` (see prometheus_client's multiprocess mode).
+"""
+import asyncio
+import os
+import time
+from typing import Iterable
+
+from prometheus_client import Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from backend_service.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, bedrock_breaker
+
+UNMATCHED = '<unmatched>'
+
+HTTP_REQUEST_DURATION = Histogram(
+    'gramsight_http_request_duration_seconds',
+    'HTTP request duration by route template',
+    ('method', 'route', 'status'),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+HTTP_IN_FLIGHT = Gauge(
+    'gramsight_http_requests_in_flight',
+    'HTTP requests currently being served',
+    ('method',),
+    multiprocess_mode='livesum',
+)
+REDIS_DURATION = Histogram(
+    'gramsight_redis_command_duration_seconds',
+    'Redis command latency as seen by the backend',
+    ('command',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 3),
+)
+OUTBOUND_DURATION = Histogram(
+    'gramsight_outbound_request_duration_seconds',
+    'Outbound provider call duration',
+    ('provider', 'operation', 'outcome'),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    'gramsight_event_loop_lag_seconds',
+    'Delay between when a loop-monitor wakeup was due and when it ran',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+THREADPOOL_BUSY = Gauge(
+    'gramsight_threadpool_busy_threads', 'Threads running work', ('pool',), multiprocess_mode='livesum',
+)
+THREADPOOL_QUEUED = Gauge(
+    'gramsight_threadpool_queued', 'Work items waiting for a free thread', ('pool',), multiprocess_mode='livesum',
+)
+THREADPOOL_SIZE = Gauge(
+    'gramsight_threadpool_max_threads', 'Thread limit of the pool', ('pool',), multiprocess_mode='livesum',
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request by method, route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the (shared) scope.
+            route = scope.get('route')
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, 'path', UNMATCHED), str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def observe_redis(command: str, start: float) -> None:
+    """Record one Redis command that started at ``perf_counter()`` ``start``."""
+    REDIS_DURATION.labels(command).observe(time.perf_counter() - start)
+
+
+class track_outbound:
+    """``with track_outbound('openweather', 'onecall'):`` — times the block as
+    one provider call; ``outcome`` is ``ok``, ``timeout``, ``error`` or
+    ``cancelled``."""
+
+    __slots__ = ('provider', 'operation', 'start')
+
+    def __init__(self, provider: str, operation: str):
+        self.provider = provider
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            outcome = 'ok'
+        elif issubclass(exc_type, (GeneratorExit, asyncio.CancelledError)):
+            outcome = 'cancelled'  # caller stopped reading / went away
+        elif issubclass(exc_type, TimeoutError) or 'Timeout' in exc_type.__name__:
+            outcome = 'timeout'
+        else:
+            outcome = 'error'
+        OUTBOUND_DURATION.labels(self.provider, self.operation, outcome).observe(time.perf_counter() - self.start)
+        return False
+
+
+# ── Scrape-time state ───────────────────────────────────────────────
+_BREAKER_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class StateCollector(Collector):
+    """DB pool and circuit-breaker gauges, read when Prometheus scrapes."""
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        size = GaugeMetricFamily('gramsight_db_pool_size', 'Configured pool size', labels=['engine'])
+        checked_out = GaugeMetricFamily(
+            'gramsight_db_pool_checked_out', 'Connections currently checked out', labels=['engine'])
+        overflow = GaugeMetricFamily(
+            'gramsight_db_pool_overflow', 'Connections open beyond pool_size (negative while the pool '
+            'has not filled yet)', labels=['engine'])
+        for name, pool in _pools():
+            if not hasattr(pool, 'checkedout'):
+                continue  # NullPool etc.
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], pool.overflow())
+        yield size
+        yield checked_out
+        yield overflow
+
+        breaker = GaugeMetricFamily(
+            'gramsight_circuit_breaker_state', 'Circuit state (0 closed, 1 half-open, 2 open)', labels=['name'])
+        breaker.add_metric([bedrock_breaker.name], _BREAKER_STATES[bedrock_breaker.state])
+        yield breaker
+
+
+def _pools():
+    from backend_service.database import engine
+    from backend_service.database_async import async_engine
+
+    return (('sync', engine.pool), ('async', async_engine.pool))
+
+
+_state_collector = StateCollector()
+REGISTRY.register(_state_collector)
+
+
+def render() -> bytes:
+    """Exposition text for ``GET /metrics``. In multiprocess mode the
+    per-worker files are merged; pool and breaker state is this worker's."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY)
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_state_collector)
+    return generate_latest(registry)
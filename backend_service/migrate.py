@@ -0,0 +1,168 @@
+"""Schema migrations as a one-shot job, and the cheap startup check.
+
+``python -m backend_service.migrate`` brings the database to the Alembic
+head and exits. Deployments run it once per release: the compose
+``migrate`` service, a Kubernetes Job or a CI step. The container
+entrypoint also runs it, unless ``RUN_MIGRATIONS=0``. A Postgres advisory
+lock serializes concurrent runs, so replicas that start together do not
+race on DDL. Databases not yet tracked by Alembic are bootstrapped first:
+
+* no core tables — ``create_all`` from the models, then stamp head;
+* tables from ``create_all`` but no ``alembic_version`` — stamp the
+  baseline (``0001_initial``) so later migrations apply.
+
+API and worker processes no longer run ``create_all``. On startup they only
+call :func:`check_schema_version`: one ``SELECT`` from ``alembic_version``,
+compared with the head revision(s) read from the migration files. The
+files are scanned with a regex, not through Alembic, to keep startup cheap.
+``SCHEMA_STARTUP`` decides what a mismatch does: ``check`` (default) logs
+it, ``strict`` refuses to start, ``create_all`` restores the old bootstrap
+for throwaway local databases, and ``off`` skips the check.
+
+The advisory lock is session-level. Behind PgBouncer in transaction mode it
+would be taken and released on whichever server connections those two
+statements landed on. The job therefore connects straight to Postgres
+(``DB_DIRECT_HOST`` / ``DB_DIRECT_PORT``), as do Alembic's own commands.
+"""
+import logging
+import os
+import re
+import sys
+from typing import Optional, Set
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+from backend_service.config import DATABASE_URL_DIRECT, SCHEMA_STARTUP
+from backend_service.database import Base, engine
+
+logger = logging.getLogger('backend.migrate')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VERSIONS_DIR = os.path.join(ROOT, 'alembic', 'versions')
+BASELINE_REVISION = '0001_initial'
+# pg_advisory_lock key shared by every migration run ('gram').
+MIGRATION_LOCK_KEY = 0x6772616D
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+class SchemaVersionMismatch(RuntimeError):
+    pass
+
+
+# ── Startup check ───────────────────────────────────────────────────
+def expected_heads(versions_dir: str = VERSIONS_DIR) -> Optional[Set[str]]:
+    """Head revision(s) of the migration files; None when they are not
+    shipped with this build (e.g. a trimmed Lambda package)."""
+    if not os.path.isdir(versions_dir):
+        return None
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(versions_dir, name), encoding='utf-8') as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down = _DOWN_REVISION.search(source)
+        if down is not None:
+            parents.update(_QUOTED.findall(down.group(1)))
+    return revisions - parents
+
+
+def current_revisions(bind=engine) -> Optional[Set[str]]:
+    """Revisions stamped in ``alembic_version``; None when the table is missing."""
+    with bind.connect() as conn:
+        if not inspect(conn).has_table('alembic_version'):
+            return None
+        return {row[0] for row in conn.execute(text('SELECT version_num FROM alembic_version'))}
+
+
+def check_schema_version() -> None:
+    """Startup guard. ``create_all`` mode bootstraps the tables instead (the
+    old behaviour); otherwise compare the database with the code."""
+    if SCHEMA_STARTUP == 'off':
+        return
+    if SCHEMA_STARTUP == 'create_all':
+        Base.metadata.create_all(bind=engine)
+        return
+    expected = expected_heads()
+    if expected is None:
+        logger.info('No migration files in this build — schema version not checked')
+        return
+    current = current_revisions()
+    if current == expected:
+        logger.info('Schema at %s', ', '.join(sorted(current)))
+        return
+    message = (f"database schema is at {', '.join(sorted(current)) if current else 'no Alembic revision'}, "
+               f"code expects {', '.join(sorted(expected))} — run `python -m backend_service.migrate`")
+    if SCHEMA_STARTUP == 'strict':
+        raise SchemaVersionMismatch(message)
+    logger.warning('Schema version mismatch: %s', message)
+
+
+# ── Migration job ───────────────────────────────────────────────────
+def _alembic_config():
+    from alembic.config import Config
+
+    # No ini file: alembic.ini only adds logging config, which would
+    # replace this process's logging setup.
+    cfg = Config()
+    cfg.set_main_option('script_location', os.path.join(ROOT, 'alembic'))
+    return cfg
+
+
+def _bootstrap(cfg, direct) -> None:
+    """Bring databases that Alembic does not track yet under its control."""
+    from alembic import command
+
+    tables = set(inspect(direct).get_table_names())
+    has_alembic = 'alembic_version' in tables
+    has_core_tables = {'users', 'villages'} <= tables
+
+    if not has_core_tables:
+        if has_alembic:
+            # Stamped, but the migrations never actually ran.
+            logger.warning('alembic_version exists but core tables are missing — resetting it')
+            with direct.begin() as conn:
+                conn.execute(text('DROP TABLE alembic_version'))
+        logger.info('Creating all tables from models and stamping head')
+        Base.metadata.create_all(bind=direct)
+        command.stamp(cfg, 'head')
+    elif not has_alembic:
+        logger.info('Database was initialized via create_all — stamping baseline %s', BASELINE_REVISION)
+        command.stamp(cfg, BASELINE_REVISION)
+
+
+def migrate() -> None:
+    """Bootstrap if needed, then upgrade to head — one run at a time."""
+    from alembic import command
+
+    cfg = _alembic_config()
+    direct = create_engine(DATABASE_URL_DIRECT, poolclass=NullPool)
+    with direct.connect() as lock_conn:
+        logger.info('Waiting for the migration lock')
+        lock_conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        lock_conn.commit()  # the lock is session-level; don't sit idle in a transaction
+        try:
+            _bootstrap(cfg, direct)
+            command.upgrade(cfg, 'head')
+        finally:
+            lock_conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            lock_conn.commit()
+        logger.info('Schema at %s', ', '.join(sorted(current_revisions(direct) or ())))
+    direct.dispose()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s [%(name)s] %(message)s')
+    try:
+        migrate()
+    except Exception:
+        logger.exception('Migration failed')
+        sys.exit(1)
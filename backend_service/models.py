@@ -1,14 +1,19 @@
 import uuid
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, Float, DateTime, Index, Integer, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, Index, Integer, JSON, Boolean, ForeignKey, SmallInteger, event
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from backend_service.database import Base
+from backend_service.partitions import after_create_partitioned
 
 
+# weather_data and market_prices are range-partitioned by month on their
+# timestamp column (see backend_service.partitions).  Postgres requires the
+# partition key to be part of the primary key.
 class WeatherData(Base):
     __tablename__ = 'weather_data'
+    __table_args__ = {'postgresql_partition_by': 'RANGE (recorded_at)'}
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     village_id = Column(PG_UUID(as_uuid=True), index=True, nullable=True)
     city = Column(String(128), index=True, nullable=True)
@@ -19,11 +24,55 @@ class WeatherData(Base):
     rainfall = Column(Float, nullable=True)
     uvi = Column(Float, nullable=True)
     description = Column(String(256), nullable=True)
-    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, primary_key=True)
+
+Index('ix_weather_data_village_recorded', WeatherData.village_id, WeatherData.recorded_at)
+event.listen(WeatherData.__table__, 'after_create', after_create_partitioned)
+
+
+class WeatherHourly(Base):
+    """Hourly per-village rollup of raw ``weather_data`` rows."""
+    __tablename__ = 'weather_hourly'
+    village_id = Column(PG_UUID(as_uuid=True), primary_key=True, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True, nullable=False, index=True)
+    city = Column(String(128), nullable=True)
+    temp_min = Column(Float, nullable=True)
+    temp_max = Column(Float, nullable=True)
+    temp_avg = Column(Float, nullable=True)
+    humidity_min = Column(Float, nullable=True)
+    humidity_max = Column(Float, nullable=True)
+    humidity_avg = Column(Float, nullable=True)
+    rainfall_total = Column(Float, nullable=True)
+    uvi_avg = Column(Float, nullable=True)
+    uvi_max = Column(Float, nullable=True)
+    wind_speed_avg = Column(Float, nullable=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class WeatherDaily(Base):
+    """Daily (UTC) per-village rollup of raw ``weather_data`` rows. Kept forever."""
+    __tablename__ = 'weather_daily'
+    village_id = Column(PG_UUID(as_uuid=True), primary_key=True, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True, nullable=False, index=True)
+    city = Column(String(128), nullable=True)
+    temp_min = Column(Float, nullable=True)
+    temp_max = Column(Float, nullable=True)
+    temp_avg = Column(Float, nullable=True)
+    humidity_min = Column(Float, nullable=True)
+    humidity_max = Column(Float, nullable=True)
+    humidity_avg = Column(Float, nullable=True)
+    rainfall_total = Column(Float, nullable=True)
+    uvi_avg = Column(Float, nullable=True)
+    uvi_max = Column(Float, nullable=True)
+    wind_speed_avg = Column(Float, nullable=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class MarketPrice(Base):
     __tablename__ = 'market_prices'
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     village_id = Column(PG_UUID(as_uuid=True), index=True, nullable=True)
     commodity = Column(String(128), index=True, nullable=False)
@@ -33,9 +82,11 @@ class MarketPrice(Base):
     modal_price = Column(Float, nullable=True)
     arrival_date = Column(DateTime(timezone=True), nullable=True, index=True)
     market_name = Column(String(128), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True, primary_key=True)
 
 Index('ix_market_prices_commodity_arrival', MarketPrice.commodity, MarketPrice.arrival_date)
+Index('ix_market_prices_village_created', MarketPrice.village_id, MarketPrice.created_at)
+event.listen(MarketPrice.__table__, 'after_create', after_create_partitioned)
 
 
 class RiskScore(Base):
@@ -49,6 +100,26 @@ class RiskScore(Base):
     calculated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
 
+# farmer_id used for village-level rows in latest_risk_scores (part of the PK,
+# so it cannot be NULL).
+VILLAGE_SCOPE = uuid.UUID(int=0)
+
+
+class LatestRiskScore(Base):
+    """Current risk per (village, farmer), upserted on every calculation.
+
+    ``risk_scores`` is the append-only history and only gains a row when the
+    score or level actually changes.
+    """
+    __tablename__ = 'latest_risk_scores'
+    village_id = Column(PG_UUID(as_uuid=True), primary_key=True, nullable=False)
+    farmer_id = Column(PG_UUID(as_uuid=True), primary_key=True, nullable=False, default=VILLAGE_SCOPE)
+    score = Column(Float, nullable=False)
+    risk_level = Column(String(32), nullable=False)
+    breakdown = Column(JSON, nullable=True)
+    calculated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class AiReport(Base):
     __tablename__ = 'ai_reports'
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
@@ -56,9 +127,90 @@ class AiReport(Base):
     farmer_id = Column(PG_UUID(as_uuid=True), index=True, nullable=True)
     report_type = Column(String(32), nullable=False)
     content = Column(JSON, nullable=False)
+    # sha256 of (model, prompt version, canonical prompt inputs); lets identical
+    # inputs reuse a stored response instead of calling Bedrock again.
+    input_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
 
+class AiJob(Base):
+    """Queued AI generation work, claimed by workers with ``FOR UPDATE SKIP LOCKED``."""
+    __tablename__ = 'ai_jobs'
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    kind = Column(String(32), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default='queued')
+    owner_id = Column(PG_UUID(as_uuid=True), index=True, nullable=True)
+    callback_url = Column(String(1024), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String(1024), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+Index('ix_ai_jobs_status_run_after', AiJob.status, AiJob.run_after)
+
+
+class IngestionRun(Base):
+    """One weather/market ingestion cycle and how it went."""
+    __tablename__ = 'ingestion_runs'
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    job = Column(String(32), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration_s = Column(Float, nullable=False)
+    interval_s = Column(Float, nullable=False)
+    overran = Column(Boolean, nullable=False, default=False)
+    villages_attempted = Column(Integer, nullable=False, default=0)
+    villages_skipped = Column(Integer, nullable=False, default=0)
+    villages_failed = Column(Integer, nullable=False, default=0)
+    villages_written = Column(Integer, nullable=False, default=0)
+    rows_written = Column(Integer, nullable=False, default=0)
+    rows_per_second = Column(Float, nullable=False, default=0)
+    upstream_calls = Column(Integer, nullable=False, default=0)
+    upstream_retries = Column(Integer, nullable=False, default=0)
+    upstream_p50_ms = Column(Float, nullable=True)
+    upstream_p95_ms = Column(Float, nullable=True)
+    upstream_max_ms = Column(Float, nullable=True)
+    error = Column(String(1024), nullable=True)
+
+Index('ix_ingestion_runs_job_started_at', IngestionRun.job, IngestionRun.started_at)
+
+
+class AppStat(Base):
+    """Maintained counters (row counts, maxima) read by the summary endpoints.
+    Each counter is spread over several ``shard`` rows to avoid lock contention."""
+    __tablename__ = 'app_stats'
+    key = Column(String(64), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class CityWeatherStat(Base):
+    """Running temperature sum/count per city for average-temperature reads."""
+    __tablename__ = 'city_weather_stats'
+    city = Column(String(128), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    temperature_sum = Column(Float, nullable=False, default=0)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TrendAggregate(Base):
+    """Incremental sum/count per (metric, period, bucket) for the admin trend charts."""
+    __tablename__ = 'trend_aggregates'
+    metric = Column(String(32), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    value_sum = Column(Float, nullable=False, default=0)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class RoleEnum(PyEnum):
     farmer = "farmer"
     admin = "admin"
@@ -0,0 +1,232 @@
+"""Monthly range partitioning for the append-only time-series tables.
+
+``weather_data`` is partitioned on ``recorded_at`` and ``market_prices`` on
+``created_at``.  Each calendar month (UTC) lives in its own child table, e.g.
+``weather_data_y2026m03``.  A ``<table>_default`` partition catches rows that
+fall outside the pre-created range so inserts never fail; rows parked there
+are moved into the proper month as soon as that partition is created.
+
+The worker calls :func:`ensure_partitions` daily so upcoming months always
+exist before the first row for them arrives.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from backend_service.config import (
+    PARTITION_MONTHS_AHEAD, WEATHER_LOOKBACK_DAYS, MARKET_LOOKBACK_DAYS,
+)
+
+logger = logging.getLogger('backend.partitions')
+
+# table name -> partition key column
+PARTITIONED_TABLES = {
+    'weather_data': 'recorded_at',
+    'market_prices': 'created_at',
+}
+
+
+def month_start(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    total = dt.year * 12 + (dt.month - 1) + months
+    return dt.replace(year=total // 12, month=total % 12 + 1)
+
+
+def iter_months(start: datetime, end: datetime) -> Iterator[datetime]:
+    """Yield the first instant of every month from ``start`` to ``end`` inclusive."""
+    cur = month_start(start)
+    last = month_start(end)
+    while cur <= last:
+        yield cur
+        cur = add_months(cur, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f'{table}_y{month.year}m{month.month:02d}'
+
+
+def default_partition_name(table: str) -> str:
+    return f'{table}_default'
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    row = conn.execute(
+        text(
+            'SELECT 1 FROM pg_partitioned_table pt '
+            'JOIN pg_class c ON c.oid = pt.partrelid '
+            'WHERE c.relname = :t AND c.relnamespace = current_schema()::regnamespace'
+        ),
+        {'t': table},
+    ).first()
+    return row is not None
+
+
+def _table_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text('SELECT to_regclass(:n)'), {'n': name}).scalar() is not None
+
+
+def create_default_partition(conn: Connection, table: str) -> None:
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT'
+    ))
+
+
+def create_month_partition(conn: Connection, table: str, month: datetime) -> bool:
+    """Create the partition for ``month``. Returns True if it was created.
+
+    If the default partition already holds rows for that month (written before
+    the partition existed), they are moved into the new partition before it is
+    attached — Postgres refuses to create an overlapping partition otherwise.
+    """
+    name = partition_name(table, month)
+    if _table_exists(conn, name):
+        return False
+
+    column = PARTITIONED_TABLES[table]
+    lower = month_start(month)
+    upper = add_months(lower, 1)
+    bounds = {'lo': lower, 'hi': upper}
+    default = default_partition_name(table)
+
+    stranded = _table_exists(conn, default) and conn.execute(
+        text(f'SELECT 1 FROM {default} WHERE {column} >= :lo AND {column} < :hi LIMIT 1'),
+        bounds,
+    ).first() is not None
+
+    range_sql = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    if not stranded:
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} {range_sql}'))
+    else:
+        conn.execute(text(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        moved = conn.execute(
+            text(
+                f'WITH moved AS (DELETE FROM {default} '
+                f'WHERE {column} >= :lo AND {column} < :hi RETURNING *) '
+                f'INSERT INTO {name} SELECT * FROM moved'
+            ),
+            bounds,
+        ).rowcount
+        conn.execute(text(f'ALTER TABLE {table} ATTACH PARTITION {name} {range_sql}'))
+        logger.info('Moved %s rows from %s into %s', moved, default, name)
+    logger.info('Created partition %s', name)
+    return True
+
+
+def ensure_partitions(conn: Connection, start: Optional[datetime] = None,
+                      months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """Make sure every partitioned table has monthly partitions from ``start``
+    (default: the current month) through ``months_ahead`` months from now.
+
+    Tables that are not (yet) partitioned are skipped, so this is safe to run
+    before the partitioning migration has been applied.  Returns the number of
+    partitions created.
+    """
+    now = datetime.now(timezone.utc)
+    start = start or now
+    end = add_months(month_start(now), months_ahead)
+    created = 0
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            logger.debug('%s is not partitioned — skipping', table)
+            continue
+        create_default_partition(conn, table)
+        for month in iter_months(start, end):
+            if create_month_partition(conn, table, month):
+                created += 1
+    return created
+
+
+def drop_partitions_before(conn: Connection, table: str, cutoff: datetime) -> int:
+    """Drop every monthly partition of ``table`` that ends at or before ``cutoff``.
+
+    Dropping a whole partition is far cheaper than a bulk DELETE and returns
+    the space immediately. Returns the number of partitions dropped.
+    """
+    if not is_partitioned(conn, table):
+        return 0
+    children = conn.execute(
+        text(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = :t'
+        ),
+        {'t': table},
+    ).scalars().all()
+    prefix = f'{table}_y'
+    dropped = 0
+    for name in children:
+        if not name.startswith(prefix):
+            continue  # default partition
+        try:
+            year, month = name[len(prefix):].split('m')
+            upper = add_months(datetime(int(year), int(month), 1, tzinfo=timezone.utc), 1)
+        except ValueError:
+            continue
+        if upper <= cutoff:
+            conn.execute(text(f'ALTER TABLE {table} DETACH PARTITION {name}'))
+            conn.execute(text(f'DROP TABLE {name}'))
+            logger.info('Dropped partition %s', name)
+            dropped += 1
+    return dropped
+
+
+def after_create_partitioned(target, connection, **kw) -> None:
+    """``after_create`` hook so ``Base.metadata.create_all`` yields a usable
+    partitioned table (a parent with no partitions rejects every insert)."""
+    create_default_partition(connection, target.name)
+    now = datetime.now(timezone.utc)
+    for month in iter_months(now, add_months(now, PARTITION_MONTHS_AHEAD)):
+        create_month_partition(connection, target.name, month)
+
+
+# ── Partition-pruning helpers ────────────────────────────────────────
+# "Latest N rows" queries must carry a lower bound on the partition key,
+# otherwise Postgres has to probe every monthly partition. The bound is only
+# an optimization: when the window holds fewer than N rows, latest_rows()
+# fetches the remainder from before it, so the result is the same as an
+# unbounded query (seeded or demo data, a stalled feed, a sparse market).
+
+def weather_window_start(days: int = WEATHER_LOOKBACK_DAYS) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def market_window_start(days: int = MARKET_LOOKBACK_DAYS) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _latest_stmt(model, column, limit: int, criteria, since: Optional[datetime] = None,
+                 before: Optional[datetime] = None):
+    stmt = select(model).where(*criteria)
+    if since is not None:
+        stmt = stmt.where(column >= since)
+    if before is not None:
+        stmt = stmt.where(column < before)
+    return stmt.order_by(column.desc()).limit(limit)
+
+
+def latest_rows(db, model, column, since: datetime, limit: int, *criteria) -> list:
+    """Newest ``limit`` rows of ``model`` matching ``criteria`` (sync session).
+    Rows from before ``since`` are only read when the window has too few."""
+    rows = list(db.execute(_latest_stmt(model, column, limit, criteria, since=since)).scalars().all())
+    if len(rows) < limit:
+        rows += db.execute(_latest_stmt(model, column, limit - len(rows), criteria, before=since)).scalars().all()
+    return rows
+
+
+async def latest_rows_async(session, model, column, since: datetime, limit: int, *criteria) -> list:
+    """:func:`latest_rows` for an ``AsyncSession``."""
+    rows = list((await session.execute(_latest_stmt(model, column, limit, criteria, since=since))).scalars().all())
+    if len(rows) < limit:
+        older = await session.execute(_latest_stmt(model, column, limit - len(rows), criteria, before=since))
+        rows += older.scalars().all()
+    return rows
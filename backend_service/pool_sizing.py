@@ -0,0 +1,79 @@
+"""Connection-pool sizes for the sync (psycopg2) and async (asyncpg) engines.
+
+Pool settings apply per engine and per process. N server processes with
+both engines can therefore hold ``N × 2 × (pool_size + max_overflow)``
+connections, and nothing keeps that under Postgres ``max_connections``.
+
+With ``DB_CONNECTION_BUDGET`` set, every process takes an equal share,
+``budget // WEB_CONCURRENCY``. That share is split between the engines by
+``DB_ASYNC_POOL_SHARE``. Half of each engine's part stays open
+(``pool_size``) and the rest is burst (``max_overflow``), so the processes
+together never exceed the budget. gunicorn.conf.py sets the budget from the
+server's ``max_connections`` minus the ingestion worker's own budget
+(``DB_WORKER_CONNECTION_BUDGET``) and ``DB_RESERVED_CONNECTIONS``
+(migrations, admin sessions). When several hosts share one database, set it
+by hand to this host's share.
+
+Without a budget, ``DB_POOL_SIZE`` / ``DB_MAX_OVERFLOW`` apply to each
+engine as before. Lambda keeps 1 + 2 per engine.
+
+``DB_PGBOUNCER`` is for PgBouncer in transaction mode, where consecutive
+transactions of one client connection may run on different server
+connections:
+
+* asyncpg's named prepared statements would outlive their transaction and
+  collide on, or be missing from, the next server connection. Its
+  statement caches are off, and each statement gets a unique name.
+* Lambda uses ``NullPool``. A frozen instance then holds no connections,
+  and a cold start only pays for a cheap client connection to PgBouncer.
+  Long-running processes keep their pools: idle client connections cost
+  PgBouncer almost nothing, and it multiplexes them onto its server pool.
+"""
+import os
+from typing import Any, Dict, Tuple
+from uuid import uuid4
+
+from sqlalchemy.pool import NullPool
+
+from backend_service.config import (
+    DB_ASYNC_POOL_SHARE, DB_CONNECTION_BUDGET, DB_MAX_OVERFLOW, DB_PGBOUNCER, DB_POOL_SIZE, WEB_CONCURRENCY,
+)
+
+SYNC, ASYNC = 'sync', 'async'
+
+_is_lambda = bool(os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
+
+
+def pool_limits(kind: str) -> Tuple[int, int]:
+    """``(pool_size, max_overflow)`` for the ``SYNC`` or ``ASYNC`` engine."""
+    if _is_lambda:
+        return 1, 2
+    if DB_CONNECTION_BUDGET <= 0:
+        return DB_POOL_SIZE, DB_MAX_OVERFLOW
+    per_process = max(2, DB_CONNECTION_BUDGET // max(1, WEB_CONCURRENCY))
+    async_share = min(per_process - 1, max(1, round(per_process * DB_ASYNC_POOL_SHARE)))
+    share = async_share if kind == ASYNC else per_process - async_share
+    pool_size = max(1, share // 2)
+    return pool_size, share - pool_size
+
+
+def _statement_name() -> str:
+    return f'__asyncpg_{uuid4().hex}__'
+
+
+def engine_options(kind: str) -> Dict[str, Any]:
+    """Pool and driver keyword arguments for the ``SYNC`` or ``ASYNC`` engine."""
+    options: Dict[str, Any] = {'pool_pre_ping': kind == SYNC}
+    if DB_PGBOUNCER and kind == ASYNC:
+        options['connect_args'] = {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': _statement_name,
+        }
+    if DB_PGBOUNCER and _is_lambda:
+        options['poolclass'] = NullPool
+        return options
+    pool_size, max_overflow = pool_limits(kind)
+    options.update(pool_size=pool_size, max_overflow=max_overflow,
+                   pool_recycle=300)  # recycle stale connections every 5 min
+    return options
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 from uuid import UUID
 
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
 from backend_service.services import ai_analysis_service
 from backend_service.core.dependencies import require_role, get_current_active_user
 from backend_service.models import RoleEnum
 from backend_service import cache
+from backend_service.database import get_db
 
 router = APIRouter(prefix="/ai")
 
 
+class JobRequest(BaseModel):
+    callback_url: Optional[str] = Field(None, max_length=1024, regex=r"^https?://")
+
+
 @router.post('/farmer/ai-analysis')
 async def farmer_ai_analysis(payload: dict, current_user=Depends(require_role(RoleEnum.farmer))):
     farmer_id = payload.get('farmer_id') or getattr(current_user, 'id', None)
@@ -19,7 +28,8 @@ async def farmer_ai_analysis(payload: dict, current_user=Depends(require_role(Ro
     if cached:
         return cached
     res = await ai_analysis_service.generate_farmer_analysis(UUID(str(farmer_id)))
-    await cache.set_cached(key, res, ttl=12 * 3600)
+    if not res.get('is_fallback'):
+        await cache.set_cached(key, res, ttl=12 * 3600)
     return res
 
 
@@ -30,5 +40,42 @@ async def admin_ai_analysis(village_id: UUID, current_user=Depends(require_role(
     if cached:
         return cached
     res = await ai_analysis_service.generate_village_analysis(village_id)
-    await cache.set_cached(key, res, ttl=12 * 3600)
+    if not res.get('is_fallback'):
+        await cache.set_cached(key, res, ttl=12 * 3600)
     return res
+
+
+@router.post('/admin/ai-analysis/{village_id}/jobs', status_code=status.HTTP_202_ACCEPTED)
+def admin_ai_analysis_job(
+    village_id: UUID,
+    payload: Optional[JobRequest] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_role(RoleEnum.admin)),
+):
+    """Queue a village analysis; poll the returned ``status_url``."""
+    from backend_service.services import job_service
+    try:
+        job = job_service.enqueue(
+            db, job_service.VILLAGE_ANALYSIS, {'village_id': str(village_id)},
+            owner_id=current_user.id, callback_url=payload.callback_url if payload else None,
+        )
+    except job_service.CallbackRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return job_service.serialize_job(job)
+
+
+@router.get('/admin/stats')
+async def ai_admin_stats(current_user=Depends(require_role(RoleEnum.admin))):
+    from backend_service.services.bedrock_limiter import bedrock_limiter
+    from backend_service.services.circuit_breaker import bedrock_breaker
+    from backend_service.services.json_extract import get_parse_stats
+    from backend_service.services import advisory_precompute_service
+    return {
+        'response_cache': ai_analysis_service.get_response_cache_stats(),
+        'bedrock_limiter': bedrock_limiter.snapshot(),
+        'bedrock_breaker': bedrock_breaker.snapshot(),
+        'bedrock_usage': ai_analysis_service.get_usage_stats(),
+        'village_batches': ai_analysis_service.get_batch_stats(),
+        'structured_output': get_parse_stats(),
+        'last_precompute': await advisory_precompute_service.last_run(),
+    }
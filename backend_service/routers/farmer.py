@@ -8,9 +8,12 @@ from sqlalchemy import func, desc
 
 from backend_service.database import get_db
 from backend_service.models import (
-    Village, WeatherData, MarketPrice, SoilHealth, RiskScore,
+    Village, WeatherData, MarketPrice, SoilHealth, LatestRiskScore, VILLAGE_SCOPE,
 )
 from backend_service.core.dependencies import get_current_active_user
+from backend_service.core.query_stats import query_budget
+from backend_service.partitions import latest_rows, weather_window_start, market_window_start
+from backend_service.services.weather_rollup_service import weather_history, weather_record
 
 router = APIRouter(prefix="/farmer", tags=["farmer"])
 logger = logging.getLogger("backend.farmer")
@@ -18,6 +21,7 @@ logger = logging.getLogger("backend.farmer")
 
 # ── Village list (for VillageSelector) ──────────────────────────
 @router.get("/villages")
+@query_budget(2)  # user lookup + one query
 def list_villages(db: Session = Depends(get_db), _user=Depends(get_current_active_user)):
     rows = db.query(Village).order_by(Village.name).all()
     return [
@@ -45,9 +49,8 @@ async def village_risk(
     # Wrap sync ORM call in to_thread to avoid blocking the event loop
     def _fetch_stored():
         return (
-            db.query(RiskScore)
-            .filter(RiskScore.village_id == village_id)
-            .order_by(desc(RiskScore.calculated_at))
+            db.query(LatestRiskScore)
+            .filter(LatestRiskScore.village_id == village_id, LatestRiskScore.farmer_id == VILLAGE_SCOPE)
             .first()
         )
 
@@ -74,32 +77,12 @@ def village_weather(
     db: Session = Depends(get_db),
     _user=Depends(get_current_active_user),
 ):
-    rows = (
-        db.query(WeatherData)
-        .filter(WeatherData.village_id == village_id)
-        .order_by(desc(WeatherData.recorded_at))
-        .limit(limit)
-        .all()
-    )
-    if not rows:
+    # Raw rows first, then hourly/daily rollups for older history
+    records = weather_history(db, village_id, limit)
+    if not records:
         # Fallback: try city-based weather (any)
-        rows = (
-            db.query(WeatherData)
-            .order_by(desc(WeatherData.recorded_at))
-            .limit(limit)
-            .all()
-        )
-    records = [
-        {
-            "temperature": r.temperature,
-            "humidity": r.humidity,
-            "rainfall": r.rainfall or 0,
-            "wind_speed": r.wind_speed or 0,
-            "description": r.description or "",
-            "recorded_at": r.recorded_at.isoformat() if r.recorded_at else None,
-        }
-        for r in rows
-    ]
+        rows = latest_rows(db, WeatherData, WeatherData.recorded_at, weather_window_start(), limit)
+        records = [weather_record(r) for r in rows]
     # Summary for the quick-stat cards
     latest = records[0] if records else {}
     return {
@@ -122,20 +105,11 @@ def village_market(
     db: Session = Depends(get_db),
     _user=Depends(get_current_active_user),
 ):
+    since = market_window_start()
     rows = (
-        db.query(MarketPrice)
-        .filter(MarketPrice.village_id == village_id)
-        .order_by(desc(MarketPrice.created_at))
-        .limit(limit)
-        .all()
+        latest_rows(db, MarketPrice, MarketPrice.created_at, since, limit, MarketPrice.village_id == village_id)
+        or latest_rows(db, MarketPrice, MarketPrice.created_at, since, limit)
     )
-    if not rows:
-        rows = (
-            db.query(MarketPrice)
-            .order_by(desc(MarketPrice.created_at))
-            .limit(limit)
-            .all()
-        )
     markets = [
         {
             "commodity": r.commodity,
@@ -218,9 +192,36 @@ async def village_advisory(
 
     try:
         res = await ai_analysis_service.generate_village_analysis(village_id)
-        await cache.set_cached(key, res, ttl=12 * 3600)
+        if not res.get("is_fallback"):
+            await cache.set_cached(key, res, ttl=12 * 3600)
         recs = res.get("recommendations", [])
         return {"items": recs if recs else ["AI analysis temporarily unavailable"]}
     except Exception:
         logger.exception("Advisory generation failed")
         return {"items": ["AI advisory temporarily unavailable. Please try again later."]}
+
+
+@router.get("/{village_id}/advisory/stream")
+async def village_advisory_stream(
+    village_id: UUID,
+    _user=Depends(get_current_active_user),
+):
+    """SSE variant of the advisory: ``token`` events while the model writes,
+    then one ``result`` event with the validated analysis."""
+    from backend_service.services import ai_analysis_service
+    from backend_service import cache
+    from backend_service.core.sse import sse_response
+
+    key = f"ai:village:{village_id}"
+
+    async def events():
+        cached = await cache.get_cached(key)
+        if cached:
+            yield "result", cached
+            return
+        async for event, data in ai_analysis_service.stream_village_analysis(village_id):
+            if event == "result" and not data.get("is_fallback"):
+                await cache.set_cached(key, data, ttl=12 * 3600)
+            yield event, data
+
+    return sse_response(events())
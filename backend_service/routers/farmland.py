@@ -10,8 +10,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from backend_service.database import get_db
-from backend_service.models import Farmland, Village, WeatherData, MarketPrice, RiskScore
+from backend_service.models import Farmland, Village, WeatherData, MarketPrice, LatestRiskScore, VILLAGE_SCOPE
 from backend_service.core.dependencies import get_current_active_user
+from backend_service.partitions import latest_rows, weather_window_start, market_window_start
 
 router = APIRouter(prefix="/farmland", tags=["farmland"])
 logger = logging.getLogger("backend.farmland")
@@ -210,13 +211,49 @@ def delete_farmland(
 
 
 # ── AI Insight for a farmland ───────────────────────────────────
-@router.post("/{farmland_id}/ai-insight")
-async def farmland_ai_insight(
+class AiInsightRequest(BaseModel):
+    callback_url: Optional[str] = Field(None, max_length=1024, regex=r"^https?://")
+
+
+@router.post("/{farmland_id}/ai-insight", status_code=status.HTTP_202_ACCEPTED)
+def farmland_ai_insight(
+    farmland_id: UUID,
+    payload: Optional[AiInsightRequest] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    """Queue AI insight generation. Poll the returned ``status_url`` (or wait
+    for ``callback_url``); the finished insight is also saved on the farmland."""
+    f = db.query(Farmland.id).filter(Farmland.id == farmland_id, Farmland.farmer_id == current_user.id).first()
+    if not f:
+        raise HTTPException(status_code=404, detail="Farmland not found")
+
+    from backend_service.services import job_service
+    from backend_service.models import RoleEnum
+    callback_url = payload.callback_url if payload else None
+    if callback_url and current_user.role != RoleEnum.admin.value and not job_service.callback_hosts_configured():
+        raise HTTPException(status_code=403, detail="callback_url is admin only unless AI_JOB_CALLBACK_HOSTS is set")
+    try:
+        job = job_service.enqueue(
+            db, job_service.FARMLAND_INSIGHT, {"farmland_id": str(farmland_id)},
+            owner_id=current_user.id, callback_url=callback_url,
+        )
+    except job_service.CallbackRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return job_service.serialize_job(job)
+
+
+@router.get("/{farmland_id}/ai-insight/stream")
+async def farmland_ai_insight_stream(
     farmland_id: UUID,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
+    """SSE variant of the AI insight. The final ``result`` event carries the
+    insight after it has been saved on the farmland."""
     import asyncio
+    from backend_service.services.ai_analysis_service import stream_farmland_analysis, save_farmland_insight
+    from backend_service.core.sse import sse_response
 
     def _fetch():
         return db.query(Farmland).filter(
@@ -227,20 +264,14 @@ async def farmland_ai_insight(
     if not f:
         raise HTTPException(status_code=404, detail="Farmland not found")
 
-    from backend_service.services.ai_analysis_service import generate_farmland_analysis
-    insight = await generate_farmland_analysis(f, db)
+    async def events():
+        async for event, data in stream_farmland_analysis(f, db):
+            # Never overwrite a stored insight with a fallback or stale copy
+            if event == "result" and (not data.get("is_fallback") or not f.ai_insight):
+                await asyncio.to_thread(save_farmland_insight, db, f, data)
+            yield event, data
 
-    # Persist insight on farmland — run sync ORM write in thread
-    def _persist():
-        f.ai_insight = insight
-        if isinstance(insight, dict) and "risk_score" in insight:
-            f.risk_score = insight["risk_score"]
-            f.risk_level = insight.get("risk_level", _risk_level(insight["risk_score"]))
-        db.commit()
-        db.refresh(f)
-
-    await asyncio.to_thread(_persist)
-    return _serialize_farmland(f)
+    return sse_response(events())
 
 
 # ── Summary for admin: all farmlands across all farmers ─────────
@@ -292,13 +323,8 @@ def _compute_farmland_risk(db: Session, village_id: UUID, crop_type: Optional[st
     score = 0.0
 
     # Weather component (0-40)
-    weather = (
-        db.query(WeatherData)
-        .filter(WeatherData.village_id == village_id)
-        .order_by(desc(WeatherData.recorded_at))
-        .limit(7)
-        .all()
-    )
+    weather = latest_rows(db, WeatherData, WeatherData.recorded_at, weather_window_start(), 7,
+                          WeatherData.village_id == village_id)
     if weather:
         temps = [w.temperature for w in weather if w.temperature is not None]
         avg_temp = sum(temps) / len(temps) if temps else 28
@@ -318,13 +344,8 @@ def _compute_farmland_risk(db: Session, village_id: UUID, crop_type: Optional[st
         score += 20  # no data = moderate risk
 
     # Market component (0-30)
-    market = (
-        db.query(MarketPrice)
-        .filter(MarketPrice.village_id == village_id)
-        .order_by(desc(MarketPrice.created_at))
-        .limit(7)
-        .all()
-    )
+    market = latest_rows(db, MarketPrice, MarketPrice.created_at, market_window_start(), 7,
+                         MarketPrice.village_id == village_id)
     if crop_type and market:
         crop_prices = [m.modal_price for m in market if m.commodity and m.commodity.lower() == crop_type.lower() and m.modal_price]
         if len(crop_prices) >= 2:
@@ -337,9 +358,8 @@ def _compute_farmland_risk(db: Session, village_id: UUID, crop_type: Optional[st
 
     # Stored risk (0-10)
     stored = (
-        db.query(RiskScore)
-        .filter(RiskScore.village_id == village_id)
-        .order_by(desc(RiskScore.calculated_at))
+        db.query(LatestRiskScore)
+        .filter(LatestRiskScore.village_id == village_id, LatestRiskScore.farmer_id == VILLAGE_SCOPE)
         .first()
     )
     if stored:
@@ -0,0 +1,26 @@
+"""Status of queued AI jobs (see services/job_service.py)."""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from backend_service.database import get_db
+from backend_service.models import AiJob, RoleEnum
+from backend_service.core.dependencies import get_current_active_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    from backend_service.services import job_service
+
+    job = db.query(AiJob).filter(AiJob.id == job_id).first()
+    # Other users' jobs are reported as missing rather than forbidden.
+    if not job or (job.owner_id != current_user.id and current_user.role != RoleEnum.admin.value):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_service.serialize_job(job)
@@ -0,0 +1,149 @@
+"""Nightly precomputation of village advisories.
+
+Without this, the first farmer to open the advisory after the cache expires
+pays the full Bedrock latency. The worker runs :func:`precompute_village_advisories`
+before the morning peak; for each village it compares the content hash of a
+rounded view of today's prompt inputs (sensor noise is not a change) with
+the newest ``village`` AiReport:
+
+* unchanged  – the stored report is (re)published to ``ai:village:{id}``
+  without calling Bedrock;
+* changed    – the analysis is regenerated at batch priority, several
+  villages per request (see ``generate_village_analyses``), subject to a
+  per-run call budget and a calls-per-minute pace;
+* over budget – the village is left for lazy generation and counted as
+  deferred; the same happens while Bedrock's circuit breaker is open.
+
+Each run's coverage and estimated cost are logged and kept in Redis
+(``ai:precompute:last``) for ``GET /ai/admin/stats``.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text, select
+
+from backend_service import cache
+from backend_service.config import (
+    AI_PRECOMPUTE_MAX_CALLS, AI_PRECOMPUTE_CALLS_PER_MINUTE, AI_PRECOMPUTE_CACHE_TTL, AI_BATCH_SIZE,
+)
+from backend_service.database_async import AsyncSessionLocal as async_session
+from backend_service.models import Village
+from backend_service.services import ai_analysis_service
+from backend_service.services.bedrock_limiter import BATCH
+from backend_service.services.circuit_breaker import bedrock_breaker, CLOSED
+
+logger = logging.getLogger('backend.advisory_precompute')
+
+LAST_RUN_KEY = 'ai:precompute:last'
+
+_LATEST_REPORTS_SQL = text("""
+SELECT DISTINCT ON (village_id) village_id, input_hash, content
+FROM ai_reports
+WHERE report_type = 'village' AND village_id IS NOT NULL
+ORDER BY village_id, created_at DESC
+""")
+
+
+def village_cache_key(village_id) -> str:
+    return f"ai:village:{village_id}"
+
+
+async def precompute_village_advisories(max_calls: int = AI_PRECOMPUTE_MAX_CALLS,
+                                        calls_per_minute: float = AI_PRECOMPUTE_CALLS_PER_MINUTE) -> Dict[str, Any]:
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    async with async_session() as session:
+        village_ids = (await session.execute(select(Village.id).order_by(Village.name))).scalars().all()
+        latest = {
+            row.village_id: row
+            for row in (await session.execute(_LATEST_REPORTS_SQL)).all()
+        }
+
+    report = {
+        'villages': len(village_ids), 'warm': 0, 'republished': 0, 'generated': 0,
+        'fallback': 0, 'deferred': 0, 'errors': 0,
+    }
+    interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+    next_call_at = 0.0
+
+    with ai_analysis_service.usage_scope() as usage:
+        pending = []
+        for village_id in village_ids:
+            key = village_cache_key(village_id)
+            try:
+                input_hash = await ai_analysis_service.village_input_hash(village_id)
+                prev = latest.get(village_id)
+
+                if prev is not None and prev.input_hash == input_hash and isinstance(prev.content, dict):
+                    if await cache.get_cached(key):
+                        report['warm'] += 1
+                    else:
+                        await cache.set_cached(key, prev.content, ttl=AI_PRECOMPUTE_CACHE_TTL)
+                        report['republished'] += 1
+                    continue
+                pending.append(village_id)
+            except Exception:
+                logger.exception('Advisory precompute failed for village %s', village_id)
+                report['errors'] += 1
+
+        # Changed villages go to Bedrock AI_BATCH_SIZE at a time — one paced
+        # call per batch, plus single calls for entries the batch reply missed.
+        for i in range(0, len(pending), max(1, AI_BATCH_SIZE)):
+            batch = pending[i:i + max(1, AI_BATCH_SIZE)]
+            if usage['calls'] >= max_calls or bedrock_breaker.state != CLOSED:
+                report['deferred'] += len(batch)
+                continue
+
+            wait = next_call_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            calls_before = usage['calls']
+            try:
+                results = await ai_analysis_service.generate_village_analyses(batch, priority=BATCH)
+            except Exception:
+                logger.exception('Advisory precompute failed for villages %s', batch)
+                report['errors'] += len(batch)
+                continue
+            if usage['calls'] > calls_before:
+                next_call_at = time.monotonic() + interval * (usage['calls'] - calls_before)
+
+            for village_id, res in results.items():
+                if res.get('is_fallback'):
+                    report['fallback'] += 1
+                    continue
+                await cache.set_cached(village_cache_key(village_id), res, ttl=AI_PRECOMPUTE_CACHE_TTL)
+                report['generated'] += 1
+
+    covered = report['warm'] + report['republished'] + report['generated']
+    report.update({
+        'started_at': started_at.isoformat(),
+        'duration_s': round(time.perf_counter() - start, 1),
+        'coverage': round(covered / len(village_ids), 4) if village_ids else None,
+        'bedrock_calls': usage['calls'],
+        'input_tokens': usage['input_tokens'],
+        'output_tokens': usage['output_tokens'],
+        'estimated_cost_usd': ai_analysis_service.estimate_cost(usage),
+    })
+    logger.info(
+        'Advisory precompute: %d/%d villages covered (%d warm, %d republished, %d generated), '
+        '%d fallback, %d deferred, %d errors — %d Bedrock calls, ~$%.4f in %.1fs',
+        covered, report['villages'], report['warm'], report['republished'], report['generated'],
+        report['fallback'], report['deferred'], report['errors'],
+        report['bedrock_calls'], report['estimated_cost_usd'], report['duration_s'],
+    )
+    try:
+        await cache.set_cached(LAST_RUN_KEY, report, ttl=7 * 24 * 3600)
+    except Exception:
+        logger.warning('Could not store precompute report', exc_info=True)
+    return report
+
+
+async def last_run() -> Optional[Dict[str, Any]]:
+    try:
+        return await cache.get_cached(LAST_RUN_KEY)
+    except Exception:
+        logger.warning('Could not read precompute report', exc_info=True)
+        return None
@@ -1,31 +1,55 @@
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Union
 import asyncio
+import contextvars
+import hashlib
 import json
 import logging
 import os
+import threading
 import time
+from contextlib import contextmanager
 from uuid import UUID
 
-import boto3
-from botocore.config import Config
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from backend_service.models import AiReport, WeatherData, MarketPrice
 from backend_service.database_async import AsyncSessionLocal as async_session
+from backend_service.partitions import latest_rows, latest_rows_async, weather_window_start, market_window_start
+from backend_service.config import (
+    AI_RESPONSE_CACHE_TTL, AI_MODEL_BACKEND, AI_STUB_URL, BEDROCK_PRICE_INPUT_PER_1K, BEDROCK_PRICE_OUTPUT_PER_1K,
+    BEDROCK_TRANSPORT, BEDROCK_ENDPOINT_URL, AI_BATCH_SIZE, AI_BATCH_MAX_TOKENS,
+)
+from backend_service import cache
+from backend_service.core import tracing
+from backend_service.core.request_context import REQUEST_ID_HEADER, get_request_id
+from backend_service.metrics import track_outbound
+from backend_service.services.bedrock_limiter import bedrock_limiter, INTERACTIVE, BATCH, QueueTimeout
+from backend_service.services.circuit_breaker import bedrock_breaker, counts_as_outage, CircuitOpenError
+from backend_service.services.json_extract import JSONObjectScanner, extract_json, parse_report, check_entry, validate_report
 
 logger = logging.getLogger(__name__)
 
 PROMPT_VERSION = "1.0"
-REQUIRED_AI_KEYS = {'weather_analysis', 'market_analysis', 'risk_assessment', 'recommendations', 'summary'}
+DEFAULT_MODEL = 'amazon.nova-micro-v1:0'
 
 # Bedrock client configuration
 _bedrock_client = None
+_bedrock_http_client = None
 
 
 def _get_bedrock_client():
     global _bedrock_client
+    if _bedrock_client is None and AI_MODEL_BACKEND == 'fake':
+        from backend_service.services.fake_bedrock import FakeBedrockClient
+        _bedrock_client = FakeBedrockClient()
+        logger.warning("AI_MODEL_BACKEND=fake — using the local fake Bedrock client")
     if _bedrock_client is None:
+        # boto3/botocore take ~100 ms to import; only pay that on first use
+        # (keeps Lambda cold starts short).
+        import boto3
+        from botocore.config import Config
+
         region = os.getenv('AWS_REGION', 'us-east-1')
         cfg = Config(read_timeout=30, connect_timeout=10, retries={'max_attempts': 2})
 
@@ -38,26 +62,35 @@ def _get_bedrock_client():
                 'bedrock-runtime',
                 region_name=region,
                 config=cfg,
+                endpoint_url=BEDROCK_ENDPOINT_URL,
                 aws_access_key_id=aws_key,
                 aws_secret_access_key=aws_secret,
             )
             logger.info("Bedrock client created with explicit IAM credentials")
         else:
             # Fall back to default credential chain (EC2 instance role, env, etc.)
-            _bedrock_client = boto3.client('bedrock-runtime', region_name=region, config=cfg)
+            _bedrock_client = boto3.client('bedrock-runtime', region_name=region, config=cfg,
+                                           endpoint_url=BEDROCK_ENDPOINT_URL)
             logger.info("Bedrock client created with default credential chain")
+        _bedrock_client.meta.events.register('before-sign.bedrock-runtime', _add_request_id_header)
 
     return _bedrock_client
 
 
-def _build_request_body(prompt_text: str) -> str:
+def _add_request_id_header(request, **kwargs):
+    request_id = get_request_id()
+    if request_id:
+        request.headers[REQUEST_ID_HEADER] = request_id
+
+
+def _build_request_body(prompt_text: str, max_tokens: int = 1024) -> str:
     """Build a Nova-compatible request body (Messages API format)."""
     return json.dumps({
         "messages": [
             {"role": "user", "content": [{"text": prompt_text}]}
         ],
         "inferenceConfig": {
-            "maxTokens": 1024,
+            "maxTokens": max_tokens,
             "temperature": 0.3,
             "topP": 0.9,
         }
@@ -83,40 +116,331 @@ def _parse_model_response(raw_body: str) -> Optional[str]:
         return raw_body
 
 
-async def _invoke_bedrock(prompt: str, model: str = 'amazon.nova-micro-v1:0', timeout: int = 30) -> Optional[str]:
-    """Invoke Bedrock in a thread to avoid blocking the event loop. Includes latency logging."""
+def _stream_chunk_data(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    chunk = event.get('chunk') if isinstance(event, dict) else None
+    if not chunk or not chunk.get('bytes'):
+        return None
+    try:
+        data = json.loads(chunk['bytes'])
+    except (ValueError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _parse_stream_chunk(event: Dict[str, Any]) -> Optional[str]:
+    """Text delta from one ``invoke_model_with_response_stream`` event."""
+    data = _stream_chunk_data(event)
+    if data is None:
+        return None
+    # Nova Messages API streaming format
+    delta = data.get('contentBlockDelta', {}).get('delta', {})
+    if 'text' in delta:
+        return delta['text']
+    # Fallback: Titan streaming format
+    return data.get('outputText')
+
+
+def _parse_stream_usage(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Token counts from the stream's closing metadata event, shaped like the
+    ``usage`` of a blocking response; None for every other event."""
+    data = _stream_chunk_data(event)
+    if data is None:
+        return None
+    usage = data.get('metadata', {}).get('usage')
+    if usage:
+        return usage
+    # Added by Bedrock to the last chunk of every model's stream
+    metrics = data.get('amazon-bedrock-invocationMetrics')
+    if metrics:
+        return {'inputTokens': metrics.get('inputTokenCount'), 'outputTokens': metrics.get('outputTokenCount')}
+    return None
+
+
+# ── Usage accounting ───────────────────────────────────────────────
+# Process-wide totals, plus an optional per-task scope (see usage_scope) so a
+# batch run can report exactly what it spent.
+_usage_totals = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+_usage_scope = contextvars.ContextVar('bedrock_usage', default=())
+
+
+def _record_usage(raw_body: Optional[str]) -> None:
+    usage = {}
+    try:
+        usage = json.loads(raw_body).get('usage', {}) if raw_body else {}
+    except (ValueError, AttributeError):
+        pass
+    _count_usage(usage)
+
+
+def _count_usage(usage: Dict[str, Any]) -> None:
+    """Count one call with ``usage`` (``inputTokens`` / ``outputTokens``)."""
+    delta = {
+        'calls': 1,
+        'input_tokens': int(usage.get('inputTokens') or 0),
+        'output_tokens': int(usage.get('outputTokens') or 0),
+    }
+    for counters in (_usage_totals, *_usage_scope.get()):
+        for k, v in delta.items():
+            counters[k] = counters.get(k, 0) + v
+
+
+def estimate_cost(usage: Dict[str, int]) -> float:
+    """USD estimate for ``usage`` at the configured per-1K-token prices."""
+    return round(
+        usage.get('input_tokens', 0) / 1000 * BEDROCK_PRICE_INPUT_PER_1K
+        + usage.get('output_tokens', 0) / 1000 * BEDROCK_PRICE_OUTPUT_PER_1K,
+        6,
+    )
+
+
+@contextmanager
+def usage_scope():
+    """Collect the Bedrock usage of every call made in this context. Scopes
+    nest: a call counts towards every enclosing scope."""
+    counters = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+    token = _usage_scope.set((*_usage_scope.get(), counters))
+    try:
+        yield counters
+    finally:
+        _usage_scope.reset(token)
+
+
+def get_usage_stats() -> Dict[str, Any]:
+    return {**_usage_totals, 'estimated_cost_usd': estimate_cost(_usage_totals)}
+
+
+def _use_http_transport() -> bool:
+    if AI_MODEL_BACKEND == 'stub':
+        return True
+    return AI_MODEL_BACKEND == 'bedrock' and BEDROCK_TRANSPORT == 'httpx'
+
 
+def _get_http_client():
+    global _bedrock_http_client
+    if _bedrock_http_client is None:
+        from botocore.credentials import Credentials
+        from backend_service.services.bedrock_http import BedrockHTTPClient
+
+        endpoint_url = BEDROCK_ENDPOINT_URL
+        aws_key = os.getenv('AWS_ACCESS_KEY_ID', '')
+        aws_secret = os.getenv('AWS_SECRET_ACCESS_KEY', '')
+        creds = Credentials(aws_key, aws_secret, os.getenv('AWS_SESSION_TOKEN') or None) if aws_key and aws_secret else None
+        if AI_MODEL_BACKEND == 'stub':
+            # The stub does not check signatures; sign with placeholders.
+            endpoint_url, creds = AI_STUB_URL, Credentials('stub', 'stub')
+        _bedrock_http_client = BedrockHTTPClient(
+            region=os.getenv('AWS_REGION', 'us-east-1'), endpoint_url=endpoint_url, credentials=creds,
+        )
+        logger.info("Bedrock async HTTP client created for %s", _bedrock_http_client.endpoint_url)
+    return _bedrock_http_client
+
+
+def _handle_bedrock_error(exc: BaseException) -> None:
+    """Drop cached clients only when the credentials are the problem; any
+    other error keeps the client (and its warm connection pool)."""
+    from backend_service.services.bedrock_http import is_credential_error
+
+    global _bedrock_client, _bedrock_http_client
+    if is_credential_error(exc):
+        logger.warning('Bedrock credential error — resetting clients')
+        _bedrock_client = None
+        if _bedrock_http_client is not None:
+            asyncio.get_running_loop().create_task(_bedrock_http_client.aclose())
+            _bedrock_http_client = None
+
+
+async def _send_bedrock(body: str, model: str, timeout: float, priority: int) -> Optional[str]:
+    """One raw InvokeModel call under the concurrency limiter, without
+    blocking the event loop: natively async over httpx, or boto3 on the
+    dedicated pool. Waiting for a slot and the call itself are each bounded
+    by ``timeout``. A slot wait that runs out raises :class:`QueueTimeout`,
+    which the breaker ignores."""
     def call():
         client = _get_bedrock_client()
-        body = _build_request_body(prompt)
-        response = client.invoke_model(body=body, modelId=model, contentType='application/json', accept='application/json')
-        resp_body = response.get('body')
-        if hasattr(resp_body, 'read'):
-            return resp_body.read().decode('utf-8')
-        return resp_body
+        with track_outbound('bedrock', 'invoke'):
+            response = client.invoke_model(body=body, modelId=model, contentType='application/json',
+                                           accept='application/json')
+            resp_body = response.get('body')
+            if hasattr(resp_body, 'read'):
+                return resp_body.read().decode('utf-8')
+            return resp_body
+
+    async def call_http():
+        with track_outbound('bedrock', 'invoke'):
+            return await _get_http_client().invoke_model(model, body)
+
+    if _use_http_transport():
+        return await bedrock_limiter.run_async(call_http, priority, queue_timeout=timeout, timeout=timeout)
+    return await bedrock_limiter.run(call, priority, queue_timeout=timeout, timeout=timeout)
+
+
+async def _invoke_bedrock(prompt: str, model: str = DEFAULT_MODEL, timeout: int = 30,
+                          priority: int = INTERACTIVE, max_tokens: int = 1024) -> Optional[str]:
+    """Invoke Bedrock behind the circuit breaker, with latency logging.
+    Returns None on failure — immediately, without a call, while the breaker
+    is open."""
+    with tracing.span('bedrock.invoke', {'bedrock.model': model, 'bedrock.prompt_version': PROMPT_VERSION,
+                                         'bedrock.priority': priority}):
+        if not bedrock_breaker.allow():
+            logger.info('Bedrock circuit open — skipping call')
+            tracing.annotate({'bedrock.outcome': 'circuit_open'})
+            return None
+        body = _build_request_body(prompt, max_tokens=max_tokens)
+
+        start = time.perf_counter()
+        try:
+            raw = await _send_bedrock(body, model, timeout, priority)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info("bedrock_latency_ms=%.1f model=%s prompt_version=%s", elapsed_ms, model, PROMPT_VERSION)
+            bedrock_breaker.record_success()
+            tracing.annotate({'bedrock.outcome': 'ok'})
+            _record_usage(raw)
+            return _parse_model_response(raw) if raw else None
+        except QueueTimeout as exc:
+            logger.warning('Bedrock call not started: %s', exc)
+            tracing.annotate({'bedrock.outcome': 'queue_timeout'})
+        except asyncio.TimeoutError as exc:
+            logger.error('Bedrock call timed out after %ds', timeout)
+            tracing.annotate({'bedrock.outcome': 'timeout'})
+            bedrock_breaker.record_failure(exc)
+        except Exception as exc:
+            if getattr(exc, 'response', None) is not None:
+                logger.error('Bedrock invocation failed: %s', exc)  # API error — no traceback needed
+            else:
+                logger.exception('Bedrock invocation failed')
+            tracing.annotate({'bedrock.outcome': 'error', 'bedrock.error': type(exc).__name__})
+            bedrock_breaker.record_failure(exc)
+            _handle_bedrock_error(exc)
+        return None
 
-    start = time.perf_counter()
+
+async def _probe_bedrock() -> bool:
+    """Half-open probe: a one-token call that bypasses the breaker."""
     try:
-        raw = await asyncio.wait_for(asyncio.to_thread(call), timeout=timeout)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        logger.info("bedrock_latency_ms=%.1f model=%s prompt_version=%s", elapsed_ms, model, PROMPT_VERSION)
-        return _parse_model_response(raw) if raw else None
-    except asyncio.TimeoutError:
-        logger.error('Bedrock call timed out after %ds', timeout)
-    except Exception:
-        logger.exception('Bedrock invocation failed')
-    # Reset cached client so next call retries with fresh credentials
-    global _bedrock_client
-    _bedrock_client = None
-    return None
+        await _send_bedrock(_build_request_body('ping', max_tokens=1), DEFAULT_MODEL, 10, BATCH)
+        return True
+    except Exception as exc:
+        if not counts_as_outage(exc):
+            return True  # throttled or rejected, but Bedrock answered
+        logger.warning('Bedrock probe failed: %s', exc)
+        _handle_bedrock_error(exc)
+        return False
 
 
-def _validate_ai_response(parsed: dict) -> dict:
-    """Ensure AI response has all required keys; fill defaults for missing ones."""
-    for key in REQUIRED_AI_KEYS:
-        if key not in parsed:
-            parsed[key] = "Not available"
-    return parsed
+bedrock_breaker.set_probe(_probe_bedrock)
+
+
+# First item from a stream source: the limiter slot is held and the call starts.
+_SLOT_ACQUIRED = object()
+
+
+async def _stream_events_http(body: str, model: str, priority: int,
+                              queue_timeout: float) -> AsyncIterator[Dict[str, Any]]:
+    async with bedrock_limiter.slot(priority, queue_timeout):
+        yield _SLOT_ACQUIRED
+        with track_outbound('bedrock', 'invoke_stream'):
+            async for event in _get_http_client().invoke_model_stream(model, body):
+                yield event
+
+
+async def _stream_events_thread(body: str, model: str, priority: int,
+                                queue_timeout: float) -> AsyncIterator[Dict[str, Any]]:
+    """boto3's blocking event-stream iterator runs on the Bedrock pool and
+    hands events to the event loop through a queue."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    stop = threading.Event()
+
+    def pump():
+        loop.call_soon_threadsafe(queue.put_nowait, _SLOT_ACQUIRED)
+        client = _get_bedrock_client()
+        with track_outbound('bedrock', 'invoke_stream'):
+            response = client.invoke_model_with_response_stream(
+                body=body, modelId=model, contentType='application/json', accept='application/json',
+            )
+            for event in response.get('body', ()):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def _on_done(t):
+        if not t.cancelled():
+            t.exception()  # mark retrieved; re-raised below via ``await task``
+        queue.put_nowait(finished)
+
+    task = asyncio.ensure_future(bedrock_limiter.run(pump, priority, queue_timeout=queue_timeout))
+    task.add_done_callback(_on_done)
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            yield item
+        await task  # surface errors raised by the reader thread
+    finally:
+        stop.set()
+        if not task.done():
+            task.cancel()
+
+
+async def _stream_bedrock(prompt: str, model: str = DEFAULT_MODEL, timeout: int = 30,
+                          priority: int = INTERACTIVE) -> AsyncIterator[str]:
+    """Yield text deltas from Bedrock's response-stream API as they arrive.
+
+    The stream holds a concurrency-limiter slot for its whole duration.
+    ``timeout`` bounds the wait for the slot (:class:`QueueTimeout`) and then
+    the wait for each event, not the whole reply. Raises
+    if the stream fails (:class:`CircuitOpenError` at once while the breaker
+    is open); closing the generator early stops the reader.
+    """
+    if not bedrock_breaker.allow():
+        raise CircuitOpenError('bedrock')
+    body = _build_request_body(prompt)
+    source = _stream_events_http if _use_http_transport() else _stream_events_thread
+    events = source(body, model, priority, timeout)
+    # Not the current span: the generator may be resumed in another context.
+    span = tracing.start_span('bedrock.stream', {'bedrock.model': model, 'bedrock.prompt_version': PROMPT_VERSION,
+                                                 'bedrock.priority': priority})
+    error = None
+    start = time.perf_counter()
+    first = True
+    usage: Dict[str, Any] = {}
+    try:
+        waiting_for_slot = True
+        while True:
+            try:
+                # The limiter bounds the slot wait itself, with QueueTimeout.
+                event = await (events.__anext__() if waiting_for_slot
+                               else asyncio.wait_for(events.__anext__(), timeout=timeout))
+            except StopAsyncIteration:
+                break
+            if event is _SLOT_ACQUIRED:
+                waiting_for_slot = False
+                continue
+            usage = _parse_stream_usage(event) or usage
+            text = _parse_stream_chunk(event)
+            if not text:
+                continue
+            if first:
+                first = False
+                logger.info("bedrock_ttft_ms=%.1f model=%s prompt_version=%s",
+                            (time.perf_counter() - start) * 1000, model, PROMPT_VERSION)
+                if span is not None:
+                    span.add_event('first_token')
+            yield text
+        bedrock_breaker.record_success()
+        _count_usage(usage)
+        logger.info("bedrock_latency_ms=%.1f model=%s prompt_version=%s stream=1",
+                    (time.perf_counter() - start) * 1000, model, PROMPT_VERSION)
+    except Exception as exc:
+        error = exc
+        bedrock_breaker.record_failure(exc)
+        _handle_bedrock_error(exc)
+        raise
+    finally:
+        await events.aclose()
+        tracing.end_span(span, error)
 
 
 def _fallback_response(village_id=None, farmer_id=None) -> dict:
@@ -131,77 +455,433 @@ def _fallback_response(village_id=None, farmer_id=None) -> dict:
     }
 
 
-async def generate_village_analysis(village_id: UUID) -> Dict[str, Any]:
-    """Fetch latest weather + market, build structured prompt, call Bedrock, validate & persist."""
+def _as_stale(content: Dict[str, Any], generated_at=None) -> Dict[str, Any]:
+    """Mark an earlier good report as served in place of a fresh one. It
+    counts as a fallback, so callers neither cache nor persist it."""
+    return {**content, 'is_fallback': True, 'is_stale': True,
+            'generated_at': str(generated_at) if generated_at else content.get('generated_at')}
+
+
+async def _last_good_report(report_type: str, village_id=None, farmer_id=None) -> Optional[Dict[str, Any]]:
+    """Newest successfully parsed report of ``report_type`` for the village
+    or farmer, marked stale, or None."""
     try:
-        async with async_session() as session:  # type: AsyncSession
-            q = select(WeatherData).where(WeatherData.village_id == village_id).order_by(WeatherData.recorded_at.desc()).limit(1)
-            res = await session.execute(q)
-            latest_weather = res.scalars().first()
+        async with async_session() as session:
+            q = select(AiReport.content, AiReport.created_at).where(
+                AiReport.report_type == report_type, AiReport.input_hash.isnot(None),
+            )
+            if village_id is not None:
+                q = q.where(AiReport.village_id == village_id)
+            if farmer_id is not None:
+                q = q.where(AiReport.farmer_id == farmer_id)
+            row = (await session.execute(q.order_by(AiReport.created_at.desc()).limit(1))).first()
+    except Exception:
+        logger.warning('Last-good %s report lookup failed', report_type, exc_info=True)
+        return None
+    if row is None or not isinstance(row.content, dict):
+        return None
+    return _as_stale(row.content, row.created_at)
 
-            q2 = select(MarketPrice).where(MarketPrice.village_id == village_id).order_by(MarketPrice.created_at.desc()).limit(7)
-            res2 = await session.execute(q2)
-            recent_market = [r for r in res2.scalars().all()]
 
-        prompt_data = {
-            "village_id": str(village_id),
-            "weather": {
-                "temperature": getattr(latest_weather, 'temperature', None),
-                "humidity": getattr(latest_weather, 'humidity', None),
-                "rainfall": getattr(latest_weather, 'rainfall', None),
-                "description": getattr(latest_weather, 'description', None),
-            },
-            "market": [
-                {"commodity": m.commodity, "modal_price": m.modal_price, "arrival_date": str(getattr(m, 'arrival_date', None))} for m in recent_market
-            ],
-        }
+async def _village_unavailable(village_id: UUID) -> Dict[str, Any]:
+    """What to serve when Bedrock produced nothing: the last good village
+    report if there is one, else the deterministic fallback."""
+    return await _last_good_report('village', village_id=village_id) or _fallback_response(village_id=village_id)
 
-        system_prompt = (
-            "You are an agricultural intelligence expert AI. "
-            "Analyze the following village data and return ONLY valid JSON with these exact keys: "
-            "weather_analysis, market_analysis, risk_assessment, recommendations, summary. "
-            "Do not include any text outside the JSON object."
-        )
-        full_prompt = system_prompt + "\n\nInput data:\n" + json.dumps(prompt_data, default=str)
 
-        result_text = await _invoke_bedrock(full_prompt)
-        if not result_text:
-            return _fallback_response(village_id=village_id)
+async def _farmer_unavailable(farmer_id: UUID) -> Dict[str, Any]:
+    return await _last_good_report('farmer', farmer_id=farmer_id) or _fallback_response(farmer_id=farmer_id)
 
-        # Attempt to extract JSON from response
-        parsed = None
-        try:
-            # Try to find JSON in the response
-            text = result_text.strip()
-            # Handle markdown code blocks
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            parsed = json.loads(text)
-        except (json.JSONDecodeError, IndexError):
-            parsed = {"summary": result_text}
-
-        parsed = _validate_ai_response(parsed)
-        parsed['prompt_version'] = PROMPT_VERSION
-
-        # Persist AI report (non-critical — don't lose the response on DB error)
-        try:
-            async with async_session() as session:
-                ai_report = AiReport(village_id=village_id, farmer_id=None, report_type='village', content=parsed)
-                session.add(ai_report)
-                await session.commit()
-        except Exception:
-            logger.exception('Failed to persist village AI report — returning analysis anyway')
 
-        return parsed
+# ── Content-addressed response cache ───────────────────────────────
+# Responses are keyed by what the model actually sees, not by which village
+# or farmer asked, so identical inputs share one Bedrock call. Redis holds the
+# hot copy; ai_reports.input_hash is the durable fallback.
+_IDENTITY_KEYS = frozenset({'village_id', 'farmer_id'})
+_response_cache_stats = {'redis_hits': 0, 'db_hits': 0, 'misses': 0, 'stores': 0, 'coalesced': 0}
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _input_hash(schema: str, prompt_data: Dict[str, Any], model: str = DEFAULT_MODEL) -> str:
+    """sha256 over (model, PROMPT_VERSION, schema, canonical prompt_data)."""
+    canonical = {k: v for k, v in prompt_data.items() if k not in _IDENTITY_KEYS}
+    payload = json.dumps(
+        {'model': model, 'prompt_version': PROMPT_VERSION, 'schema': schema, 'input': canonical},
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _response_key(input_hash: str) -> str:
+    return f"ai:resp:{input_hash}"
+
+
+async def _get_cached_response(input_hash: str) -> Optional[Dict[str, Any]]:
+    try:
+        hit = await cache.get_cached(_response_key(input_hash))
+        if isinstance(hit, dict):
+            _response_cache_stats['redis_hits'] += 1
+            return hit
+    except Exception:
+        logger.warning('AI response cache read failed', exc_info=True)
+
+    try:
+        async with async_session() as session:
+            q = (
+                select(AiReport.content)
+                .where(AiReport.input_hash == input_hash)
+                .order_by(AiReport.created_at.desc())
+                .limit(1)
+            )
+            content = (await session.execute(q)).scalars().first()
+        if isinstance(content, dict):
+            _response_cache_stats['db_hits'] += 1
+            try:
+                await cache.set_cached(_response_key(input_hash), content, ttl=AI_RESPONSE_CACHE_TTL)
+            except Exception:
+                logger.warning('AI response cache backfill failed', exc_info=True)
+            return content
+    except Exception:
+        logger.warning('AI response cache DB lookup failed', exc_info=True)
+
+    _response_cache_stats['misses'] += 1
+    return None
+
+
+async def _store_cached_response(input_hash: str, parsed: Dict[str, Any]) -> None:
+    _response_cache_stats['stores'] += 1
+    try:
+        await cache.set_cached(_response_key(input_hash), parsed, ttl=AI_RESPONSE_CACHE_TTL)
+    except Exception:
+        logger.warning('AI response cache write failed', exc_info=True)
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Per-process hit/miss counters for the content-addressed cache."""
+    stats = dict(_response_cache_stats)
+    lookups = stats['redis_hits'] + stats['db_hits'] + stats['misses']
+    stats['hit_rate'] = round((stats['redis_hits'] + stats['db_hits']) / lookups, 4) if lookups else None
+    return stats
+
+
+async def _single_flight(input_hash: str, fn: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    """Run ``fn`` once per input hash at a time: concurrent cache misses for
+    the same inputs await the first caller's model call instead of making
+    their own. The call runs as its own task, so a caller that disconnects
+    does not cancel it for the others (or lose the cache fill)."""
+    task = _inflight.get(input_hash)
+    if task is None:
+        task = asyncio.ensure_future(fn())
+        _inflight[input_hash] = task
+
+        def _done(t):
+            _inflight.pop(input_hash, None)
+            if not t.cancelled():
+                t.exception()  # retrieved here in case every caller went away
+
+        task.add_done_callback(_done)
+    else:
+        _response_cache_stats['coalesced'] += 1
+    return await asyncio.shield(task)
+
+
+async def _persist_report(report_type: str, parsed: Dict[str, Any], input_hash: Optional[str],
+                          village_id=None, farmer_id=None) -> None:
+    """Persist an AI report (non-critical — don't lose the response on DB error)."""
+    try:
+        async with async_session() as session:
+            session.add(AiReport(
+                village_id=village_id, farmer_id=farmer_id, report_type=report_type,
+                content=parsed, input_hash=input_hash,
+            ))
+            await session.commit()
+    except Exception:
+        logger.exception('Failed to persist %s AI report — returning analysis anyway', report_type)
+
+
+async def village_input_hash(village_id: UUID) -> str:
+    """Content hash of what the village analysis would currently be built from."""
+    prompt_data, _ = await _village_prompt(village_id)
+    return _village_input_hash(prompt_data)
+
+
+async def _village_prompt(village_id: UUID):
+    """Fetch latest weather + market and build the village prompt."""
+    async with async_session() as session:  # type: AsyncSession
+        weather_rows = await latest_rows_async(session, WeatherData, WeatherData.recorded_at,
+                                               weather_window_start(), 1, WeatherData.village_id == village_id)
+        latest_weather = weather_rows[0] if weather_rows else None
+
+        recent_market = await latest_rows_async(session, MarketPrice, MarketPrice.created_at,
+                                                market_window_start(), 7, MarketPrice.village_id == village_id)
+
+    prompt_data = {
+        "village_id": str(village_id),
+        "weather": {
+            "temperature": getattr(latest_weather, 'temperature', None),
+            "humidity": getattr(latest_weather, 'humidity', None),
+            "rainfall": getattr(latest_weather, 'rainfall', None),
+            "description": getattr(latest_weather, 'description', None),
+        },
+        "market": [
+            {"commodity": m.commodity, "modal_price": m.modal_price, "arrival_date": str(getattr(m, 'arrival_date', None))} for m in recent_market
+        ],
+    }
+
+    return prompt_data, _village_prompt_text(prompt_data)
+
+
+# The village cache key is taken over a coarse view of the prompt inputs:
+# weather rounded and market rows reduced to the latest price per commodity.
+# A new 15-minute reading or arrival then only changes the key when
+# conditions moved, so the nightly precompute can reuse the stored advisory.
+# The model still gets the full-fidelity inputs.
+_WEATHER_STEPS = {'temperature': 1.0, 'humidity': 5.0, 'rainfall': 0.5}
+_PRICE_STEP = 10.0
+
+
+def _coarse(value, step: float):
+    if value is None:
+        return None
+    return round(round(float(value) / step) * step, 1)
+
+
+def _village_input_hash(prompt_data: Dict[str, Any]) -> str:
+    weather = prompt_data['weather']
+    latest_prices = {}
+    for m in prompt_data['market']:  # newest first
+        latest_prices.setdefault(m['commodity'], m['modal_price'])
+    return _input_hash('village', {
+        'weather': {
+            **{k: _coarse(weather.get(k), step) for k, step in _WEATHER_STEPS.items()},
+            'description': weather.get('description'),
+        },
+        'market': [{'commodity': c, 'modal_price': _coarse(p, _PRICE_STEP)} for c, p in sorted(latest_prices.items())],
+    })
+
+
+def _village_prompt_text(prompt_data: Dict[str, Any]) -> str:
+    system_prompt = (
+        "You are an agricultural intelligence expert AI. "
+        "Analyze the following village data and return ONLY valid JSON with these exact keys: "
+        "weather_analysis, market_analysis, risk_assessment, recommendations, summary. "
+        "Do not include any text outside the JSON object."
+    )
+    return system_prompt + "\n\nInput data:\n" + json.dumps(prompt_data, default=str)
+
+
+async def _finish_analysis(report_type: str, reply: Union[str, JSONObjectScanner], input_hash: str,
+                           village_id=None, farmer_id=None) -> Dict[str, Any]:
+    """Validate a village/farmer reply against its schema, then cache and
+    persist it. An unparseable reply is kept as the summary but not cached."""
+    parsed = parse_report(report_type, reply, PROMPT_VERSION)
+    cacheable = parsed is not None
+    if parsed is None:
+        text = reply.text if isinstance(reply, JSONObjectScanner) else reply
+        parsed, _ = validate_report(report_type, {"summary": text})
+    parsed['prompt_version'] = PROMPT_VERSION
+
+    if cacheable:
+        await _store_cached_response(input_hash, parsed)
+    await _persist_report(report_type, parsed, input_hash if cacheable else None,
+                          village_id=village_id, farmer_id=farmer_id)
+    return parsed
+
+
+async def _village_single(village_id: UUID, full_prompt: str, input_hash: str, priority: int) -> Dict[str, Any]:
+    async def model():
+        result_text = await _invoke_bedrock(full_prompt, priority=priority)
+        return await _finish_analysis('village', result_text, input_hash, village_id=village_id) if result_text else None
+
+    res = await _single_flight(input_hash, model)
+    return res if res is not None else await _village_unavailable(village_id)
+
+
+async def generate_village_analysis(village_id: UUID, priority: int = INTERACTIVE) -> Dict[str, Any]:
+    """Fetch latest weather + market, build structured prompt, call Bedrock, validate & persist."""
+    try:
+        prompt_data, full_prompt = await _village_prompt(village_id)
+
+        input_hash = _village_input_hash(prompt_data)
+        cached = await _get_cached_response(input_hash)
+        if cached is not None:
+            return cached
+
+        return await _village_single(village_id, full_prompt, input_hash, priority)
 
     except Exception:
         logger.exception('generate_village_analysis failed — returning fallback')
-        return _fallback_response(village_id=village_id)
+        return await _village_unavailable(village_id)
+
 
+async def stream_village_analysis(village_id: UUID, priority: int = INTERACTIVE) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant of :func:`generate_village_analysis`.
 
-async def generate_farmer_analysis(farmer_id: UUID) -> Dict[str, Any]:
+    Yields ``('token', {'text': ...})`` as Bedrock produces output and ends
+    with exactly one ``('result', analysis)`` carrying the validated JSON
+    that was persisted (or the fallback).
+    """
+    try:
+        prompt_data, full_prompt = await _village_prompt(village_id)
+        input_hash = _village_input_hash(prompt_data)
+        cached = await _get_cached_response(input_hash)
+        if cached is not None:
+            yield 'result', cached
+            return
+
+        scanner = JSONObjectScanner()
+        async for text in _stream_bedrock(full_prompt, priority=priority):
+            scanner.feed(text)
+            yield 'token', {'text': text}
+        if not scanner.text:
+            yield 'result', await _village_unavailable(village_id)
+            return
+        yield 'result', await _finish_analysis('village', scanner, input_hash, village_id=village_id)
+
+    except CircuitOpenError:
+        yield 'result', await _village_unavailable(village_id)
+    except Exception:
+        logger.exception('stream_village_analysis failed — returning fallback')
+        yield 'result', await _village_unavailable(village_id)
+
+
+# ── Batch village analysis ─────────────────────────────────────────
+# Several villages share one request: the system prompt and per-request
+# overhead are paid once per batch instead of once per village.
+_batch_stats = {'batches': 0, 'villages': 0, 'parsed': 0, 'single_retries': 0,
+                'input_tokens': 0, 'output_tokens': 0, 'latency_ms': 0.0}
+
+_VILLAGE_BATCH_SYSTEM_PROMPT = (
+    "You are an agricultural intelligence expert AI. "
+    "The input maps village ids to each village's data. Analyze every village independently and "
+    "return ONLY one valid JSON object whose keys are exactly those village ids, each mapped to an "
+    "object with these exact keys: weather_analysis, market_analysis, risk_assessment, "
+    "recommendations, summary. Do not include any text outside the JSON object."
+)
+
+
+def _village_batch_prompt(batch: Dict[str, Dict[str, Any]]) -> str:
+    """One prompt for several villages; ``batch`` maps village id -> prompt_data."""
+    villages = {
+        vid: {k: v for k, v in data.items() if k not in _IDENTITY_KEYS}
+        for vid, data in batch.items()
+    }
+    return _VILLAGE_BATCH_SYSTEM_PROMPT + "\n\nInput data:\n" + json.dumps({"villages": villages}, default=str)
+
+
+def _split_village_batch(result_text: Optional[str], village_ids) -> Dict[str, Dict[str, Any]]:
+    """Validated per-village analyses from a batch reply, keyed by village id.
+    Ids whose entry is missing or malformed are left out."""
+    parsed = extract_json(result_text)
+    if parsed is None:
+        return {}
+    if isinstance(parsed.get('villages'), dict):
+        parsed = parsed['villages']  # model echoed the input wrapper
+    entries = {}
+    for vid in village_ids:
+        entry = check_entry('village', parsed.get(vid), PROMPT_VERSION)
+        if entry is None:
+            continue
+        entry['prompt_version'] = PROMPT_VERSION
+        entries[vid] = entry
+    return entries
+
+
+async def _call_village_batch(batch: Dict[str, Dict[str, Any]], priority: int) -> Dict[str, Dict[str, Any]]:
+    """One Bedrock call for ``batch`` (village id -> prompt_data); returns the
+    entries that parsed, keyed by village id."""
+    start = time.perf_counter()
+    with usage_scope() as usage:
+        result_text = await _invoke_bedrock(
+            _village_batch_prompt(batch), priority=priority, timeout=30 + 15 * (len(batch) - 1),
+            max_tokens=min(AI_BATCH_MAX_TOKENS, 1024 * len(batch)),
+        )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    entries = _split_village_batch(result_text, list(batch))
+
+    _batch_stats['batches'] += 1
+    _batch_stats['villages'] += len(batch)
+    _batch_stats['parsed'] += len(entries)
+    _batch_stats['input_tokens'] += usage['input_tokens']
+    _batch_stats['output_tokens'] += usage['output_tokens']
+    _batch_stats['latency_ms'] += elapsed_ms
+    logger.info(
+        "bedrock_batch villages=%d parsed=%d latency_ms=%.1f input_tokens=%d output_tokens=%d prompt_version=%s",
+        len(batch), len(entries), elapsed_ms, usage['input_tokens'], usage['output_tokens'], PROMPT_VERSION,
+    )
+    return entries
+
+
+async def _run_village_batch(batch, priority: int) -> Dict[UUID, Dict[str, Any]]:
+    """Batch call for ``(village_id, prompt_data, full_prompt, input_hash)``
+    tuples; caches and persists every entry that parsed."""
+    entries = await _call_village_batch({str(vid): prompt_data for vid, prompt_data, _, _ in batch}, priority)
+    done = {}
+    for vid, _, _, input_hash in batch:
+        entry = entries.get(str(vid))
+        if entry is None:
+            continue
+        await _store_cached_response(input_hash, entry)
+        await _persist_report('village', entry, input_hash, village_id=vid)
+        done[vid] = entry
+    return done
+
+
+async def generate_village_analyses(village_ids, priority: int = BATCH,
+                                    batch_size: int = AI_BATCH_SIZE) -> Dict[UUID, Dict[str, Any]]:
+    """Bulk :func:`generate_village_analysis`, keyed by village id.
+
+    Cached villages are answered from the response cache; the rest are packed
+    ``batch_size`` at a time into one request with per-village keyed output.
+    Any entry missing or malformed in a batch reply falls back to a single
+    call.
+    """
+    results: Dict[UUID, Dict[str, Any]] = {}
+    pending = []
+    for village_id in village_ids:
+        try:
+            prompt_data, full_prompt = await _village_prompt(village_id)
+            input_hash = _village_input_hash(prompt_data)
+            cached = await _get_cached_response(input_hash)
+        except Exception:
+            logger.exception('Batch analysis could not prepare village %s', village_id)
+            results[village_id] = await _village_unavailable(village_id)
+            continue
+        if cached is not None:
+            results[village_id] = cached
+        else:
+            pending.append((village_id, prompt_data, full_prompt, input_hash))
+
+    size = max(1, batch_size)
+    for i in range(0, len(pending), size):
+        batch = pending[i:i + size]
+        done = await _run_village_batch(batch, priority) if len(batch) > 1 else {}
+        for village_id, _, full_prompt, input_hash in batch:
+            if village_id in done:
+                results[village_id] = done[village_id]
+                continue
+            if len(batch) > 1:
+                _batch_stats['single_retries'] += 1
+            try:
+                results[village_id] = await _village_single(village_id, full_prompt, input_hash, priority)
+            except Exception:
+                logger.exception('Single-call analysis failed for village %s', village_id)
+                results[village_id] = await _village_unavailable(village_id)
+    return results
+
+
+def get_batch_stats() -> Dict[str, Any]:
+    """Per-village cost of batched calls, for comparison with single calls."""
+    stats = dict(_batch_stats)
+    n = stats['villages']
+    stats['input_tokens_per_village'] = round(stats['input_tokens'] / n, 1) if n else None
+    stats['output_tokens_per_village'] = round(stats['output_tokens'] / n, 1) if n else None
+    stats['latency_ms_per_village'] = round(stats['latency_ms'] / n, 1) if n else None
+    stats['latency_ms'] = round(stats['latency_ms'], 1)
+    return stats
+
+
+async def generate_farmer_analysis(farmer_id: UUID, priority: int = INTERACTIVE) -> Dict[str, Any]:
     """Farmer-level AI analysis with proper context."""
     try:
         # Gather farmer context from DB
@@ -216,13 +896,12 @@ async def generate_farmer_analysis(farmer_id: UUID) -> Dict[str, Any]:
             weather_data = None
             market_data = []
             if village_id:
-                q2 = select(WeatherData).where(WeatherData.village_id == village_id).order_by(WeatherData.recorded_at.desc()).limit(1)
-                res2 = await session.execute(q2)
-                weather_data = res2.scalars().first()
+                weather_rows = await latest_rows_async(session, WeatherData, WeatherData.recorded_at,
+                                                       weather_window_start(), 1, WeatherData.village_id == village_id)
+                weather_data = weather_rows[0] if weather_rows else None
 
-                q3 = select(MarketPrice).where(MarketPrice.village_id == village_id).order_by(MarketPrice.created_at.desc()).limit(7)
-                res3 = await session.execute(q3)
-                market_data = res3.scalars().all()
+                market_data = await latest_rows_async(session, MarketPrice, MarketPrice.created_at,
+                                                      market_window_start(), 7, MarketPrice.village_id == village_id)
 
         prompt_data = {
             "farmer_id": str(farmer_id),
@@ -244,53 +923,53 @@ async def generate_farmer_analysis(farmer_id: UUID) -> Dict[str, Any]:
         )
         full_prompt = system_prompt + "\n\nInput data:\n" + json.dumps(prompt_data, default=str)
 
-        result_text = await _invoke_bedrock(full_prompt)
-        if not result_text:
-            return _fallback_response(farmer_id=farmer_id)
+        input_hash = _input_hash('farmer', prompt_data)
+        cached = await _get_cached_response(input_hash)
+        if cached is not None:
+            return cached
 
-        parsed = None
-        try:
-            text = result_text.strip()
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            parsed = json.loads(text)
-        except (json.JSONDecodeError, IndexError):
-            parsed = {"summary": result_text}
-
-        parsed = _validate_ai_response(parsed)
-        parsed['prompt_version'] = PROMPT_VERSION
-
-        # Persist AI report (non-critical — don't lose the response on DB error)
-        try:
-            async with async_session() as session:
-                ai_report = AiReport(village_id=village_id, farmer_id=farmer_id, report_type='farmer', content=parsed)
-                session.add(ai_report)
-                await session.commit()
-        except Exception:
-            logger.exception('Failed to persist farmer AI report — returning analysis anyway')
+        async def model():
+            result_text = await _invoke_bedrock(full_prompt, priority=priority)
+            if not result_text:
+                return None
+            return await _finish_analysis('farmer', result_text, input_hash,
+                                          village_id=village_id, farmer_id=farmer_id)
 
-        return parsed
+        res = await _single_flight(input_hash, model)
+        return res if res is not None else await _farmer_unavailable(farmer_id)
 
     except Exception:
         logger.exception('generate_farmer_analysis failed — returning fallback')
-        return _fallback_response(farmer_id=farmer_id)
+        return await _farmer_unavailable(farmer_id)
 
 
-async def generate_farmland_analysis(farmland, db) -> Dict[str, Any]:
+async def generate_farmland_analysis(farmland, db, priority: int = INTERACTIVE) -> Dict[str, Any]:
     """Generate AI insight for a specific farmland using farm registry + weather + market data."""
     try:
-        return await _generate_farmland_analysis_inner(farmland, db)
+        return await _generate_farmland_analysis_inner(farmland, db, priority)
     except Exception:
         logger.exception('generate_farmland_analysis failed — returning fallback')
-        return _farmland_fallback_insight(farmland, None, [])
+        return _farmland_unavailable(farmland, None, [])
 
 
-async def _generate_farmland_analysis_inner(farmland, db) -> Dict[str, Any]:
-    """Inner implementation for farmland analysis."""
+def save_farmland_insight(db, farmland, insight: Dict[str, Any]) -> None:
+    """Store an insight on the farmland (sync session; call via to_thread)."""
+    from backend_service.services.risk_engine_service import _risk_level_from_score
+
+    farmland.ai_insight = insight
+    if isinstance(insight, dict) and isinstance(insight.get('risk_score'), (int, float)):
+        farmland.risk_score = insight['risk_score']
+        farmland.risk_level = insight.get('risk_level', _risk_level_from_score(insight['risk_score']))
+    db.commit()
+
+
+async def _farmland_prompt(farmland, db):
+    """Gather farmland context and build the prompt.
+
+    Returns ``(prompt_data, full_prompt, weather_data, market_data)``; the
+    last two feed the deterministic fallback.
+    """
     from backend_service.models import WeatherData, MarketPrice, Village
-    from sqlalchemy import desc
 
     # Gather weather context — run sync ORM queries in a thread
     def _gather_context():
@@ -301,12 +980,9 @@ async def _generate_farmland_analysis_inner(farmland, db) -> Dict[str, Any]:
             village = db.query(Village).filter(Village.id == farmland.village_id).first()
             village_name = village.name if village else None
 
-            weather_row = (
-                db.query(WeatherData)
-                .filter(WeatherData.village_id == farmland.village_id)
-                .order_by(desc(WeatherData.recorded_at))
-                .first()
-            )
+            weather_rows = latest_rows(db, WeatherData, WeatherData.recorded_at, weather_window_start(), 1,
+                                       WeatherData.village_id == farmland.village_id)
+            weather_row = weather_rows[0] if weather_rows else None
             if weather_row:
                 weather_data = {
                     "temperature": weather_row.temperature,
@@ -315,13 +991,8 @@ async def _generate_farmland_analysis_inner(farmland, db) -> Dict[str, Any]:
                     "description": weather_row.description,
                 }
 
-            market_rows = (
-                db.query(MarketPrice)
-                .filter(MarketPrice.village_id == farmland.village_id)
-                .order_by(desc(MarketPrice.created_at))
-                .limit(7)
-                .all()
-            )
+            market_rows = latest_rows(db, MarketPrice, MarketPrice.created_at, market_window_start(), 7,
+                                      MarketPrice.village_id == farmland.village_id)
             market_data = [
                 {"commodity": m.commodity, "modal_price": m.modal_price,
                  "arrival_date": str(m.arrival_date) if m.arrival_date else None}
@@ -357,33 +1028,80 @@ async def _generate_farmland_analysis_inner(farmland, db) -> Dict[str, Any]:
     )
     full_prompt = system_prompt + "\n\nInput data:\n" + json.dumps(prompt_data, default=str)
 
-    result_text = await _invoke_bedrock(full_prompt)
-    if not result_text:
-        # Fallback: generate deterministic insight
-        return _farmland_fallback_insight(farmland, weather_data, market_data)
+    return prompt_data, full_prompt, weather_data, market_data
 
-    parsed = None
-    try:
-        text = result_text.strip()
-        if '```json' in text:
-            text = text.split('```json')[1].split('```')[0].strip()
-        elif '```' in text:
-            text = text.split('```')[1].split('```')[0].strip()
-        parsed = json.loads(text)
-    except (json.JSONDecodeError, IndexError):
-        parsed = _farmland_fallback_insight(farmland, weather_data, market_data)
-
-    # Ensure all required keys
-    required = ['crop_suitability', 'weather_risk', 'price_opportunity',
-                'irrigation_recommendation', 'harvest_timing', 'risk_score',
-                'risk_level', 'recommendations', 'summary']
-    for k in required:
-        if k not in parsed:
-            parsed[k] = 'Not available'
+
+async def _finish_farmland(farmland, reply: Union[str, JSONObjectScanner], input_hash: str,
+                           weather_data, market_data) -> Dict[str, Any]:
+    """Validate the model output, then cache and persist it. An unparseable
+    reply gives the deterministic insight instead."""
+    parsed = parse_report('farmland', reply, PROMPT_VERSION)
+    if parsed is None:
+        return _farmland_fallback_insight(farmland, weather_data, market_data)
     parsed['prompt_version'] = PROMPT_VERSION
+
+    await _store_cached_response(input_hash, parsed)
+    await _persist_report('farmland', parsed, input_hash,
+                          village_id=farmland.village_id, farmer_id=farmland.farmer_id)
     return parsed
 
 
+async def _generate_farmland_analysis_inner(farmland, db, priority: int) -> Dict[str, Any]:
+    """Inner implementation for farmland analysis."""
+    prompt_data, full_prompt, weather_data, market_data = await _farmland_prompt(farmland, db)
+
+    input_hash = _input_hash('farmland', prompt_data)
+    cached = await _get_cached_response(input_hash)
+    if cached is not None:
+        return cached
+
+    async def model():
+        result_text = await _invoke_bedrock(full_prompt, priority=priority)
+        if not result_text:
+            return None
+        return await _finish_farmland(farmland, result_text, input_hash, weather_data, market_data)
+
+    res = await _single_flight(input_hash, model)
+    return res if res is not None else _farmland_unavailable(farmland, weather_data, market_data)
+
+
+async def stream_farmland_analysis(farmland, db, priority: int = INTERACTIVE) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant of :func:`generate_farmland_analysis` (same events
+    as :func:`stream_village_analysis`)."""
+    weather_data, market_data = None, []
+    try:
+        prompt_data, full_prompt, weather_data, market_data = await _farmland_prompt(farmland, db)
+        input_hash = _input_hash('farmland', prompt_data)
+        cached = await _get_cached_response(input_hash)
+        if cached is not None:
+            yield 'result', cached
+            return
+
+        scanner = JSONObjectScanner()
+        async for text in _stream_bedrock(full_prompt, priority=priority):
+            scanner.feed(text)
+            yield 'token', {'text': text}
+        if not scanner.text:
+            yield 'result', _farmland_unavailable(farmland, weather_data, market_data)
+            return
+        yield 'result', await _finish_farmland(farmland, scanner, input_hash, weather_data, market_data)
+
+    except CircuitOpenError:
+        yield 'result', _farmland_unavailable(farmland, weather_data, market_data)
+    except Exception:
+        logger.exception('stream_farmland_analysis failed — returning fallback')
+        yield 'result', _farmland_unavailable(farmland, weather_data, market_data)
+
+
+def _farmland_unavailable(farmland, weather_data, market_data) -> Dict[str, Any]:
+    """The insight already stored on the farmland if it came from the model,
+    else the deterministic fallback."""
+    insight = farmland.ai_insight
+    if isinstance(insight, dict) and not insight.get('is_fallback'):
+        return _as_stale(insight)
+    return _farmland_fallback_insight(farmland, weather_data, market_data)
+
+
 def _farmland_fallback_insight(farmland, weather_data, market_data) -> dict:
     """Deterministic fallback when Bedrock is unavailable."""
     crop = farmland.crop_type or 'General'
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from backend_service.database import SessionLocal
 from backend_service.models import User, RoleEnum
 from backend_service.core.security import get_password_hash, verify_password
+from backend_service.services import stats_service
 
 
 def get_user_by_email(email: str) -> Optional[User]:
@@ -22,6 +23,8 @@ def create_user(email: str, password: str, role: RoleEnum = RoleEnum.farmer) ->
 
         user = User(email=email, hashed_password=get_password_hash(password), role=role.value if hasattr(role, 'value') else role)
         db.add(user)
+        if user.role == RoleEnum.farmer.value:
+            db.execute(stats_service.increment('farmer_count'))
         db.commit()
         db.refresh(user)
         return user
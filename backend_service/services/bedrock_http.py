@@ -0,0 +1,209 @@
+"""Native async transport for the Bedrock runtime API.
+
+``invoke_model`` and ``invoke_model_with_response_stream`` are plain HTTPS
+calls, so instead of parking a thread on boto3 for the whole model latency
+we sign requests with botocore's SigV4 signer and send them on one shared
+``httpx.AsyncClient`` (keep-alive connection pool). Streaming responses are
+decoded with botocore's event-stream parser and yielded in the same
+``{'chunk': {'bytes': ...}}`` shape boto3 produces.
+
+Errors are raised as :class:`BedrockHTTPError` with a botocore-style
+``response['Error']['Code']`` so callers classify them the same way for
+both transports:
+
+* throttling (429 / ``ThrottlingException``) is raised immediately — the
+  concurrency limiter reacts to it;
+* transient failures (5xx, connection errors) are retried here with
+  jittered exponential backoff;
+* credential failures are the only errors that reset the client.
+"""
+import asyncio
+import base64
+import json
+import logging
+import random
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+from botocore.eventstream import EventStreamBuffer
+from botocore.session import get_session
+
+from backend_service.config import BEDROCK_HTTP_MAX_RETRIES, BEDROCK_MAX_CONCURRENCY
+from backend_service.core.request_context import outbound_headers
+
+logger = logging.getLogger('backend.bedrock_http')
+
+SERVICE = 'bedrock'
+
+CREDENTIAL_ERROR_CODES = frozenset({
+    'UnrecognizedClientException',
+    'InvalidSignatureException',
+    'ExpiredTokenException',
+    'ExpiredToken',
+    'InvalidClientTokenId',
+    'IncompleteSignature',
+    'MissingAuthenticationToken',
+})
+RETRYABLE_ERROR_CODES = frozenset({
+    'InternalServerException',
+    'ServiceUnavailableException',
+    'ModelStreamErrorException',
+})
+
+
+class BedrockHTTPError(Exception):
+    def __init__(self, status: int, code: str, message: str = ''):
+        super().__init__(f'{status} {code}: {message}' if message else f'{status} {code}')
+        self.status = status
+        self.code = code
+        # Same shape as botocore.exceptions.ClientError.response
+        self.response = {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+def error_code(exc: BaseException) -> Optional[str]:
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def is_credential_error(exc: BaseException) -> bool:
+    """True if ``exc`` means the credentials are missing, wrong or expired."""
+    from botocore.exceptions import NoCredentialsError, PartialCredentialsError
+
+    if isinstance(exc, (NoCredentialsError, PartialCredentialsError)):
+        return True
+    return error_code(exc) in CREDENTIAL_ERROR_CODES
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)):
+        return True
+    if isinstance(exc, BedrockHTTPError):
+        return exc.code in RETRYABLE_ERROR_CODES or exc.status >= 500
+    return False
+
+
+def _error_from_response(status: int, headers: httpx.Headers, body: bytes) -> BedrockHTTPError:
+    code = (headers.get('x-amzn-errortype') or '').split(':')[0]
+    message = ''
+    try:
+        data = json.loads(body or b'{}')
+        code = code or data.get('__type', '').split('#')[-1]
+        message = data.get('message') or data.get('Message') or ''
+    except ValueError:
+        message = body[:200].decode('utf-8', 'replace') if body else ''
+    if not code:
+        code = 'ThrottlingException' if status == 429 else f'HTTP{status}'
+    return BedrockHTTPError(status, code, message)
+
+
+class BedrockHTTPClient:
+    def __init__(self, region: str, endpoint_url: Optional[str] = None,
+                 credentials: Optional[Credentials] = None,
+                 max_retries: int = BEDROCK_HTTP_MAX_RETRIES,
+                 read_timeout: float = 30, connect_timeout: float = 10,
+                 max_connections: int = BEDROCK_MAX_CONCURRENCY):
+        self.region = region
+        self.endpoint_url = (endpoint_url or f'https://bedrock-runtime.{region}.amazonaws.com').rstrip('/')
+        self.max_retries = max_retries
+        self._credentials = credentials or get_session().get_credentials()
+        if self._credentials is None:
+            from botocore.exceptions import NoCredentialsError
+            raise NoCredentialsError()
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            # The limiter never runs more than max_limit calls at once.
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    def _signed(self, path: str, body: bytes, accept: str) -> Tuple[str, Dict[str, str]]:
+        url = self.endpoint_url + path
+        request = AWSRequest(method='POST', url=url, data=body, headers={
+            'Content-Type': 'application/json',
+            'Accept': accept,
+        })
+        # Refreshable credentials (instance roles) rotate; sign with a snapshot.
+        SigV4Auth(self._credentials.get_frozen_credentials(), SERVICE, self.region).add_auth(request)
+        return url, outbound_headers(dict(request.headers.items()))
+
+    @staticmethod
+    def _path(model_id: str, action: str) -> str:
+        return f"/model/{quote(model_id, safe='')}/{action}"
+
+    async def _backoff(self, attempt: int, exc: BaseException) -> None:
+        delay = min(8.0, 0.25 * 2 ** attempt) * random.uniform(0.5, 1.0)
+        logger.warning('Bedrock request failed (%s) — retry %d/%d in %.2fs',
+                       exc, attempt + 1, self.max_retries, delay)
+        await asyncio.sleep(delay)
+
+    async def invoke_model(self, model_id: str, body: str) -> str:
+        payload = body.encode('utf-8')
+        attempt = 0
+        while True:
+            url, headers = self._signed(self._path(model_id, 'invoke'), payload, 'application/json')
+            try:
+                resp = await self._http.post(url, content=payload, headers=headers)
+                if resp.status_code >= 400:
+                    raise _error_from_response(resp.status_code, resp.headers, resp.content)
+                return resp.text
+            except Exception as exc:
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    raise
+                await self._backoff(attempt, exc)
+                attempt += 1
+
+    async def invoke_model_stream(self, model_id: str, body: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{'chunk': {'bytes': ...}}`` events. Only the connection
+        phase is retried — once events have been yielded a failure is final."""
+        payload = body.encode('utf-8')
+        attempt = 0
+        started = False
+        while True:
+            url, headers = self._signed(
+                self._path(model_id, 'invoke-with-response-stream'), payload, 'application/vnd.amazon.eventstream',
+            )
+            try:
+                async with self._http.stream('POST', url, content=payload, headers=headers) as resp:
+                    if resp.status_code >= 400:
+                        raise _error_from_response(resp.status_code, resp.headers, await resp.aread())
+                    buffer = EventStreamBuffer()
+                    async for data in resp.aiter_bytes():
+                        buffer.add_data(data)
+                        for message in buffer:
+                            event = _decode_event(message)
+                            if event is not None:
+                                started = True
+                                yield event
+                    return
+            except Exception as exc:
+                if started or attempt >= self.max_retries or not _is_retryable(exc):
+                    raise
+                await self._backoff(attempt, exc)
+                attempt += 1
+
+
+def _decode_event(message) -> Optional[Dict[str, Any]]:
+    headers = message.headers
+    message_type = headers.get(':message-type')
+    if message_type == 'exception':
+        code = headers.get(':exception-type', 'ModelStreamErrorException')
+        try:
+            detail = json.loads(message.payload or b'{}').get('message', '')
+        except ValueError:
+            detail = ''
+        raise BedrockHTTPError(400, code, detail)
+    if message_type == 'error':
+        raise BedrockHTTPError(500, headers.get(':error-code', 'InternalServerException'),
+                               headers.get(':error-message', ''))
+    if headers.get(':event-type') != 'chunk':
+        return None
+    data = json.loads(message.payload)
+    return {'chunk': {'bytes': base64.b64decode(data['bytes'])}}
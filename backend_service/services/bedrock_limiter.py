@@ -0,0 +1,199 @@
+"""Concurrency control for outbound Bedrock calls.
+
+Blocking (boto3) calls run on a dedicated, bounded thread pool instead of
+the default executor that ``asyncio.to_thread`` shares with the sync routes,
+so a burst of advisory requests can no longer starve them. Native async
+calls (the httpx transport) hold a :meth:`AdaptiveLimiter.slot` instead.
+
+In front of the pool sits an adaptive limiter (AIMD): each successful call
+nudges the allowed concurrency up by ``1/limit``, and each throttling error
+from Bedrock halves it. Waiters are served by priority class, so interactive
+farmer requests overtake queued batch precomputation.
+
+``queue_timeout`` bounds the wait for a slot on its own and raises
+:class:`QueueTimeout`. A full queue is local load, not a Bedrock fault, so the
+circuit breaker ignores it. ``timeout`` bounds the call itself and starts only
+once the slot is held.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from backend_service.config import BEDROCK_MAX_CONCURRENCY, BEDROCK_MIN_CONCURRENCY
+
+logger = logging.getLogger('backend.bedrock_limiter')
+
+# Lower value is served first.
+INTERACTIVE = 0
+BATCH = 10
+_PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+THROTTLE_ERROR_CODES = frozenset({
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ModelNotReadyException',
+})
+
+
+class QueueTimeout(Exception):
+    """No limiter slot freed up within ``queue_timeout``."""
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """True for botocore ``ClientError``s that mean "slow down"."""
+    response = getattr(exc, 'response', None)
+    if not isinstance(response, dict):
+        return False
+    code = response.get('Error', {}).get('Code')
+    return code in THROTTLE_ERROR_CODES
+
+
+class AdaptiveLimiter:
+    """Priority-ordered, AIMD-sized concurrency gate backed by a thread pool."""
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._waiters: List[list] = []  # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_limit, thread_name_prefix='bedrock')
+        self._stats = {'completed': 0, 'failed': 0, 'throttled': 0, 'cancelled': 0, 'queue_timeouts': 0,
+                       'max_queue_depth': 0}
+
+    # ── Slot accounting (event-loop thread only) ─────────────────────
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def _queue_depth(self) -> int:
+        return sum(1 for w in self._waiters if not w[2].done())
+
+    async def _acquire(self, priority: int, timeout: Optional[float] = None) -> None:
+        if self._in_flight < self.limit and not self._queue_depth():
+            self._in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), fut])
+        self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue_depth())
+        try:
+            await (fut if timeout is None else asyncio.wait_for(asyncio.shield(fut), timeout))
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return  # slot handed to us just as the timer fired — keep it
+            fut.cancel()
+            self._stats['queue_timeouts'] += 1
+            raise QueueTimeout(f'no Bedrock slot free within {timeout:g}s') from None
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed to us just as we were cancelled — pass it on.
+                self._release()
+            else:
+                fut.cancel()
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue  # cancelled while queued
+            self._in_flight += 1
+            fut.set_result(None)
+
+    def _on_done(self, exc: BaseException = None) -> None:
+        if exc is None:
+            self._stats['completed'] += 1
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+        elif is_throttle_error(exc):
+            self._stats['throttled'] += 1
+            previous = self.limit
+            self._limit = max(float(self.min_limit), self._limit / 2)
+            if self.limit != previous:
+                logger.warning('Bedrock throttled — concurrency %d -> %d', previous, self.limit)
+        else:
+            self._stats['failed'] += 1
+        self._release()
+
+    def _on_cancelled(self) -> None:
+        """A call that never ran says nothing about Bedrock: free the slot only."""
+        self._stats['cancelled'] += 1
+        self._release()
+
+    # ── Public API ───────────────────────────────────────────────────
+    async def run(self, fn: Callable[[], Any], priority: int = INTERACTIVE,
+                  queue_timeout: Optional[float] = None, timeout: Optional[float] = None) -> Any:
+        """Run blocking ``fn`` on the Bedrock pool once a slot is free.
+
+        If the caller is cancelled or ``timeout`` expires after the call has
+        started, the slot stays held until the thread finishes, so the pool
+        is never oversubscribed.
+        """
+        await self._acquire(priority, queue_timeout)
+        loop = asyncio.get_running_loop()
+        try:
+            # Like asyncio.to_thread: the call sees the caller's contextvars.
+            cf = self._executor.submit(contextvars.copy_context().run, fn)
+        except BaseException:
+            self._release()
+            raise
+
+        def _done(f):
+            if f.cancelled():
+                loop.call_soon_threadsafe(self._on_cancelled)
+            else:
+                loop.call_soon_threadsafe(self._on_done, f.exception())
+
+        cf.add_done_callback(_done)
+        return await asyncio.wait_for(asyncio.wrap_future(cf), timeout)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, queue_timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one concurrency slot for native async work. The outcome of the
+        block feeds AIMD exactly like a pooled call; cancellation only frees
+        the slot."""
+        await self._acquire(priority, queue_timeout)
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            self._on_cancelled()
+            raise
+        except BaseException as exc:
+            self._on_done(exc)
+            raise
+        else:
+            self._on_done(None)
+
+    async def run_async(self, fn: Callable[[], Awaitable[Any]], priority: int = INTERACTIVE,
+                        queue_timeout: Optional[float] = None, timeout: Optional[float] = None) -> Any:
+        async with self.slot(priority, queue_timeout):
+            return await asyncio.wait_for(fn(), timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        by_priority: Dict[str, int] = {}
+        for priority, _, fut in self._waiters:
+            if not fut.done():
+                name = _PRIORITY_NAMES.get(priority, str(priority))
+                by_priority[name] = by_priority.get(name, 0) + 1
+        return {
+            'limit': self.limit,
+            'max_limit': self.max_limit,
+            'min_limit': self.min_limit,
+            'in_flight': self._in_flight,
+            'queue_depth': sum(by_priority.values()),
+            'queued_by_priority': by_priority,
+            **self._stats,
+        }
+
+
+bedrock_limiter = AdaptiveLimiter(BEDROCK_MAX_CONCURRENCY, BEDROCK_MIN_CONCURRENCY)
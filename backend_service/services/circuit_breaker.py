@@ -0,0 +1,142 @@
+"""Circuit breaker for outbound Bedrock calls.
+
+After ``failure_threshold`` consecutive outage-type failures (timeouts,
+connection errors, 5xx, bad credentials) the breaker opens: callers are
+refused immediately and serve their fallback instead of waiting out the
+connect + read timeouts. While open, a background task sends a cheap probe
+after ``reset_timeout`` seconds (backing off on repeated failures); the
+first successful probe closes the breaker.
+
+Throttling and request-validation errors are not outages — Bedrock answered —
+so they neither open nor close the breaker. Neither is a limiter
+:class:`QueueTimeout`: the call never left this process.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from backend_service.config import (
+    BEDROCK_BREAKER_FAILURES, BEDROCK_BREAKER_RESET_SECONDS, BEDROCK_BREAKER_MAX_RESET_SECONDS,
+)
+
+logger = logging.getLogger('backend.circuit_breaker')
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling out while the breaker is open."""
+
+
+def counts_as_outage(exc: BaseException) -> bool:
+    """Whether ``exc`` says the service is unreachable or broken."""
+    from backend_service.services.bedrock_http import error_code, is_credential_error
+    from backend_service.services.bedrock_limiter import QueueTimeout, is_throttle_error
+
+    if isinstance(exc, QueueTimeout):
+        return False
+    if isinstance(exc, asyncio.TimeoutError) or is_credential_error(exc):
+        return True
+    if is_throttle_error(exc):
+        return False
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return status >= 500 or error_code(exc) in ('ServiceUnavailableException', 'InternalServerException')
+    # Transport-level failures (httpx / botocore connection and timeout errors)
+    return True
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = BEDROCK_BREAKER_FAILURES,
+                 reset_timeout: float = BEDROCK_BREAKER_RESET_SECONDS,
+                 max_reset_timeout: float = BEDROCK_BREAKER_MAX_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe: Optional[Callable[[], Awaitable[bool]]] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._stats = {'opened': 0, 'rejected': 0, 'probes': 0, 'probe_failures': 0}
+
+    def set_probe(self, probe: Callable[[], Awaitable[bool]]) -> None:
+        """Register the coroutine used for half-open probes (True = healthy)."""
+        self._probe = probe
+
+    # ── Call path ────────────────────────────────────────────────────
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        self._stats['rejected'] += 1
+        self._ensure_probing()
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state != CLOSED:
+            self._close()
+
+    def record_failure(self, exc: BaseException) -> None:
+        if not counts_as_outage(exc):
+            return
+        self._failures += 1
+        if self.state == CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    # ── State transitions ────────────────────────────────────────────
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._stats['opened'] += 1
+        logger.error('Circuit %s opened after %d consecutive failures — serving fallbacks',
+                     self.name, self._failures)
+        self._ensure_probing()
+
+    def _close(self) -> None:
+        logger.warning('Circuit %s closed after %.0fs open', self.name,
+                       time.monotonic() - (self._opened_at or time.monotonic()))
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+
+    def _ensure_probing(self) -> None:
+        if self._probe is None or (self._probe_task is not None and not self._probe_task.done()):
+            return
+        try:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+        except RuntimeError:
+            pass  # no running loop (sync caller) — the next async caller starts it
+
+    async def _probe_loop(self) -> None:
+        delay = self.reset_timeout
+        while self.state != CLOSED:
+            await asyncio.sleep(delay)
+            self.state = HALF_OPEN
+            self._stats['probes'] += 1
+            try:
+                healthy = await self._probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                self._close()
+                return
+            self._stats['probe_failures'] += 1
+            self.state = OPEN
+            delay = min(self.max_reset_timeout, delay * 2)
+            logger.warning('Circuit %s probe failed — next probe in %.0fs', self.name, delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'open_for_s': round(time.monotonic() - self._opened_at, 1) if self._opened_at else None,
+            'failure_threshold': self.failure_threshold,
+            **self._stats,
+        }
+
+
+bedrock_breaker = CircuitBreaker('bedrock')
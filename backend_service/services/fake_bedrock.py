@@ -0,0 +1,100 @@
+"""Local stand-in for the ``bedrock-runtime`` client.
+
+Enabled with ``AI_MODEL_BACKEND=fake`` (or ``AI_FAKE_MODEL=true``). It
+answers ``invoke_model`` and ``invoke_model_with_response_stream`` in Nova's
+wire format with a canned, schema-complete JSON reply (keyed per village for
+batch prompts), streamed in small chunks with a configurable delay, so the
+blocking and SSE paths can be exercised without AWS. The stub model server
+(scripts/stub_model_server.py) serves the same reply over HTTP.
+"""
+import io
+import json
+import time
+from typing import Any, Dict, Iterator, Optional
+
+CHUNK_SIZE = 24
+
+# Union of the village/farmer and farmland report schemas.
+_CANNED_REPLY = {
+    'weather_analysis': 'Warm and humid with light rainfall expected over the coming days.',
+    'market_analysis': 'Modal prices are stable week on week; no distress selling observed.',
+    'risk_assessment': 'Moderate risk driven mainly by humidity-related pest pressure.',
+    'crop_suitability': 'Suitable for the current season with standard practices.',
+    'weather_risk': 'Moderate',
+    'price_opportunity': 'Hold produce for one to two weeks if storage is available.',
+    'irrigation_recommendation': 'Irrigate every 4-5 days; skip after rainfall above 10 mm.',
+    'harvest_timing': 'On schedule; watch forecasts in the final fortnight.',
+    'risk_score': 42,
+    'risk_level': 'Moderate',
+    'recommendations': [
+        'Scout fields twice a week for pests and fungal disease.',
+        'Apply a preventive fungicide if humidity stays above 85%.',
+        'Check mandi prices before committing to a sale date.',
+    ],
+    'summary': 'Conditions are broadly favourable; keep an eye on humidity and prices.',
+}
+
+
+_VILLAGE_KEYS = ('weather_analysis', 'market_analysis', 'risk_assessment', 'recommendations', 'summary')
+
+
+def reply_text(body: str) -> str:
+    """The canned reply; for a multi-village batch prompt, one village-schema
+    entry per village id in the input."""
+    try:
+        prompt = json.loads(body)['messages'][0]['content'][0]['text']
+        data = json.loads(prompt.split('Input data:\n', 1)[1])
+    except (ValueError, KeyError, IndexError, TypeError):
+        data = None
+    if isinstance(data, dict) and isinstance(data.get('villages'), dict):
+        entry = {k: _CANNED_REPLY[k] for k in _VILLAGE_KEYS}
+        return json.dumps({vid: entry for vid in data['villages']})
+    return json.dumps(_CANNED_REPLY)
+
+
+class _Stream:
+    """Iterable of Nova stream events, shaped like botocore's EventStream."""
+
+    def __init__(self, text: str, delay: float, input_tokens: int = 0):
+        self._text = text
+        self._delay = delay
+        self._input_tokens = input_tokens
+
+    def _event(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {'chunk': {'bytes': json.dumps(payload).encode('utf-8')}}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield self._event({'messageStart': {'role': 'assistant'}})
+        for i in range(0, len(self._text), CHUNK_SIZE):
+            time.sleep(self._delay)
+            yield self._event({'contentBlockDelta': {
+                'delta': {'text': self._text[i:i + CHUNK_SIZE]}, 'contentBlockIndex': 0,
+            }})
+        yield self._event({'messageStop': {'stopReason': 'end_turn'}})
+        yield self._event({'metadata': {'usage': {
+            'inputTokens': self._input_tokens, 'outputTokens': len(self._text) // 4,
+        }}})
+
+    def close(self) -> None:
+        pass
+
+
+class FakeBedrockClient:
+    def __init__(self, chunk_delay_ms: Optional[int] = None):
+        if chunk_delay_ms is None:
+            from backend_service.config import AI_FAKE_CHUNK_DELAY_MS
+            chunk_delay_ms = AI_FAKE_CHUNK_DELAY_MS
+        self.delay = chunk_delay_ms / 1000.0
+
+    def invoke_model(self, body, modelId, contentType=None, accept=None) -> Dict[str, Any]:
+        text = reply_text(body)
+        time.sleep(self.delay * (len(text) // CHUNK_SIZE + 1))
+        payload = {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+            'stopReason': 'end_turn',
+            'usage': {'inputTokens': len(body) // 4, 'outputTokens': len(text) // 4},
+        }
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+    def invoke_model_with_response_stream(self, body, modelId, contentType=None, accept=None) -> Dict[str, Any]:
+        return {'body': _Stream(reply_text(body), self.delay, input_tokens=len(body) // 4)}
@@ -0,0 +1,215 @@
+"""Per-cycle telemetry for the weather and market ingestion jobs.
+
+The worker opens a :class:`CycleStats` around each cycle. While it is open,
+the ingestion code reports into it through a contextvar. Each village is
+counted as skipped (no coordinates or state), failed, written (new rows) or
+neither (duplicates or invalid readings). Every upstream attempt made
+through :func:`fetch_json` adds its latency, and retries are counted. When
+the cycle ends, one ``ingestion_runs`` row stores the totals, the upstream
+latency percentiles, the rows/second and the duration measured against the
+schedule interval.
+
+A cycle longer than its interval is flagged ``overran`` and logged as a
+warning. APScheduler skips the next run while one is still going
+(``max_instances=1``), so an overrun means the data is going stale.
+``GET /admin/ingestion/runs`` returns the recent rows and a per-job summary.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend_service.config import INGEST_FETCH_RETRIES, INGEST_RETRY_BACKOFF_S
+from backend_service.core.request_context import outbound_headers
+from backend_service.database_async import AsyncSessionLocal
+from backend_service.metrics import track_outbound
+from backend_service.models import IngestionRun
+
+logger = logging.getLogger('backend.ingestion_runs')
+
+SKIPPED, FAILED, WRITTEN, UNCHANGED = 'skipped', 'failed', 'written', 'unchanged'
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[rank], 1)
+
+
+class CycleStats:
+    """Counters for one ingestion cycle; use as a context manager."""
+
+    def __init__(self, job: str, interval_s: float):
+        self.job = job
+        self.interval_s = interval_s
+        self.villages = {SKIPPED: 0, FAILED: 0, WRITTEN: 0, UNCHANGED: 0}
+        self.rows_written = 0
+        self.upstream_ms: List[float] = []
+        self.retries = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.duration_s = 0.0
+        self._start = 0.0
+        self._token = None
+
+    def __enter__(self) -> 'CycleStats':
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._token = current_cycle.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_s = time.perf_counter() - self._start
+        current_cycle.reset(self._token)
+        if exc is not None:
+            self.error = f'{type(exc).__name__}: {exc}'[:1024]
+
+    @property
+    def overran(self) -> bool:
+        return self.duration_s > self.interval_s
+
+    def as_row(self) -> Dict[str, Any]:
+        latencies = sorted(self.upstream_ms)
+        attempted = self.villages[FAILED] + self.villages[WRITTEN] + self.villages[UNCHANGED]
+        return {
+            'job': self.job,
+            'started_at': self.started_at,
+            'finished_at': datetime.now(timezone.utc),
+            'duration_s': round(self.duration_s, 3),
+            'interval_s': self.interval_s,
+            'overran': self.overran,
+            'villages_attempted': attempted,
+            'villages_skipped': self.villages[SKIPPED],
+            'villages_failed': self.villages[FAILED],
+            'villages_written': self.villages[WRITTEN],
+            'rows_written': self.rows_written,
+            'rows_per_second': round(self.rows_written / self.duration_s, 2) if self.duration_s else 0.0,
+            'upstream_calls': len(latencies),
+            'upstream_retries': self.retries,
+            'upstream_p50_ms': _percentile(latencies, 50),
+            'upstream_p95_ms': _percentile(latencies, 95),
+            'upstream_max_ms': round(latencies[-1], 1) if latencies else None,
+            'error': self.error,
+        }
+
+
+current_cycle: contextvars.ContextVar[Optional[CycleStats]] = contextvars.ContextVar('ingestion_cycle', default=None)
+
+
+def note_village(outcome: str, rows: int = 0) -> None:
+    """Count one village of the current cycle (no-op outside a cycle)."""
+    cycle = current_cycle.get()
+    if cycle is not None:
+        cycle.villages[outcome] += 1
+        cycle.rows_written += rows
+
+
+# ── Upstream calls ──────────────────────────────────────────────────
+def _is_transient(exc: Exception) -> bool:
+    import httpx
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+async def fetch_json(provider: str, operation: str, url: str, params: Dict[str, Any],
+                     timeout: float, retries: int = INGEST_FETCH_RETRIES) -> Any:
+    """GET ``url`` and return its JSON body. Transient failures are retried,
+    and every attempt is timed into the current cycle."""
+    import httpx  # worker-only; kept off the API's import path
+
+    cycle = current_cycle.get()
+    async with httpx.AsyncClient(timeout=timeout, headers=outbound_headers()) as client:
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                with track_outbound(provider, operation):
+                    resp = await client.get(url, params=params)
+                    resp.raise_for_status()
+                return resp.json()
+            except httpx.HTTPError as exc:
+                if attempt >= retries or not _is_transient(exc):
+                    raise
+                delay = INGEST_RETRY_BACKOFF_S * 2 ** attempt * random.uniform(0.5, 1.0)
+                reason = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else type(exc).__name__
+                logger.warning('%s %s failed (%s) — retry %d/%d in %.2fs',
+                               provider, operation, reason, attempt + 1, retries, delay)
+                if cycle is not None:
+                    cycle.retries += 1
+            finally:
+                if cycle is not None:
+                    cycle.upstream_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(delay)
+
+
+# ── Persistence ─────────────────────────────────────────────────────
+async def record_cycle(cycle: CycleStats) -> Dict[str, Any]:
+    """Log the cycle and store it as an ``ingestion_runs`` row."""
+    row = cycle.as_row()
+    logger.log(
+        logging.WARNING if cycle.overran or cycle.error else logging.INFO,
+        'ingestion_cycle job=%s duration_s=%.1f interval_s=%.0f overran=%s villages_attempted=%d skipped=%d '
+        'failed=%d written=%d rows=%d rows_per_s=%.1f upstream_calls=%d retries=%d p50_ms=%s p95_ms=%s error=%s',
+        row['job'], row['duration_s'], row['interval_s'], row['overran'], row['villages_attempted'],
+        row['villages_skipped'], row['villages_failed'], row['villages_written'], row['rows_written'],
+        row['rows_per_second'], row['upstream_calls'], row['upstream_retries'],
+        _fmt_ms(row['upstream_p50_ms']), _fmt_ms(row['upstream_p95_ms']), row['error'],
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            session.add(IngestionRun(**row))
+            await session.commit()
+    except Exception:
+        logger.exception('Could not store %s ingestion run', cycle.job)
+    return row
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return '-' if value is None else f'{value:.0f}'
+
+
+# ── Admin read side (sync session) ──────────────────────────────────
+_RUN_FIELDS = [c.name for c in IngestionRun.__table__.columns if c.name != 'id']
+
+
+def _serialize(run: IngestionRun) -> Dict[str, Any]:
+    out = {name: getattr(run, name) for name in _RUN_FIELDS}
+    out['started_at'] = run.started_at.isoformat()
+    out['finished_at'] = run.finished_at.isoformat()
+    return out
+
+
+def recent_runs(db: Session, job: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """Newest runs first, plus per-job health over those runs."""
+    q = db.query(IngestionRun)
+    if job:
+        q = q.filter(IngestionRun.job == job)
+    runs = q.order_by(IngestionRun.started_at.desc()).limit(limit).all()
+
+    now = datetime.now(timezone.utc)
+    summary: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        s = summary.setdefault(run.job, {
+            'last_started_at': run.started_at.isoformat(),
+            'seconds_since_last_run': round((now - run.finished_at).total_seconds(), 1),
+            'interval_s': run.interval_s,
+            'runs': 0, 'overruns': 0, 'failed_runs': 0, '_durations': [],
+        })
+        s['runs'] += 1
+        s['overruns'] += run.overran
+        s['failed_runs'] += run.error is not None
+        s['_durations'].append(run.duration_s)
+    for s in summary.values():
+        durations = sorted(s.pop('_durations'))
+        s['duration_p95_s'] = _percentile(durations, 95)
+        s['max_utilization'] = round(durations[-1] / s['interval_s'], 2) if s['interval_s'] else None
+        # Two missed intervals in a row: the job is stuck or the worker is down.
+        s['stale'] = s['seconds_since_last_run'] > 2 * s['interval_s']
+    return {'summary': summary, 'runs': [_serialize(r) for r in runs]}
@@ -0,0 +1,401 @@
+"""Asynchronous AI job queue backed by the ``ai_jobs`` table.
+
+Endpoints enqueue a row and return ``202`` with the job id; a pool of worker
+coroutines (started by the ingestion worker) claims queued rows with
+``FOR UPDATE SKIP LOCKED`` so any number of workers can share the table
+without double-processing. Clients poll ``GET /jobs/{id}`` or pass a
+``callback_url`` that receives the outcome as a signed JSON POST.
+
+Callback URLs are checked when the job is queued and again just before the
+POST, because DNS can change in between. The host must be on
+``AI_JOB_CALLBACK_HOSTS`` when that list is set. Every address it resolves
+to must be public: loopback, private, link-local and reserved ranges are
+refused. Redirects are not followed.
+
+Jobs whose generator fell back to the deterministic response (Bedrock
+unavailable) are retried with backoff; the fallback is kept as the result
+once the retry budget is spent.
+
+While a job runs, its worker touches ``heartbeat_at`` every
+``AI_JOB_STALE_SECONDS / 3``. The reaper only takes back jobs whose
+heartbeat has stopped, so a slow job is never handed to a second worker.
+Each claim counts as an attempt. An abandoned job that has used up
+``AI_JOB_MAX_ATTEMPTS``, such as one that keeps crashing its worker, is
+failed instead of re-queued.
+
+With tracing on, the enqueuing request's trace context travels in the
+payload (``_trace``) and the worker's span for the job continues it.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend_service.config import (
+    AI_JOB_CALLBACK_HOSTS, AI_JOB_CONCURRENCY, AI_JOB_POLL_SECONDS, AI_JOB_MAX_ATTEMPTS, AI_JOB_STALE_SECONDS,
+    SECRET_KEY,
+)
+from backend_service.database_async import async_engine
+from backend_service.core import tracing
+from backend_service.core.request_context import outbound_headers, request_id_var
+from backend_service.metrics import track_outbound
+from backend_service.models import AiJob
+
+logger = logging.getLogger('backend.jobs')
+
+FARMLAND_INSIGHT = 'farmland_insight'
+VILLAGE_ANALYSIS = 'village_analysis'
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+RETRY_BASE_SECONDS = 5
+REAP_INTERVAL_SECONDS = 60
+WEBHOOK_TIMEOUT = 10
+
+
+class PermanentJobError(Exception):
+    """The job can never succeed (e.g. its target was deleted) — don't retry."""
+
+
+class CallbackRejected(ValueError):
+    """``callback_url`` is not an allowed public endpoint."""
+
+
+class _FallbackResult(Exception):
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__('AI generation returned the fallback response')
+        self.result = result
+
+
+# ── Callback URLs ───────────────────────────────────────────────────
+def callback_hosts_configured() -> bool:
+    return bool(AI_JOB_CALLBACK_HOSTS)
+
+
+def _callback_host(url: str) -> Tuple[str, int]:
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise CallbackRejected('callback_url must be an absolute http(s) URL')
+    if parts.username or parts.password:
+        raise CallbackRejected('callback_url must not carry credentials')
+    host = parts.hostname.lower().rstrip('.')
+    if AI_JOB_CALLBACK_HOSTS and not any(
+        host == allowed or (allowed.startswith('*.') and host.endswith(allowed[1:]))
+        for allowed in AI_JOB_CALLBACK_HOSTS
+    ):
+        raise CallbackRejected(f'callback host {host} is not allowed')
+    return host, parts.port or (443 if parts.scheme == 'https' else 80)
+
+
+def _check_addresses(host: str, addresses: Iterable[str]) -> None:
+    addresses = list(addresses)
+    if not addresses:
+        raise CallbackRejected(f'callback host {host} does not resolve')
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise CallbackRejected(f'callback host {host} resolves to non-public address {ip}')
+
+
+def validate_callback_url(url: str) -> None:
+    """Raise :class:`CallbackRejected` unless ``url`` is an allowed public endpoint."""
+    host, port = _callback_host(url)
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise CallbackRejected(f'callback host {host} does not resolve')
+    _check_addresses(host, (info[4][0] for info in infos))
+
+
+async def _validate_callback_url_async(url: str) -> None:
+    host, port = _callback_host(url)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise CallbackRejected(f'callback host {host} does not resolve')
+    _check_addresses(host, (info[4][0] for info in infos))
+
+
+# ── Enqueue / read (API side, sync session) ─────────────────────────
+def enqueue(db: Session, kind: str, payload: Dict[str, Any], owner_id: Optional[UUID] = None,
+            callback_url: Optional[str] = None) -> AiJob:
+    if kind not in _HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    if callback_url:
+        validate_callback_url(callback_url)
+    carrier = tracing.inject({})
+    if carrier:
+        payload = {**payload, '_trace': carrier}
+    job = AiJob(kind=kind, payload=payload, status=QUEUED, owner_id=owner_id, callback_url=callback_url)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info('Enqueued %s job %s', kind, job.id)
+    return job
+
+
+def serialize_job(job: AiJob) -> Dict[str, Any]:
+    return {
+        'id': str(job.id),
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': f'/jobs/{job.id}',
+    }
+
+
+# ── Handlers ────────────────────────────────────────────────────────
+async def _run_farmland_insight(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from backend_service.database import SessionLocal
+    from backend_service.models import Farmland
+    from backend_service.services import ai_analysis_service
+
+    farmland_id = UUID(payload['farmland_id'])
+    db = SessionLocal()
+    try:
+        f = await asyncio.to_thread(lambda: db.query(Farmland).filter(Farmland.id == farmland_id).first())
+        if not f:
+            raise PermanentJobError('Farmland not found')
+        insight = await ai_analysis_service.generate_farmland_analysis(f, db)
+        if insight.get('is_fallback'):
+            raise _FallbackResult(insight)
+        await asyncio.to_thread(ai_analysis_service.save_farmland_insight, db, f, insight)
+        return insight
+    finally:
+        db.close()
+
+
+async def _run_village_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from backend_service.services import ai_analysis_service
+    from backend_service import cache
+
+    village_id = UUID(payload['village_id'])
+    res = await ai_analysis_service.generate_village_analysis(village_id)
+    if res.get('is_fallback'):
+        raise _FallbackResult(res)
+    await cache.set_cached(f"ai:village:{village_id}", res, ttl=12 * 3600)
+    return res
+
+
+_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    FARMLAND_INSIGHT: _run_farmland_insight,
+    VILLAGE_ANALYSIS: _run_village_analysis,
+}
+
+
+# ── Queue operations (worker side) ──────────────────────────────────
+_CLAIM_SQL = text("""
+UPDATE ai_jobs SET status = 'running', started_at = now(), heartbeat_at = now(), attempts = attempts + 1
+WHERE id = (
+    SELECT id FROM ai_jobs
+    WHERE status = 'queued' AND run_after <= now()
+    ORDER BY run_after
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING id, kind, payload, attempts, callback_url
+""")
+
+_FINISH_SQL = text("""
+UPDATE ai_jobs SET status = :status, result = CAST(:result AS json), error = :error, finished_at = now()
+WHERE id = :id
+""")
+
+_RETRY_SQL = text("""
+UPDATE ai_jobs SET status = 'queued', error = :error, started_at = NULL,
+       run_after = now() + make_interval(secs => :delay)
+WHERE id = :id
+""")
+
+_HEARTBEAT_SQL = text("""
+UPDATE ai_jobs SET heartbeat_at = now() WHERE id = :id AND status = 'running'
+""")
+
+_REAP_SQL = text("""
+UPDATE ai_jobs SET
+    status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'queued' END,
+    error = CASE WHEN attempts >= :max_attempts
+                 THEN 'abandoned by its worker ' || attempts || ' time(s)' ELSE error END,
+    finished_at = CASE WHEN attempts >= :max_attempts THEN now() END,
+    started_at = CASE WHEN attempts >= :max_attempts THEN started_at END,
+    heartbeat_at = NULL, run_after = now()
+WHERE status = 'running'
+  AND coalesce(heartbeat_at, started_at) < now() - make_interval(secs => :stale)
+RETURNING id, kind, status, error, callback_url
+""")
+
+
+async def claim_job() -> Optional[Dict[str, Any]]:
+    async with async_engine.begin() as conn:
+        row = (await conn.execute(_CLAIM_SQL)).mappings().first()
+    if row is None:
+        return None
+    job = dict(row)
+    if isinstance(job['payload'], str):
+        job['payload'] = json.loads(job['payload'])
+    return job
+
+
+async def _finish(job_id: UUID, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+    async with async_engine.begin() as conn:
+        await conn.execute(_FINISH_SQL, {
+            'id': job_id, 'status': status,
+            'result': json.dumps(result, default=str) if result is not None else None,
+            'error': error[:1024] if error else None,
+        })
+
+
+async def _retry(job_id: UUID, attempts: int, error: str) -> None:
+    delay = RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    async with async_engine.begin() as conn:
+        await conn.execute(_RETRY_SQL, {'id': job_id, 'error': error[:1024], 'delay': delay})
+    logger.warning('Job %s attempt %d failed (%s) — retrying in %ds', job_id, attempts, error, delay)
+
+
+async def reap_stale_jobs(stale_seconds: int = AI_JOB_STALE_SECONDS) -> int:
+    """Re-queue jobs left 'running' by a worker that died or hung mid-job,
+    or fail them once they are out of attempts."""
+    async with async_engine.begin() as conn:
+        rows = (await conn.execute(_REAP_SQL, {'stale': stale_seconds,
+                                                'max_attempts': AI_JOB_MAX_ATTEMPTS})).mappings().all()
+    for row in rows:
+        if row['status'] == FAILED:
+            logger.error('Job %s (%s) failed: %s', row['id'], row['kind'], row['error'])
+            await _notify(dict(row), FAILED, None, row['error'])
+    return len(rows)
+
+
+async def _heartbeat(job_id: UUID, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(_HEARTBEAT_SQL, {'id': job_id})
+        except Exception:
+            logger.warning('Heartbeat for job %s failed', job_id, exc_info=True)
+
+
+async def _notify(job: Dict[str, Any], status: str, result: Any, error: Optional[str]) -> None:
+    url = job.get('callback_url')
+    if not url:
+        return
+    import httpx
+
+    try:
+        await _validate_callback_url_async(url)
+    except CallbackRejected as exc:
+        logger.warning('Webhook for job %s not sent: %s', job['id'], exc)
+        return
+    body = json.dumps({
+        'job_id': str(job['id']), 'kind': job['kind'], 'status': status, 'result': result, 'error': error,
+        'finished_at': datetime.now(timezone.utc).isoformat(),
+    }, default=str).encode('utf-8')
+    signature = hmac.new(SECRET_KEY.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    try:
+        async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, follow_redirects=False) as client:
+            with track_outbound('webhook', 'job_callback'):
+                resp = await client.post(url, content=body, headers=outbound_headers({
+                    'Content-Type': 'application/json',
+                    'X-GramSight-Signature': f'sha256={signature}',
+                }))
+        if resp.status_code >= 400:
+            logger.warning('Webhook for job %s returned %s', job['id'], resp.status_code)
+    except Exception:
+        logger.warning('Webhook delivery for job %s failed', job['id'], exc_info=True)
+
+
+async def process_job(job: Dict[str, Any]) -> None:
+    handler = _HANDLERS.get(job['kind'])
+    attempts = job['attempts']
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Unknown job kind: {job['kind']}")
+        result = await handler(job['payload'])
+    except _FallbackResult as exc:
+        if attempts < AI_JOB_MAX_ATTEMPTS:
+            await _retry(job['id'], attempts, str(exc))
+            return
+        result = exc.result
+    except PermanentJobError as exc:
+        await _finish(job['id'], FAILED, None, str(exc))
+        await _notify(job, FAILED, None, str(exc))
+        return
+    except Exception as exc:
+        logger.exception('Job %s raised', job['id'])
+        if attempts < AI_JOB_MAX_ATTEMPTS:
+            await _retry(job['id'], attempts, repr(exc))
+            return
+        await _finish(job['id'], FAILED, None, repr(exc))
+        await _notify(job, FAILED, None, repr(exc))
+        return
+
+    await _finish(job['id'], SUCCEEDED, result, None)
+    await _notify(job, SUCCEEDED, result, None)
+    logger.info('Job %s (%s) succeeded after %d attempt(s)', job['id'], job['kind'], attempts)
+
+
+# ── Worker pool ─────────────────────────────────────────────────────
+async def _worker_loop(n: int, poll_seconds: float) -> None:
+    while True:
+        try:
+            job = await claim_job()
+        except Exception:
+            logger.exception('Job worker %d could not claim a job', n)
+            job = None
+        if job is None:
+            await asyncio.sleep(poll_seconds)
+            continue
+        # Logs and outbound calls made for the job carry its id.
+        token = request_id_var.set(f"job-{job['id']}")
+        heartbeat = asyncio.create_task(_heartbeat(job['id'], max(1.0, AI_JOB_STALE_SECONDS / 3)))
+        try:
+            with tracing.continue_trace(job['payload'].get('_trace'), f"job.{job['kind']}",
+                                        {'job.id': str(job['id']), 'job.attempt': job['attempts']}):
+                await process_job(job)
+        except Exception:
+            # Bookkeeping failed; the reaper re-queues the job once it goes stale.
+            logger.exception('Job worker %d failed while finishing job %s', n, job['id'])
+        finally:
+            heartbeat.cancel()
+            request_id_var.reset(token)
+
+
+async def _reaper_loop() -> None:
+    while True:
+        try:
+            reaped = await reap_stale_jobs()
+            if reaped:
+                logger.warning('Reaped %d stale AI jobs', reaped)
+        except Exception:
+            logger.exception('Stale job reaper failed')
+        await asyncio.sleep(REAP_INTERVAL_SECONDS)
+
+
+async def run_worker_pool(concurrency: int = AI_JOB_CONCURRENCY,
+                          poll_seconds: float = AI_JOB_POLL_SECONDS) -> None:
+    """Run ``concurrency`` job workers plus the stale-job reaper until cancelled."""
+    logger.info('Starting %d AI job workers', concurrency)
+    tasks = [asyncio.create_task(_worker_loop(i, poll_seconds)) for i in range(concurrency)]
+    tasks.append(asyncio.create_task(_reaper_loop()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
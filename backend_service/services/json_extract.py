@@ -0,0 +1,262 @@
+"""Structured-output extraction for model replies.
+
+:class:`JSONObjectScanner` finds the first balanced JSON object in a reply,
+fed whole or chunk by chunk as a stream arrives. It jumps between the only
+characters that matter (braces, quotes, backslashes) with one regex and
+keeps its state between chunks, so a stream is never rescanned. Prose, code fences and trailing text around
+the object are ignored. A balanced candidate that is not valid JSON (e.g.
+``{note}`` in a preamble) is skipped and the scan resumes just after it.
+
+:func:`parse_report` then checks the object against the report's schema,
+coercing near-misses (a string where a list is expected, a numeric string
+score, ``"high"`` for ``"High"``). Missing keys are filled with
+``'Not available'``. Outcomes are counted per report type and prompt
+version, so a prompt change that hurts parseability shows up in
+``GET /ai/admin/stats``.
+"""
+import json
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger('backend.json_extract')
+
+MISSING = 'Not available'
+_SIGNIFICANT = re.compile(r'[{}"\\]')
+
+
+class JSONObjectScanner:
+    """Incremental scanner for the first balanced, parseable JSON object."""
+
+    def __init__(self):
+        self.text = ''
+        self.value: Optional[Dict[str, Any]] = None
+        self.skipped = 0  # balanced candidates that were not valid JSON
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+
+    @classmethod
+    def from_text(cls, text: str) -> 'JSONObjectScanner':
+        """Scanner over a complete reply. A reply that is exactly one object
+        (the common case) goes straight to ``json.loads``."""
+        scanner = cls()
+        stripped = text.strip()
+        if stripped[:1] == '{' and stripped[-1:] == '}':
+            try:
+                value = json.loads(stripped)
+            except ValueError:
+                value = None
+            if isinstance(value, dict):
+                scanner.text, scanner.value = text, value
+                return scanner
+        scanner.feed(text)
+        scanner.finish()
+        return scanner
+
+    @property
+    def done(self) -> bool:
+        return self.value is not None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Add ``chunk``; returns the object once it is complete."""
+        self.text += chunk
+        if self.value is None:
+            self._scan()
+        return self.value
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """End of input: abandon an unterminated candidate (a stray ``{`` in
+        prose) and rescan after it."""
+        while self.value is None and self._start is not None:
+            self._pos = self._start + 1
+            self._start = None
+            self._scan()
+        return self.value
+
+    def _scan(self) -> None:
+        text = self.text
+        while True:
+            if self._start is None:
+                i = text.find('{', self._pos)
+                if i < 0:
+                    self._pos = len(text)
+                    return
+                self._start, self._depth, self._in_string = i, 1, False
+                self._pos = i + 1
+                continue
+            m = _SIGNIFICANT.search(text, self._pos)
+            if m is None:
+                self._pos = len(text)
+                return
+            ch = m.group()
+            if ch == '\\':
+                if self._in_string and m.end() >= len(text):
+                    self._pos = m.start()  # escape split across chunks — wait for more
+                    return
+                self._pos = m.end() + (1 if self._in_string else 0)
+                continue
+            self._pos = m.end()
+            if ch == '"':
+                self._in_string = not self._in_string
+            elif self._in_string:
+                continue
+            elif ch == '{':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0 and self._complete(text[self._start:self._pos]):
+                    return
+
+    def _complete(self, candidate: str) -> bool:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            self.value = value
+            return True
+        self.skipped += 1
+        self._pos = self._start + 1
+        self._start = None
+        return False
+
+
+def extract_json(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """First JSON object in ``text``, or None."""
+    if not text:
+        return None
+    return JSONObjectScanner.from_text(text).value
+
+
+# ── Report schemas ──────────────────────────────────────────────────
+TEXT, TEXT_LIST, SCORE, LEVEL = 'text', 'text_list', 'score', 'level'
+RISK_LEVELS = ('Low', 'Moderate', 'High', 'Critical')
+
+_ANALYSIS_SCHEMA = {
+    'weather_analysis': TEXT,
+    'market_analysis': TEXT,
+    'risk_assessment': TEXT,
+    'recommendations': TEXT_LIST,
+    'summary': TEXT,
+}
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    'village': _ANALYSIS_SCHEMA,
+    'farmer': _ANALYSIS_SCHEMA,
+    'farmland': {
+        'crop_suitability': TEXT,
+        'weather_risk': TEXT,
+        'price_opportunity': TEXT,
+        'irrigation_recommendation': TEXT,
+        'harvest_timing': TEXT,
+        'risk_score': SCORE,
+        'risk_level': LEVEL,
+        'recommendations': TEXT_LIST,
+        'summary': TEXT,
+    },
+}
+
+
+def _coerce(kind: str, value: Any) -> Tuple[Any, bool]:
+    """``(value, ok)`` — the value in the schema's shape, and whether the
+    original already had that shape."""
+    if kind == TEXT:
+        if isinstance(value, str):
+            return value, True
+        if isinstance(value, list):
+            return ' '.join(str(v) for v in value if v not in (None, '')), False
+        return (json.dumps(value) if isinstance(value, dict) else str(value)), False
+    if kind == TEXT_LIST:
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            return value, True
+        if isinstance(value, str):
+            return [value], False
+        if isinstance(value, list):
+            return [v if isinstance(v, str) else json.dumps(v) for v in value if v not in (None, '')], False
+        return [str(value)], False
+    if kind == SCORE:
+        if isinstance(value, bool):
+            return MISSING, False
+        if isinstance(value, (int, float)) and 0 <= value <= 100:
+            return value, True
+        try:
+            return max(0.0, min(100.0, float(str(value).strip().rstrip('%')))), False
+        except ValueError:
+            return MISSING, False
+    if kind == LEVEL:
+        if value in RISK_LEVELS:
+            return value, True
+        match = next((lvl for lvl in RISK_LEVELS if str(value).strip().lower() == lvl.lower()), None)
+        return (match or MISSING), False
+    return value, True
+
+
+def validate_report(report_type: str, obj: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Shape ``obj`` to the report schema. Returns ``(report, repaired)``;
+    keys outside the schema are kept as they are."""
+    schema = SCHEMAS[report_type]
+    report = dict(obj)
+    repaired = False
+    for key, kind in schema.items():
+        if key not in report or report[key] is None:
+            report[key] = MISSING
+            repaired = True
+            continue
+        report[key], ok = _coerce(kind, report[key])
+        repaired |= not ok
+    if schema.get('risk_level') == LEVEL and report['risk_level'] == MISSING \
+            and isinstance(report.get('risk_score'), (int, float)):
+        from backend_service.services.risk_engine_service import _risk_level_from_score
+        report['risk_level'] = _risk_level_from_score(report['risk_score'])
+    return report, repaired
+
+
+# ── Parse-outcome counters ──────────────────────────────────────────
+_parse_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(report_type: str, prompt_version: str, outcome: str) -> None:
+    counters = _parse_stats.setdefault(
+        f'{report_type}@{prompt_version}', {'parsed': 0, 'repaired': 0, 'failed': 0},
+    )
+    counters[outcome] += 1
+
+
+def parse_report(report_type: str, source: Union[str, JSONObjectScanner, None],
+                 prompt_version: str) -> Optional[Dict[str, Any]]:
+    """Extract and validate a ``report_type`` report from a reply (text, or a
+    scanner that was fed the stream). None if no object carrying any schema
+    key was found."""
+    scanner = source if isinstance(source, JSONObjectScanner) else JSONObjectScanner.from_text(source or '')
+    obj = scanner.finish()
+    if obj is None or not SCHEMAS[report_type].keys() & obj.keys():
+        _record(report_type, prompt_version, 'failed')
+        logger.warning('Unparseable %s reply (prompt_version=%s, %d chars)',
+                       report_type, prompt_version, len(scanner.text))
+        return None
+    report, repaired = validate_report(report_type, obj)
+    # Prose or a code fence around the object counts as a repair too.
+    stripped = scanner.text.strip()
+    repaired |= not (stripped.startswith('{') and stripped.endswith('}'))
+    _record(report_type, prompt_version, 'repaired' if repaired else 'parsed')
+    return report
+
+
+def check_entry(report_type: str, obj: Any, prompt_version: str) -> Optional[Dict[str, Any]]:
+    """Validate one already-extracted entry (e.g. one village of a batch)."""
+    if not isinstance(obj, dict) or not SCHEMAS[report_type].keys() & obj.keys():
+        _record(report_type, prompt_version, 'failed')
+        return None
+    report, repaired = validate_report(report_type, obj)
+    _record(report_type, prompt_version, 'repaired' if repaired else 'parsed')
+    return report
+
+
+def get_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """Per ``report_type@prompt_version`` outcome counts and failure rate."""
+    stats = {}
+    for key, counters in _parse_stats.items():
+        total = sum(counters.values())
+        stats[key] = {**counters, 'failure_rate': round(counters['failed'] / total, 4) if total else None}
+    return stats
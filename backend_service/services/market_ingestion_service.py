@@ -1,12 +1,13 @@
 import logging
 from datetime import datetime, timezone
-from dateutil import parser as dateparser
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import httpx
 from backend_service.config import MARKET_API_KEY
 from backend_service.models import MarketPrice
 from backend_service.database_async import AsyncSessionLocal
+from backend_service.core import tracing
+from backend_service.services import stats_service, trend_service
+from backend_service.services.ingestion_run_service import FAILED, SKIPPED, UNCHANGED, WRITTEN, fetch_json, note_village
 
 logger = logging.getLogger('backend.market_ingest')
 
@@ -43,10 +44,7 @@ async def fetch_market_prices(state: str, district: str, commodity: str, limit:
         'limit': limit,
         **filters,
     }
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        resp = await client.get(BASE_URL, params=params)
-        resp.raise_for_status()
-        return resp.json()
+    return await fetch_json('data_gov_in', 'mandi_prices', BASE_URL, params, timeout=20.0)
 
 
 async def ingest_market(db: AsyncSession, village_id, state: str, district: str,
@@ -62,6 +60,8 @@ async def ingest_market(db: AsyncSession, village_id, state: str, district: str,
         logger.exception('Market API fetch failed for village %s', village_id)
         raise
 
+    from dateutil import parser as dateparser
+
     records = body.get('records') or []
     saved = []
     for r in records:
@@ -131,6 +131,8 @@ async def ingest_market(db: AsyncSession, village_id, state: str, district: str,
         db.add(rec)
         saved.append(rec)
 
+    for stmt in stats_service.market_updates(saved) + trend_service.market_updates(saved):
+        await db.execute(stmt)
     if auto_commit:
         await db.commit()
         for s in saved:
@@ -160,11 +162,15 @@ async def ingest_market_for_all_villages(state: str = None, district: str = None
             if not v_state:
                 logger.warning('No state for village %s (district=%s) — skipping market ingest',
                                v.name, v_district)
+                note_village(SKIPPED)
                 continue
 
             try:
-                sv = await ingest_market(session, v.id, v_state, v_district, v_commodity)
+                with tracing.span('ingest.market.village', {'village.id': str(v.id), 'market.commodity': v_commodity}):
+                    sv = await ingest_market(session, v.id, v_state, v_district, v_commodity)
                 out.extend(sv)
+                note_village(WRITTEN if sv else UNCHANGED, rows=len(sv))
             except Exception:
+                note_village(FAILED)
                 logger.exception('Failed market ingest for village %s (%s)', v.name, v.id)
     return out
@@ -1,9 +1,12 @@
 from backend_service.models import MarketPrice
+from backend_service.services import stats_service, trend_service
 from datetime import datetime
 
 def create_market_entry(db, commodity: str, price: float, market_name: str = None):
     rec = MarketPrice(commodity=commodity, modal_price=price, market_name=market_name, created_at=datetime.utcnow())
     db.add(rec)
+    for stmt in stats_service.market_updates([rec]) + trend_service.market_updates([rec]):
+        db.execute(stmt)
     db.commit()
     db.refresh(rec)
     return rec
@@ -1,11 +1,14 @@
 from typing import Dict, Any, Optional
 from uuid import UUID
 import logging
-from sqlalchemy import select
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend_service.models import WeatherData, MarketPrice, RiskScore, SoilHealth
+from backend_service.models import WeatherData, MarketPrice, RiskScore, SoilHealth, LatestRiskScore, VILLAGE_SCOPE
 from backend_service.database_async import AsyncSessionLocal as async_session
+from backend_service.partitions import latest_rows_async, weather_window_start, market_window_start
+from backend_service.services import stats_service, trend_service
 
 logger = logging.getLogger(__name__)
 
@@ -80,81 +83,128 @@ def _soil_risk_score(soil: Optional[Any]) -> float:
     return min(20.0, score)
 
 
+async def _compute_village_risk(session: AsyncSession, village_id: UUID) -> Dict[str, Any]:
+    """Deterministic risk calculation (no writes). Returns score, level and breakdown."""
+    # fetch latest weather
+    weather_rows = await latest_rows_async(session, WeatherData, WeatherData.recorded_at, weather_window_start(), 7,
+                                           WeatherData.village_id == village_id)
+
+    # fetch recent market
+    market_rows = await latest_rows_async(session, MarketPrice, MarketPrice.created_at, market_window_start(), 7,
+                                          MarketPrice.village_id == village_id)
+
+    # fetch latest soil health
+    q3 = select(SoilHealth).where(SoilHealth.village_id == village_id).limit(1)
+    res3 = await session.execute(q3)
+    soil_row = res3.scalars().first()
+
+    # ---- Weather risk (40%) ----
+    weather_component = 0.0
+    has_weather = bool(weather_rows)
+    if has_weather:
+        temps = [w.temperature for w in weather_rows if w.temperature is not None]
+        humidity = [w.humidity for w in weather_rows if w.humidity is not None]
+        rain = [w.rainfall for w in weather_rows if w.rainfall is not None]
+        uvi = [w.uvi for w in weather_rows if w.uvi is not None]
+
+        avg_temp = sum(temps) / len(temps) if temps else 0.0
+        avg_hum = sum(humidity) / len(humidity) if humidity else 0.0
+        total_rain = sum(rain) if rain else 0.0
+        avg_uvi = sum(uvi) / len(uvi) if uvi else 0.0
+
+        if avg_temp > 35:
+            weather_component += 15
+        if avg_temp < 10:
+            weather_component += 15
+        if avg_hum > 85:
+            weather_component += 10
+        if total_rain > 100:
+            weather_component += 10
+        if avg_uvi > 8:
+            weather_component += 5
+    else:
+        weather_component = 20.0  # insufficient data → moderate default
+    weather_component = min(40.0, weather_component)
+
+    # ---- Market risk (30%) ----
+    market_component = _market_trend_score(market_rows)
+    market_component = min(30.0, market_component)
+
+    # ---- Soil risk (20%) ----
+    soil_component = _soil_risk_score(soil_row)
+
+    # ---- Historical modifier (10%) ----
+    historical_component = 5.0  # baseline until historical trend is implemented
+
+    total = weather_component + market_component + soil_component + historical_component
+    score = max(0.0, min(100.0, total))
+    level = _risk_level_from_score(score)
+
+    breakdown = {
+        'weather': weather_component,
+        'market': market_component,
+        'soil': soil_component,
+        'historical': historical_component,
+        'has_weather_data': has_weather,
+        'has_soil_data': soil_row is not None,
+    }
+
+    return {'score': score, 'risk_level': level, 'breakdown': breakdown}
+
+
+async def _persist_risk(session: AsyncSession, village_id: UUID, farmer_id: Optional[UUID],
+                        score: float, level: str, breakdown: dict) -> bool:
+    """Upsert the latest score and append history only when it changed.
+
+    Repeated recalculations with unchanged inputs therefore cost one upsert
+    instead of a new ``risk_scores`` row. Returns True if history was written.
+
+    The upsert itself decides ``changed``. It only inserts or updates when the
+    score or level differs, and returns a row when it did. Two concurrent
+    first calculations therefore cannot both see "no previous score": the
+    second waits on the first one's row and then compares against it.
+    """
+    scope = farmer_id or VILLAGE_SCOPE
+    stmt = pg_insert(LatestRiskScore).values(
+        village_id=village_id, farmer_id=scope, score=score, risk_level=level,
+        breakdown=breakdown, calculated_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LatestRiskScore.village_id, LatestRiskScore.farmer_id],
+        set_={
+            'score': stmt.excluded.score,
+            'risk_level': stmt.excluded.risk_level,
+            'breakdown': stmt.excluded.breakdown,
+            'calculated_at': stmt.excluded.calculated_at,
+        },
+        where=tuple_(LatestRiskScore.score, LatestRiskScore.risk_level).is_distinct_from(
+            tuple_(stmt.excluded.score, stmt.excluded.risk_level)),
+    ).returning(LatestRiskScore.village_id)
+    changed = (await session.execute(stmt)).first() is not None
+
+    if not changed:
+        # Same score and level: just refresh the latest row.
+        await session.execute(
+            update(LatestRiskScore)
+            .where(LatestRiskScore.village_id == village_id, LatestRiskScore.farmer_id == scope)
+            .values(breakdown=breakdown, calculated_at=func.now())
+        )
+
+    if changed:
+        risk = RiskScore(village_id=village_id, farmer_id=farmer_id, score=score, risk_level=level, breakdown=breakdown)
+        session.add(risk)
+        for stmt in [stats_service.increment('risk_scores')] + trend_service.risk_updates([risk]):
+            await session.execute(stmt)
+    return changed
+
+
 async def calculate_village_risk(village_id: UUID) -> Dict[str, Any]:
-    """Deterministic risk calculation. Returns score, level and breakdown."""
+    """Calculate and persist village risk. Returns score, level and breakdown."""
     async with async_session() as session:  # type: AsyncSession
-        # fetch latest weather
-        q = select(WeatherData).where(WeatherData.village_id == village_id).order_by(WeatherData.recorded_at.desc()).limit(7)
-        res = await session.execute(q)
-        weather_rows = res.scalars().all()
-
-        # fetch recent market
-        q2 = select(MarketPrice).where(MarketPrice.village_id == village_id).order_by(MarketPrice.created_at.desc()).limit(7)
-        res2 = await session.execute(q2)
-        market_rows = res2.scalars().all()
-
-        # fetch latest soil health
-        q3 = select(SoilHealth).where(SoilHealth.village_id == village_id).limit(1)
-        res3 = await session.execute(q3)
-        soil_row = res3.scalars().first()
-
-        # ---- Weather risk (40%) ----
-        weather_component = 0.0
-        has_weather = bool(weather_rows)
-        if has_weather:
-            temps = [w.temperature for w in weather_rows if w.temperature is not None]
-            humidity = [w.humidity for w in weather_rows if w.humidity is not None]
-            rain = [w.rainfall for w in weather_rows if w.rainfall is not None]
-            uvi = [w.uvi for w in weather_rows if w.uvi is not None]
-
-            avg_temp = sum(temps) / len(temps) if temps else 0.0
-            avg_hum = sum(humidity) / len(humidity) if humidity else 0.0
-            total_rain = sum(rain) if rain else 0.0
-            avg_uvi = sum(uvi) / len(uvi) if uvi else 0.0
-
-            if avg_temp > 35:
-                weather_component += 15
-            if avg_temp < 10:
-                weather_component += 15
-            if avg_hum > 85:
-                weather_component += 10
-            if total_rain > 100:
-                weather_component += 10
-            if avg_uvi > 8:
-                weather_component += 5
-        else:
-            weather_component = 20.0  # insufficient data → moderate default
-        weather_component = min(40.0, weather_component)
-
-        # ---- Market risk (30%) ----
-        market_component = _market_trend_score(market_rows)
-        market_component = min(30.0, market_component)
-
-        # ---- Soil risk (20%) ----
-        soil_component = _soil_risk_score(soil_row)
-
-        # ---- Historical modifier (10%) ----
-        historical_component = 5.0  # baseline until historical trend is implemented
-
-        total = weather_component + market_component + soil_component + historical_component
-        score = max(0.0, min(100.0, total))
-        level = _risk_level_from_score(score)
-
-        breakdown = {
-            'weather': weather_component,
-            'market': market_component,
-            'soil': soil_component,
-            'historical': historical_component,
-            'has_weather_data': has_weather,
-            'has_soil_data': soil_row is not None,
-        }
-
-        # persist risk score
-        risk = RiskScore(village_id=village_id, farmer_id=None, score=score, risk_level=level, breakdown=breakdown)
-        session.add(risk)
+        res = await _compute_village_risk(session, village_id)
+        await _persist_risk(session, village_id, None, res['score'], res['risk_level'], res['breakdown'])
         await session.commit()
-
-    return {'score': score, 'risk_level': level, 'breakdown': breakdown}
+    return res
 
 
 async def calculate_farmer_risk(farmer_id: UUID, village_id: Optional[UUID] = None) -> Dict[str, Any]:
@@ -162,17 +212,65 @@ async def calculate_farmer_risk(farmer_id: UUID, village_id: Optional[UUID] = No
     if village_id is None:
         return {'error': 'village_id required for farmer risk'}
 
-    base = await calculate_village_risk(village_id)
-    score = base.get('score', 0.0)
-    crop_modifier = 5.0
-    final_score = max(0.0, min(100.0, score + crop_modifier))
-    level = _risk_level_from_score(final_score)
-    breakdown = base.get('breakdown', {})
-    breakdown['crop_modifier'] = crop_modifier
+    async with async_session() as session:  # type: AsyncSession
+        base = await _compute_village_risk(session, village_id)
+        score = base.get('score', 0.0)
+        crop_modifier = 5.0
+        final_score = max(0.0, min(100.0, score + crop_modifier))
+        level = _risk_level_from_score(final_score)
+        breakdown = dict(base.get('breakdown', {}))
+        breakdown['crop_modifier'] = crop_modifier
 
-    async with async_session() as session:
-        risk = RiskScore(village_id=village_id, farmer_id=farmer_id, score=final_score, risk_level=level, breakdown=breakdown)
-        session.add(risk)
+        # One transaction: refresh the village's latest score and the farmer's.
+        await _persist_risk(session, village_id, None, base['score'], base['risk_level'], base['breakdown'])
+        await _persist_risk(session, village_id, farmer_id, final_score, level, breakdown)
         await session.commit()
 
     return {'score': final_score, 'risk_level': level, 'breakdown': breakdown}
+
+
+# ── Maintenance ─────────────────────────────────────────────────────
+_COMPACT_SQL = """
+DELETE FROM risk_scores r
+USING (
+    SELECT id FROM (
+        SELECT id, score, risk_level,
+               lag(score) OVER w AS prev_score,
+               lag(risk_level) OVER w AS prev_level,
+               row_number() OVER w AS rn
+        FROM risk_scores
+        WINDOW w AS (PARTITION BY village_id, farmer_id ORDER BY calculated_at, id)
+    ) s
+    WHERE rn > 1 AND prev_score = score AND prev_level = risk_level
+) dup
+WHERE r.id = dup.id
+"""
+
+_SYNC_LATEST_SQL = """
+INSERT INTO latest_risk_scores (village_id, farmer_id, score, risk_level, breakdown, calculated_at)
+SELECT DISTINCT ON (village_id, coalesce(farmer_id, :scope))
+       village_id, coalesce(farmer_id, :scope), score, risk_level, breakdown, calculated_at
+FROM risk_scores
+WHERE village_id IS NOT NULL
+ORDER BY village_id, coalesce(farmer_id, :scope), calculated_at DESC
+ON CONFLICT (village_id, farmer_id) DO UPDATE SET
+    score = EXCLUDED.score,
+    risk_level = EXCLUDED.risk_level,
+    breakdown = EXCLUDED.breakdown,
+    calculated_at = EXCLUDED.calculated_at
+WHERE latest_risk_scores.calculated_at < EXCLUDED.calculated_at
+"""
+
+
+def sync_latest_from_history(conn) -> int:
+    """Bring ``latest_risk_scores`` up to date with the newest history rows
+    (e.g. after seeding or a migration). Returns rows upserted."""
+    return conn.execute(text(_SYNC_LATEST_SQL), {'scope': VILLAGE_SCOPE}).rowcount
+
+
+def compact_risk_history(conn) -> int:
+    """Delete history rows that repeat the previous score and level for the
+    same (village, farmer). Returns the number of rows removed."""
+    removed = conn.execute(text(_COMPACT_SQL)).rowcount
+    sync_latest_from_history(conn)
+    return removed
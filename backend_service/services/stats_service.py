@@ -0,0 +1,192 @@
+"""Maintained counters behind /analytics/summary and /demo/status.
+
+Ingestion and write paths bump rows in ``app_stats`` / ``city_weather_stats``
+in the same transaction as the data they describe, so the read endpoints
+never have to ``count(*)`` or aggregate the big tables. Each counter is
+split over ``STATS_COUNTER_SHARDS`` rows and every update picks one at
+random. Concurrent ingest transactions therefore rarely queue on the same
+row lock, and readers add the shards up, or take their max for maxima. An hourly
+reconciliation (:func:`recompute_stats`) rebuilds everything from scratch
+to absorb writes that bypass the counters (seeding, purges, manual SQL).
+
+Readers go through :func:`get_snapshot`, which is cached in Redis for a
+few seconds — an anonymous client hammering ``/demo/status`` costs at most
+one small indexed read per TTL.
+"""
+import logging
+import random
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend_service.config import STATS_COUNTER_SHARDS, STATS_SNAPSHOT_TTL
+from backend_service.models import AppStat, CityWeatherStat, User
+
+logger = logging.getLogger('backend.stats')
+
+SNAPSHOT_KEY = 'stats:snapshot'
+DEMO_USER_EMAILS = {
+    'farmer': 'demo-farmer@gramsight.ai',
+    'admin': 'demo-admin@gramsight.ai',
+}
+MAX_CITIES = 500
+# Counters maintained with raise_max: shards combine by max, not sum.
+MAX_KEYS = {'max_modal_price'}
+
+# stat key -> SQL computing its exact value (used by recompute_stats)
+_RECOMPUTE_SQL = {
+    'weather_entries': 'SELECT count(*) FROM weather_data',
+    'market_entries': 'SELECT count(*) FROM market_prices',
+    'max_modal_price': 'SELECT max(modal_price) FROM market_prices',
+    'villages': 'SELECT count(*) FROM villages',
+    'risk_scores': 'SELECT count(*) FROM risk_scores',
+    'soil_entries': 'SELECT count(*) FROM soil_health',
+    'advisory_entries': "SELECT count(*) FROM ai_reports WHERE report_type = 'advisory'",
+    'farmer_count': "SELECT count(*) FROM users WHERE role = 'farmer'",
+}
+
+
+# ── Statement builders (usable from sync and async sessions) ─────────
+def _shard() -> int:
+    return random.randrange(STATS_COUNTER_SHARDS)
+
+
+def increment(key: str, delta: float = 1):
+    stmt = pg_insert(AppStat).values(key=key, shard=_shard(), value=delta, updated_at=func.now())
+    return stmt.on_conflict_do_update(
+        index_elements=[AppStat.key, AppStat.shard],
+        set_={'value': AppStat.value + stmt.excluded.value, 'updated_at': func.now()},
+    )
+
+
+def raise_max(key: str, value: float):
+    stmt = pg_insert(AppStat).values(key=key, shard=_shard(), value=value, updated_at=func.now())
+    return stmt.on_conflict_do_update(
+        index_elements=[AppStat.key, AppStat.shard],
+        set_={'value': func.greatest(AppStat.value, stmt.excluded.value), 'updated_at': func.now()},
+    )
+
+
+def weather_updates(records: Iterable[Any]) -> List[Any]:
+    """Statements accounting for newly inserted WeatherData rows."""
+    records = list(records)
+    if not records:
+        return []
+    stmts = [increment('weather_entries', len(records))]
+    per_city: Dict[str, List[float]] = {}
+    for r in records:
+        if r.city is not None and r.temperature is not None:
+            per_city.setdefault(r.city, []).append(r.temperature)
+    for city, temps in per_city.items():
+        stmt = pg_insert(CityWeatherStat).values(
+            city=city, shard=_shard(), temperature_sum=sum(temps), sample_count=len(temps), updated_at=func.now(),
+        )
+        stmts.append(stmt.on_conflict_do_update(
+            index_elements=[CityWeatherStat.city, CityWeatherStat.shard],
+            set_={
+                'temperature_sum': CityWeatherStat.temperature_sum + stmt.excluded.temperature_sum,
+                'sample_count': CityWeatherStat.sample_count + stmt.excluded.sample_count,
+                'updated_at': func.now(),
+            },
+        ))
+    return stmts
+
+
+def market_updates(records: Iterable[Any]) -> List[Any]:
+    """Statements accounting for newly inserted MarketPrice rows."""
+    records = list(records)
+    if not records:
+        return []
+    stmts = [increment('market_entries', len(records))]
+    prices = [r.modal_price for r in records if r.modal_price is not None]
+    if prices:
+        stmts.append(raise_max('max_modal_price', max(prices)))
+    return stmts
+
+
+# ── Reconciliation ──────────────────────────────────────────────────
+def recompute_stats(conn) -> Dict[str, float]:
+    """Rebuild every counter from the source tables (slow; worker only).
+    Each counter collapses into shard 0."""
+    values = {}
+    for key, sql in _RECOMPUTE_SQL.items():
+        values[key] = conn.execute(text(sql)).scalar()
+    for key, value in values.items():
+        if value is None:
+            conn.execute(text('DELETE FROM app_stats WHERE key = :k'), {'k': key})
+            continue
+        conn.execute(text('DELETE FROM app_stats WHERE key = :k AND shard <> 0'), {'k': key})
+        conn.execute(
+            text(
+                'INSERT INTO app_stats (key, shard, value, updated_at) VALUES (:k, 0, :v, now()) '
+                'ON CONFLICT (key, shard) DO UPDATE SET value = EXCLUDED.value, updated_at = now()'
+            ),
+            {'k': key, 'v': float(value)},
+        )
+    conn.execute(text('DELETE FROM city_weather_stats'))
+    conn.execute(text(
+        'INSERT INTO city_weather_stats (city, shard, temperature_sum, sample_count, updated_at) '
+        'SELECT city, 0, coalesce(sum(temperature), 0), count(temperature), now() FROM weather_data '
+        'WHERE city IS NOT NULL GROUP BY city'
+    ))
+    return values
+
+
+# ── Readers ─────────────────────────────────────────────────────────
+def _build_snapshot(db: Session) -> Dict[str, Any]:
+    stats = {
+        key: (largest if key in MAX_KEYS else total)
+        for key, total, largest in db.query(AppStat.key, func.sum(AppStat.value), func.max(AppStat.value))
+        .group_by(AppStat.key)
+    }
+    cities = (
+        db.query(
+            CityWeatherStat.city,
+            func.sum(CityWeatherStat.temperature_sum).label('temperature_sum'),
+            func.sum(CityWeatherStat.sample_count).label('sample_count'),
+        )
+        .group_by(CityWeatherStat.city)
+        .having(func.sum(CityWeatherStat.sample_count) > 0)
+        .order_by(CityWeatherStat.city)
+        .limit(MAX_CITIES)
+        .all()
+    )
+    demo_emails = (
+        db.query(User.email)
+        .filter(User.email.in_(list(DEMO_USER_EMAILS.values())))
+        .all()
+    )
+    present = {e for (e,) in demo_emails}
+    return {
+        'stats': stats,
+        'avg_temp_per_city': [
+            {'city': c.city, 'avg_temp': round(c.temperature_sum / c.sample_count, 2)} for c in cities
+        ],
+        'demo_users': {role: (email if email in present else None) for role, email in DEMO_USER_EMAILS.items()},
+    }
+
+
+def get_snapshot(db: Session) -> Dict[str, Any]:
+    """Counters snapshot, served from Redis when fresh."""
+    from backend_service import cache
+
+    try:
+        cached = cache.get_cached_sync(SNAPSHOT_KEY)
+        if isinstance(cached, dict):
+            return cached
+    except Exception:
+        logger.warning('Stats snapshot cache read failed', exc_info=True)
+
+    snap = _build_snapshot(db)
+    try:
+        cache.set_cached_sync(SNAPSHOT_KEY, snap, ttl=STATS_SNAPSHOT_TTL)
+    except Exception:
+        logger.warning('Stats snapshot cache write failed', exc_info=True)
+    return snap
+
+
+def stat(snapshot: Dict[str, Any], key: str, default: float = 0) -> float:
+    value = snapshot.get('stats', {}).get(key)
+    return default if value is None else value
@@ -0,0 +1,114 @@
+"""Monthly and weekly trend aggregates for the admin dashboard charts.
+
+``trend_aggregates`` keeps a running sum and sample count per
+(metric, period, bucket). Market ingestion and risk persistence add to it
+in the same transaction as their inserts, so ``/admin/market-trend`` and
+``/admin/risk-trend`` read a handful of rows instead of grouping the whole
+history. :func:`rebuild_trends` backfills from scratch
+(``scripts/backfill_trends.py``).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Tuple
+
+from sqlalchemy import desc, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend_service.models import TrendAggregate
+
+MARKET_PRICE = 'market_modal_price'
+RISK_SCORE = 'risk_score'
+PERIODS = ('month', 'week')
+
+# metric -> (source table, timestamp column, value column)
+_SOURCES = {
+    MARKET_PRICE: ('market_prices', 'created_at', 'modal_price'),
+    RISK_SCORE: ('risk_scores', 'calculated_at', 'score'),
+}
+
+
+def bucket_start(ts: datetime, period: str) -> datetime:
+    """UTC bucket start, matching ``date_trunc(period, ts, 'UTC')``."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    ts = ts.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'month':
+        return ts.replace(day=1)
+    if period == 'week':
+        return ts - timedelta(days=ts.weekday())
+    raise ValueError(f'unknown period {period!r}')
+
+
+def _updates(metric: str, samples: Iterable[Tuple[datetime, float]]) -> List[Any]:
+    buckets = {}
+    for ts, value in samples:
+        if value is None:
+            continue
+        for period in PERIODS:
+            key = (period, bucket_start(ts, period))
+            total, count = buckets.get(key, (0.0, 0))
+            buckets[key] = (total + value, count + 1)
+
+    stmts = []
+    for (period, start), (total, count) in buckets.items():
+        stmt = pg_insert(TrendAggregate).values(
+            metric=metric, period=period, bucket_start=start,
+            value_sum=total, sample_count=count, updated_at=func.now(),
+        )
+        stmts.append(stmt.on_conflict_do_update(
+            index_elements=[TrendAggregate.metric, TrendAggregate.period, TrendAggregate.bucket_start],
+            set_={
+                'value_sum': TrendAggregate.value_sum + stmt.excluded.value_sum,
+                'sample_count': TrendAggregate.sample_count + stmt.excluded.sample_count,
+                'updated_at': func.now(),
+            },
+        ))
+    return stmts
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def market_updates(records: Iterable[Any]) -> List[Any]:
+    """Statements accounting for newly inserted MarketPrice rows."""
+    return _updates(MARKET_PRICE, ((r.created_at or _now(), r.modal_price) for r in records))
+
+
+def risk_updates(records: Iterable[Any]) -> List[Any]:
+    """Statements accounting for newly inserted RiskScore rows."""
+    return _updates(RISK_SCORE, ((r.calculated_at or _now(), r.score) for r in records))
+
+
+def read_trend(db: Session, metric: str, period: str, limit: int) -> List[Tuple[datetime, float]]:
+    """Oldest-first (bucket_start, average) pairs for the latest ``limit`` buckets."""
+    rows = (
+        db.query(TrendAggregate)
+        .filter(TrendAggregate.metric == metric, TrendAggregate.period == period)
+        .order_by(desc(TrendAggregate.bucket_start))
+        .limit(limit)
+        .all()
+    )
+    return [
+        (r.bucket_start, r.value_sum / r.sample_count if r.sample_count else None)
+        for r in reversed(rows)
+    ]
+
+
+def rebuild_trends(conn) -> int:
+    """Recompute every aggregate from the source tables. Returns rows written."""
+    conn.execute(text('DELETE FROM trend_aggregates'))
+    written = 0
+    for metric, (table, ts_col, value_col) in _SOURCES.items():
+        for period in PERIODS:
+            written += conn.execute(
+                text(
+                    'INSERT INTO trend_aggregates '
+                    '(metric, period, bucket_start, value_sum, sample_count, updated_at) '
+                    f"SELECT :metric, :period, date_trunc(:period, {ts_col}, 'UTC') AS bucket, "
+                    f'sum({value_col}), count({value_col}), now() '
+                    f'FROM {table} WHERE {value_col} IS NOT NULL GROUP BY bucket'
+                ),
+                {'metric': metric, 'period': period},
+            ).rowcount
+    return written
@@ -2,10 +2,12 @@ import logging
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import httpx
 from backend_service.config import OPENWEATHER_API_KEY
 from backend_service.models import WeatherData
 from backend_service.database_async import AsyncSessionLocal
+from backend_service.core import tracing
+from backend_service.services import stats_service
+from backend_service.services.ingestion_run_service import FAILED, SKIPPED, UNCHANGED, WRITTEN, fetch_json, note_village
 
 logger = logging.getLogger('backend.weather_ingest')
 
@@ -19,10 +21,7 @@ async def fetch_weather(lat: float, lon: float):
         'appid': OPENWEATHER_API_KEY,
         'units': 'metric'
     }
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.get(OPENWEATHER_URL, params=params)
-        resp.raise_for_status()
-        return resp.json()
+    return await fetch_json('openweather', 'onecall', OPENWEATHER_URL, params, timeout=15.0)
 
 
 async def ingest_weather(db: AsyncSession, village_id, lat: float, lon: float,
@@ -87,6 +86,8 @@ async def ingest_weather(db: AsyncSession, village_id, lat: float, lon: float,
         recorded_at=now_utc,
     )
     db.add(rec)
+    for stmt in stats_service.weather_updates([rec]):
+        await db.execute(stmt)
     if auto_commit:
         await db.commit()
         await db.refresh(rec)
@@ -103,14 +104,18 @@ async def ingest_weather_for_all_villages():
         results = []
         for v in villages:
             if getattr(v, 'latitude', None) is None or getattr(v, 'longitude', None) is None:
+                note_village(SKIPPED)
                 continue
             try:
-                r = await ingest_weather(
-                    session, v.id, float(v.latitude), float(v.longitude),
-                    city_name=v.name,
-                )
+                with tracing.span('ingest.weather.village', {'village.id': str(v.id)}):
+                    r = await ingest_weather(
+                        session, v.id, float(v.latitude), float(v.longitude),
+                        city_name=v.name,
+                    )
                 if r is not None:
                     results.append(r)
+                note_village(WRITTEN if r is not None else UNCHANGED, rows=int(r is not None))
             except Exception:
+                note_village(FAILED)
                 logger.exception('Failed to ingest weather for village %s (%s)', v.name, v.id)
     return results
@@ -0,0 +1,179 @@
+"""Weather downsampling: hourly/daily rollups, raw-data retention and the
+history reader that stitches raw and rolled-up rows back together.
+
+Raw ``weather_data`` rows are only needed for recent charts and the risk
+engine. Older history is served from ``weather_hourly`` / ``weather_daily``.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+from uuid import UUID
+
+from sqlalchemy import desc, text
+from sqlalchemy.orm import Session
+
+from backend_service.config import WEATHER_RAW_RETENTION_DAYS, WEATHER_HOURLY_RETENTION_DAYS
+from backend_service.database_async import async_engine
+from backend_service.models import WeatherData, WeatherHourly, WeatherDaily
+from backend_service.partitions import drop_partitions_before, latest_rows, weather_window_start
+
+logger = logging.getLogger('backend.weather_rollup')
+
+_GRAINS = {
+    'hour': WeatherHourly.__tablename__,
+    'day': WeatherDaily.__tablename__,
+}
+
+# Each raw reading carries OpenWeather's running rainfall total for the day,
+# so the bucket's rainfall is the largest reading, not the sum of readings.
+_ROLLUP_SQL = """
+INSERT INTO {target} (
+    village_id, bucket_start, city,
+    temp_min, temp_max, temp_avg,
+    humidity_min, humidity_max, humidity_avg,
+    rainfall_total, uvi_avg, uvi_max, wind_speed_avg,
+    sample_count, updated_at
+)
+SELECT
+    village_id,
+    date_trunc(:grain, recorded_at, 'UTC') AS bucket,
+    max(city),
+    min(temperature), max(temperature), avg(temperature),
+    min(humidity), max(humidity), avg(humidity),
+    max(rainfall), avg(uvi), max(uvi), avg(wind_speed),
+    count(*), now()
+FROM weather_data
+WHERE village_id IS NOT NULL
+  AND recorded_at >= :since
+GROUP BY village_id, bucket
+ON CONFLICT (village_id, bucket_start) DO UPDATE SET
+    city = EXCLUDED.city,
+    temp_min = EXCLUDED.temp_min,
+    temp_max = EXCLUDED.temp_max,
+    temp_avg = EXCLUDED.temp_avg,
+    humidity_min = EXCLUDED.humidity_min,
+    humidity_max = EXCLUDED.humidity_max,
+    humidity_avg = EXCLUDED.humidity_avg,
+    rainfall_total = EXCLUDED.rainfall_total,
+    uvi_avg = EXCLUDED.uvi_avg,
+    uvi_max = EXCLUDED.uvi_max,
+    wind_speed_avg = EXCLUDED.wind_speed_avg,
+    sample_count = EXCLUDED.sample_count,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+def _rollup(conn, grain: str) -> int:
+    """Upsert ``grain`` buckets from the last rolled-up bucket onward.
+
+    The most recent bucket is recomputed every run because it was still
+    filling up last time; on the first run everything is backfilled.
+    """
+    target = _GRAINS[grain]
+    last = conn.execute(text(f'SELECT max(bucket_start) FROM {target}')).scalar()
+    since = last if last is not None else datetime(1970, 1, 1, tzinfo=timezone.utc)
+    res = conn.execute(text(_ROLLUP_SQL.format(target=target)), {'grain': grain, 'since': since})
+    return res.rowcount
+
+
+def _purge(conn, raw_days: int, hourly_days: int) -> Dict[str, int]:
+    now = datetime.now(timezone.utc)
+    raw_cutoff = now - timedelta(days=raw_days)
+
+    # Never purge raw rows newer than the last daily rollup.
+    last_daily = conn.execute(text(f'SELECT max(bucket_start) FROM {WeatherDaily.__tablename__}')).scalar()
+    if last_daily is None:
+        logger.info('No daily rollups yet — skipping raw weather purge')
+        return {'partitions_dropped': 0, 'raw_deleted': 0, 'hourly_deleted': 0}
+    raw_cutoff = min(raw_cutoff, last_daily)
+
+    dropped = drop_partitions_before(conn, WeatherData.__tablename__, raw_cutoff)
+    raw_deleted = conn.execute(
+        text('DELETE FROM weather_data WHERE recorded_at < :cutoff'), {'cutoff': raw_cutoff},
+    ).rowcount
+    hourly_deleted = conn.execute(
+        text(f'DELETE FROM {WeatherHourly.__tablename__} WHERE bucket_start < :cutoff'),
+        {'cutoff': now - timedelta(days=hourly_days)},
+    ).rowcount
+    return {'partitions_dropped': dropped, 'raw_deleted': raw_deleted, 'hourly_deleted': hourly_deleted}
+
+
+async def rollup_weather() -> Dict[str, int]:
+    """Refresh hourly and daily rollups. Safe to run repeatedly."""
+    async with async_engine.begin() as conn:
+        hourly = await conn.run_sync(_rollup, 'hour')
+        daily = await conn.run_sync(_rollup, 'day')
+    return {'hourly': hourly, 'daily': daily}
+
+
+async def purge_weather(raw_days: int = WEATHER_RAW_RETENTION_DAYS,
+                        hourly_days: int = WEATHER_HOURLY_RETENTION_DAYS) -> Dict[str, int]:
+    """Delete raw rows past the retention window (after rolling them up)."""
+    await rollup_weather()
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(_purge, raw_days, hourly_days)
+
+
+# ── History reader ──────────────────────────────────────────────────
+def weather_record(r: WeatherData) -> Dict[str, Any]:
+    return {
+        "temperature": r.temperature,
+        "humidity": r.humidity,
+        "rainfall": r.rainfall or 0,
+        "wind_speed": r.wind_speed or 0,
+        "description": r.description or "",
+        "recorded_at": r.recorded_at.isoformat() if r.recorded_at else None,
+        "granularity": "raw",
+    }
+
+
+def _rollup_record(r, granularity: str) -> Dict[str, Any]:
+    return {
+        "temperature": round(r.temp_avg, 2) if r.temp_avg is not None else None,
+        "temp_min": r.temp_min,
+        "temp_max": r.temp_max,
+        "humidity": round(r.humidity_avg, 1) if r.humidity_avg is not None else None,
+        "rainfall": r.rainfall_total or 0,
+        "wind_speed": round(r.wind_speed_avg, 2) if r.wind_speed_avg is not None else 0,
+        "uvi": r.uvi_avg,
+        "description": "",
+        "recorded_at": r.bucket_start.isoformat() if r.bucket_start else None,
+        "granularity": granularity,
+    }
+
+
+def _bucket_floor(ts: datetime, granularity: str) -> datetime:
+    """Start of the UTC ``granularity`` ('hour' or 'day') bucket holding ``ts``,
+    matching ``date_trunc(granularity, ts, 'UTC')`` in the rollup SQL."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == 'day' else ts
+
+
+def weather_history(db: Session, village_id: UUID, limit: int) -> List[Dict[str, Any]]:
+    """Newest-first weather history for a village.
+
+    Raw rows are used while they last; older points come from the hourly
+    and then the daily rollups, so callers see one continuous series. Each
+    coarser level only contributes buckets that end at or before the start
+    of the bucket holding the oldest point so far. The bucket that overlaps
+    finer data is never shown a second time.
+    """
+    raw = latest_rows(db, WeatherData, WeatherData.recorded_at, weather_window_start(), limit,
+                      WeatherData.village_id == village_id)
+    records = [weather_record(r) for r in raw]
+    oldest = raw[-1].recorded_at if raw else None
+
+    for model, granularity in ((WeatherHourly, 'hour'), (WeatherDaily, 'day')):
+        remaining = limit - len(records)
+        if remaining <= 0:
+            break
+        q = db.query(model).filter(model.village_id == village_id)
+        if oldest is not None:
+            q = q.filter(model.bucket_start < _bucket_floor(oldest, granularity))
+        rows = q.order_by(desc(model.bucket_start)).limit(remaining).all()
+        records.extend(_rollup_record(r, granularity) for r in rows)
+        if rows:
+            oldest = rows[-1].bucket_start
+    return records
@@ -1,17 +1,22 @@
 import os
-import requests
 from datetime import datetime
 from typing import Any, Dict
+from backend_service.core.request_context import outbound_headers
+from backend_service.metrics import track_outbound
 from backend_service.models import WeatherData
+from backend_service.services import stats_service
 
 OPENWEATHER_KEY = os.getenv('OPENWEATHER_API_KEY', '')
 OPENWEATHER_URL = 'https://api.openweathermap.org/data/2.5/weather'
 
 
 def fetch_weather_for_city(city: str) -> Dict[str, Any]:
+    import requests  # only this helper uses it; keep it off the import path
+
     params = {'q': city, 'appid': OPENWEATHER_KEY}
-    resp = requests.get(OPENWEATHER_URL, params=params, timeout=10)
-    resp.raise_for_status()
+    with track_outbound('openweather', 'current'):
+        resp = requests.get(OPENWEATHER_URL, params=params, headers=outbound_headers(), timeout=10)
+        resp.raise_for_status()
     return resp.json()
 
 
@@ -63,6 +68,8 @@ def parse_and_create_weather(db, city: str, raw: dict) -> WeatherData:
         recorded_at=datetime.utcnow(),
     )
     db.add(rec)
+    for stmt in stats_service.weather_updates([rec]):
+        db.execute(stmt)
     db.commit()
     db.refresh(rec)
     return rec
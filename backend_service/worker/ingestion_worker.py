@@ -2,17 +2,36 @@ import asyncio
 import logging
 import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from backend_service.services import weather_ingestion_service, market_ingestion_service
+from backend_service.services import (
+    weather_ingestion_service, market_ingestion_service, weather_rollup_service, stats_service,
+    job_service, advisory_precompute_service, ingestion_run_service,
+)
+from backend_service.config import AI_PRECOMPUTE_HOUR_UTC, DB_CONNECTION_BUDGET, DB_PGBOUNCER, DB_WORKER_CONNECTION_BUDGET
 from backend_service.cache import set_cached
+from backend_service.core import tracing
+from backend_service.core.loop_monitor import start_loop_monitor
+from backend_service.core.request_context import install_log_record_factory
+from backend_service.database_async import async_engine
+from backend_service.migrate import check_schema_version
+from backend_service.partitions import ensure_partitions
 
 logger = logging.getLogger('ingestion.worker')
 
+WEATHER_INTERVAL_MINUTES = 15
+MARKET_INTERVAL_MINUTES = 60
+
 
 async def run_weather_job():
     logger.info('Starting scheduled weather ingestion')
-    results = await weather_ingestion_service.ingest_weather_for_all_villages()
+    cycle = ingestion_run_service.CycleStats('weather', WEATHER_INTERVAL_MINUTES * 60)
+    try:
+        with cycle, tracing.span('ingest.weather.cycle'):
+            results = await weather_ingestion_service.ingest_weather_for_all_villages()
+    finally:
+        await ingestion_run_service.record_cycle(cycle)
     logger.info('Weather ingestion complete — %d new records', len(results))
     # Optionally cache latest weather per village
     for r in results:
@@ -30,7 +49,12 @@ async def run_weather_job():
 
 async def run_market_job():
     logger.info('Starting scheduled market ingestion')
-    results = await market_ingestion_service.ingest_market_for_all_villages()
+    cycle = ingestion_run_service.CycleStats('market', MARKET_INTERVAL_MINUTES * 60)
+    try:
+        with cycle, tracing.span('ingest.market.cycle'):
+            results = await market_ingestion_service.ingest_market_for_all_villages()
+    finally:
+        await ingestion_run_service.record_cycle(cycle)
     logger.info('Market ingestion complete — %d new records', len(results))
     # Optionally cache summary per village
     for r in results:
@@ -45,24 +69,92 @@ async def run_market_job():
             logger.exception('Failed to cache market')
 
 
+async def run_partition_job():
+    """Pre-create upcoming monthly partitions for weather_data / market_prices."""
+    try:
+        async with async_engine.begin() as conn:
+            created = await conn.run_sync(ensure_partitions)
+        logger.info('Partition maintenance complete — %d partitions created', created)
+    except Exception:
+        logger.exception('Partition maintenance failed')
+
+
+async def run_weather_rollup_job():
+    try:
+        counts = await weather_rollup_service.rollup_weather()
+        logger.info('Weather rollup complete — %d hourly, %d daily buckets', counts['hourly'], counts['daily'])
+    except Exception:
+        logger.exception('Weather rollup failed')
+
+
+async def run_weather_retention_job():
+    try:
+        counts = await weather_rollup_service.purge_weather()
+        logger.info(
+            'Weather retention complete — %d partitions dropped, %d raw rows and %d hourly rows deleted',
+            counts['partitions_dropped'], counts['raw_deleted'], counts['hourly_deleted'],
+        )
+    except Exception:
+        logger.exception('Weather retention failed')
+
+
+async def run_stats_job():
+    """Reconcile maintained counters with the source tables."""
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(stats_service.recompute_stats)
+        logger.info('Stats reconciliation complete')
+    except Exception:
+        logger.exception('Stats reconciliation failed')
+
+
+async def run_advisory_precompute_job():
+    """Refresh village advisories whose inputs changed and warm the cache."""
+    try:
+        await advisory_precompute_service.precompute_village_advisories()
+    except Exception:
+        logger.exception('Advisory precompute failed')
+
+
 def start_scheduler():
     scheduler = AsyncIOScheduler()
     # Schedule coroutine functions directly — AsyncIOScheduler handles the event loop
-    scheduler.add_job(run_weather_job, IntervalTrigger(minutes=15), id='weather', max_instances=1)
-    scheduler.add_job(run_market_job, IntervalTrigger(minutes=60), id='market', max_instances=1)
+    scheduler.add_job(run_weather_job, IntervalTrigger(minutes=WEATHER_INTERVAL_MINUTES), id='weather', max_instances=1)
+    scheduler.add_job(run_market_job, IntervalTrigger(minutes=MARKET_INTERVAL_MINUTES), id='market', max_instances=1)
+    scheduler.add_job(run_partition_job, IntervalTrigger(hours=24), id='partitions', max_instances=1)
+    scheduler.add_job(run_weather_rollup_job, IntervalTrigger(hours=1), id='weather_rollup', max_instances=1)
+    scheduler.add_job(run_weather_retention_job, IntervalTrigger(hours=24), id='weather_retention', max_instances=1)
+    scheduler.add_job(run_stats_job, IntervalTrigger(hours=1), id='stats', max_instances=1)
+    scheduler.add_job(
+        run_advisory_precompute_job, CronTrigger(hour=AI_PRECOMPUTE_HOUR_UTC, minute=0, timezone='UTC'),
+        id='advisory_precompute', max_instances=1,
+    )
     scheduler.start()
     logger.info('Scheduler started')
 
 
 async def _main():
-    start_scheduler()
-    # Keep the event loop alive forever
-    while True:
-        await asyncio.sleep(3600)
+    monitor = start_loop_monitor('worker')
+    if DB_CONNECTION_BUDGET <= 0 and not DB_PGBOUNCER:
+        # gunicorn.conf.py only leaves DB_WORKER_CONNECTION_BUDGET for this process
+        logger.warning('DB_CONNECTION_BUDGET is unset; run the worker with DB_CONNECTION_BUDGET=%d',
+                       DB_WORKER_CONNECTION_BUDGET)
+    try:
+        await asyncio.to_thread(check_schema_version)
+        await run_partition_job()
+        start_scheduler()
+        # The AI job workers run for the lifetime of the process and keep the
+        # event loop alive.
+        await job_service.run_worker_pool()
+    finally:
+        if monitor is not None:
+            await monitor.stop()
 
 
 if __name__ == '__main__':
-    logging.basicConfig(level=logging.INFO)
+    install_log_record_factory()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s')
+    tracing.setup_tracing('gramsight-worker')
     try:
         asyncio.run(_main())
     except (KeyboardInterrupt, SystemExit):
@@ -120,8 +120,18 @@ export default function MyFarmlands() {
   const handleAiInsight = async (id) => {
     setInsightLoading((prev) => ({ ...prev, [id]: true }));
     try {
-      const res = await api.post(`/farmland/${id}/ai-insight`);
-      setFarmlands((prev) => prev.map((f) => f.id === id ? res.data : f));
+      // Generation is queued; poll the job, then reload the farmland it updated.
+      const { data: job } = await api.post(`/farmland/${id}/ai-insight`);
+      let status = job.status;
+      for (let i = 0; i < 60 && (status === 'queued' || status === 'running'); i += 1) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const res = await api.get(job.status_url);
+        status = res.data.status;
+      }
+      if (status === 'succeeded') {
+        const res = await api.get(`/farmland/${id}`);
+        setFarmlands((prev) => prev.map((f) => f.id === id ? res.data : f));
+      }
     } catch { /* ignore */ }
     setInsightLoading((prev) => ({ ...prev, [id]: false }));
   };
@@ -0,0 +1,95 @@
+"""gunicorn profile for production: uvicorn workers, preloaded app.
+
+    gunicorn -c gunicorn.conf.py backend_service.main:app
+
+* ``WEB_CONCURRENCY`` workers (default: one per CPU — async workers do not
+  need more). The value is exported, so the connection budget is split
+  across the right number of processes (backend_service/pool_sizing.py).
+* The app is imported once in the master (``preload_app``), so workers fork
+  from a warm interpreter and boot quickly. ``post_fork`` throws away
+  anything the engines inherited from the master; a pooled connection must
+  never be shared between processes.
+* ``DB_CONNECTION_BUDGET`` defaults to Postgres ``max_connections`` minus
+  the ingestion worker's ``DB_WORKER_CONNECTION_BUDGET`` (default 16; the
+  worker must run with ``DB_CONNECTION_BUDGET`` set to it, as
+  docker-compose.yml does) and ``DB_RESERVED_CONNECTIONS`` (default 5:
+  migrations, admin sessions). Behind PgBouncer (``DB_PGBOUNCER``) the pools hold
+  PgBouncer client connections and its ``default_pool_size`` bounds the
+  server side, so no budget is derived.
+* Workers are recycled after ``GUNICORN_MAX_REQUESTS`` requests (jittered,
+  so they do not all restart together) and get ``graceful_timeout`` seconds
+  to finish in-flight requests. The app's lifespan closes their pools.
+* Prometheus runs in multiprocess mode (``PROMETHEUS_MULTIPROC_DIR``,
+  cleared at startup); dead workers' live gauges are dropped.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+worker_class = 'uvicorn.workers.UvicornWorker'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+# Both must be in the environment before the preloaded app imports config
+# and prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'gramsight-prometheus'))
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def _server_max_connections(dsn):
+    import psycopg2
+
+    try:
+        with psycopg2.connect(dsn, connect_timeout=5) as conn, conn.cursor() as cur:
+            cur.execute('SHOW max_connections')
+            return int(cur.fetchone()[0])
+    except psycopg2.Error:
+        return None
+
+
+from backend_service import config as app_config
+
+if 'DB_CONNECTION_BUDGET' not in os.environ and not app_config.DB_PGBOUNCER:
+    max_connections = _server_max_connections(app_config.DATABASE_URL.replace('+psycopg2', ''))
+    if max_connections:
+        reserved = int(os.getenv('DB_RESERVED_CONNECTIONS', '5'))
+        budget = max(workers * 2, max_connections - app_config.DB_WORKER_CONNECTION_BUDGET - reserved)
+        os.environ['DB_CONNECTION_BUDGET'] = str(budget)
+        # config is already imported; pool_sizing reads it when the app loads.
+        app_config.DB_CONNECTION_BUDGET = budget
+
+
+def when_ready(server):
+    from backend_service.pool_sizing import ASYNC, SYNC, pool_limits
+
+    sync_pool, async_pool = pool_limits(SYNC), pool_limits(ASYNC)
+    server.log.info('%d workers; per worker: sync pool %d+%d, async pool %d+%d '
+                    '(DB_CONNECTION_BUDGET=%s, ingestion worker %d)',
+                    workers, *sync_pool, *async_pool, os.getenv('DB_CONNECTION_BUDGET', 'unset'),
+                    app_config.DB_WORKER_CONNECTION_BUDGET)
+
+
+def post_fork(server, worker):
+    from backend_service.database import engine
+    from backend_service.database_async import async_engine
+
+    # close=False: leave the master's sockets alone, just stop using them.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
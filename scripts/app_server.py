@@ -0,0 +1,55 @@
+"""
+Start the API in a subprocess for the test and benchmark scripts.
+
+    from app_server import free_port, start_uvicorn, wait_ready
+
+    port = free_port()
+    proc = start_uvicorn(port, env={**os.environ, 'AI_MODEL_BACKEND': 'fake'})
+    try:
+        wait_ready(proc, f'http://127.0.0.1:{port}')
+        ...
+    finally:
+        proc.terminate()
+        proc.wait()
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(port: int, env: Optional[Dict[str, str]] = None,
+                  app: str = 'backend_service.main:app') -> subprocess.Popen:
+    """uvicorn serving ``app`` on 127.0.0.1:``port``, with ROOT importable."""
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT, env={**(os.environ if env is None else env), 'PYTHONPATH': ROOT},
+    )
+
+
+def wait_ready(proc: subprocess.Popen, base_url: str, timeout: float = 60, poll_interval: float = 0.1) -> None:
+    """Poll ``GET /health`` until it answers 200; raises if ``proc`` exits or
+    ``timeout`` seconds pass first."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'server exited with code {proc.returncode}')
+        try:
+            if httpx.get(f'{base_url}/health', timeout=10).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(poll_interval)
+    raise RuntimeError(f'server did not answer {base_url}/health in time')
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Rebuild the monthly/weekly trend aggregates from existing history.
+
+Usage:
+    docker exec gramsight-ai-backend-1 python /app/scripts/backfill_trends.py
+
+Safe to run at any time — the aggregates are recomputed from scratch in a
+single transaction, so readers see either the old or the new values.
+"""
+import sys
+import os
+import logging
+
+# Ensure the project root is on sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend_service.database import engine
+from backend_service.services.trend_service import rebuild_trends
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('backfill_trends')
+
+
+def main():
+    with engine.begin() as conn:
+        written = rebuild_trends(conn)
+    log.info("✔ Trend aggregates rebuilt (%d buckets)", written)
+
+
+if __name__ == '__main__':
+    main()
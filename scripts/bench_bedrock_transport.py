@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Bedrock transports against the local stub endpoint.
+
+Compares the boto3-in-a-thread path (one blocked worker thread per call)
+with the native async httpx + SigV4 client (one shared keep-alive pool) at
+the same concurrency, reporting throughput, latency percentiles and the
+peak number of live threads.
+
+Usage:
+    python scripts/bench_bedrock_transport.py --requests 200 --concurrency 32 --latency-ms 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('SECRET_KEY', 'bench-only')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'AKIDBENCH')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench-secret')
+
+import logging
+
+from stub_model_server import serve_in_thread
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('bench_bedrock_transport')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+MODEL = 'amazon.nova-micro-v1:0'
+REGION = 'us-east-1'
+
+
+def _client_threads() -> int:
+    """Live threads, excluding the in-process stub server's handlers."""
+    return sum(1 for t in threading.enumerate() if 'process_request' not in t.name)
+
+
+class ThreadSampler:
+    def __init__(self):
+        self.peak = _client_threads()
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _client_threads())
+            time.sleep(0.005)
+
+    def __enter__(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+
+
+async def _drive(call, requests: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await call()
+                latencies.append((time.perf_counter() - t0) * 1000)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - start, latencies, errors
+
+
+async def bench_boto3(endpoint: str, body: str, requests: int, concurrency: int):
+    import boto3
+    from botocore.config import Config
+
+    client = boto3.client(
+        'bedrock-runtime', region_name=REGION, endpoint_url=endpoint,
+        config=Config(max_pool_connections=concurrency, retries={'max_attempts': 0}),
+    )
+
+    def call():
+        resp = client.invoke_model(body=body, modelId=MODEL, contentType='application/json', accept='application/json')
+        return resp['body'].read()
+
+    return await _drive(lambda: asyncio.to_thread(call), requests, concurrency)
+
+
+async def bench_httpx(endpoint: str, body: str, requests: int, concurrency: int):
+    from botocore.credentials import Credentials
+    from backend_service.services.bedrock_http import BedrockHTTPClient
+
+    client = BedrockHTTPClient(
+        REGION, endpoint_url=endpoint,
+        credentials=Credentials(os.environ['AWS_ACCESS_KEY_ID'], os.environ['AWS_SECRET_ACCESS_KEY']),
+        max_connections=concurrency,
+    )
+    try:
+        return await _drive(lambda: client.invoke_model(MODEL, body), requests, concurrency)
+    finally:
+        await client.aclose()
+
+
+def _report(name: str, wall: float, latencies, errors: int, peak_threads: int):
+    if not latencies:
+        log.info("✘ %-6s all %d requests failed", name, errors)
+        return
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    log.info(
+        "✔ %-6s %6.1f req/s  p50 %7.1f ms  p95 %7.1f ms  p99 %7.1f ms  errors %d  peak threads %d",
+        name, len(latencies) / wall, q[49], q[94], q[98], errors, peak_threads,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=500)
+    parser.add_argument('--transport', choices=['both', 'boto3', 'httpx'], default='both')
+    args = parser.parse_args()
+
+    server = serve_in_thread(0, args.latency_ms)
+    endpoint = f'http://127.0.0.1:{server.server_port}'
+    body = '{"messages":[{"role":"user","content":[{"text":"benchmark"}]}]}'
+    log.info("Stub at %s — %d requests, concurrency %d, model latency %.0f ms",
+             endpoint, args.requests, args.concurrency, args.latency_ms)
+
+    benches = {'boto3': bench_boto3, 'httpx': bench_httpx}
+    for name, bench in benches.items():
+        if args.transport not in ('both', name):
+            continue
+        with ThreadSampler() as sampler:
+            wall, latencies, errors = asyncio.run(bench(endpoint, body, args.requests, args.concurrency))
+        _report(name, wall, latencies, errors, sampler.peak)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+RPS before/after replacing the BaseHTTPMiddleware request-context middleware.
+
+Builds two in-process copies of the app that differ only in the request-id
+middleware: the old ``BaseHTTPMiddleware`` subclass (kept here for the
+comparison) and the pure-ASGI ``RequestContextMiddleware``. CORS and
+metrics middleware are the same in both. Each copy is driven through
+``httpx.ASGITransport`` (no server, no sockets) by ``--concurrency`` clients
+for ``--duration`` seconds per route.
+
+Routes:
+* ``/hello`` — a bare JSON endpoint added for the benchmark;
+* ``/farmer/villages`` — real DB query; needs Postgres and a login
+  (skipped with --hello-only).
+
+Usage:
+    SECRET_KEY=x python scripts/bench_request_context.py --hello-only
+    python scripts/bench_request_context.py --duration 10 --concurrency 32
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('bench_request_context')
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend_service.config import ALLOWED_ORIGINS
+from backend_service.core.request_context import RequestContextMiddleware
+from backend_service.main import app as backend_app
+from backend_service.metrics import MetricsMiddleware
+
+access_logger = logging.getLogger('backend')
+
+
+class LegacyRequestContextMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was before (for comparison only)."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get('X-Request-ID', str(uuid.uuid4()))
+        start = time.perf_counter()
+        response = await call_next(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        response.headers['X-Request-ID'] = request_id
+        access_logger.info(
+            "method=%s path=%s status=%s duration_ms=%.1f request_id=%s",
+            request.method, request.url.path, response.status_code, elapsed_ms, request_id,
+        )
+        return response
+
+
+def build_app(request_context_cls) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/hello')
+    async def hello():
+        return {'hello': 'world'}
+
+    app.router.routes.extend(r for r in backend_app.routes if getattr(r, 'path', '') not in ('/docs', '/openapi.json'))
+    app.add_middleware(request_context_cls)
+    app.add_middleware(CORSMiddleware, allow_origins=ALLOWED_ORIGINS, allow_credentials=True,
+                       allow_methods=['*'], allow_headers=['*'])
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, path: str, headers: dict, concurrency: int, duration: float):
+    transport = httpx.ASGITransport(app=app)
+    done, errors = 0, 0
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', headers=headers) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal done, errors
+            while time.perf_counter() < deadline:
+                resp = await client.get(path)
+                done += 1
+                errors += resp.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done / (time.perf_counter() - start), errors
+
+
+async def login(app, email: str, password: str) -> dict:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        resp = await client.post('/auth/login', json={'email': email, 'password': password})
+        resp.raise_for_status()
+        return {'Authorization': f"Bearer {resp.json()['access_token']}"}
+
+
+async def main_async(args):
+    variants = [('before', build_app(LegacyRequestContextMiddleware)), ('after', build_app(RequestContextMiddleware))]
+    routes = [('/hello', {})]
+    if not args.hello_only:
+        routes.append(('/farmer/villages', await login(variants[1][1], args.email, args.password)))
+
+    results = {}
+    for path, headers in routes:
+        for name, app in variants:
+            await drive(app, path, headers, args.concurrency, min(1.0, args.duration))  # warm-up
+            rps, errors = await drive(app, path, headers, args.concurrency, args.duration)
+            results[(path, name)] = rps
+            log.info("✔ %-17s %-6s %8.0f req/s  (%d non-200)", path, name, rps, errors)
+        before, after = results[(path, 'before')], results[(path, 'after')]
+        log.info("✔ %-17s pure ASGI: %+.1f%% req/s", path, 100 * (after / before - 1) if before else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--hello-only', action='store_true')
+    parser.add_argument('--email', default='admin@gramsight.in')
+    parser.add_argument('--password', default='Admin123!')
+    args = parser.parse_args()
+    # Keep per-request log output (access line, httpx) from dominating.
+    access_logger.setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
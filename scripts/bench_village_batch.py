@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Compare single-call and batched village analysis.
+
+Builds synthetic village inputs shaped like ``_village_prompt`` output and
+analyses them both ways — one Bedrock call per village, then
+``--batch-size`` villages per call — reporting input/output tokens and
+latency per village, plus how many batch entries would need a single-call
+retry. Nothing is cached or persisted.
+
+Runs against Bedrock with the usual AWS settings, or offline with --fake
+(token counts from the fake client are rough size estimates).
+
+Usage:
+    python scripts/bench_village_batch.py --villages 20 --batch-size 4
+    python scripts/bench_village_batch.py --fake --villages 40 --batch-size 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('bench_village_batch')
+
+COMMODITIES = ['Paddy', 'Wheat', 'Maize', 'Cotton', 'Groundnut', 'Onion', 'Tomato', 'Soybean']
+
+
+def synthetic_prompt_data(rng: random.Random) -> dict:
+    return {
+        'village_id': str(uuid.uuid4()),
+        'weather': {
+            'temperature': round(rng.uniform(18, 42), 1),
+            'humidity': round(rng.uniform(30, 95), 1),
+            'rainfall': round(rng.uniform(0, 60), 1),
+            'description': rng.choice(['clear sky', 'light rain', 'overcast clouds', 'haze']),
+        },
+        'market': [
+            {'commodity': rng.choice(COMMODITIES), 'modal_price': rng.randint(1200, 9000),
+             'arrival_date': f'2024-06-{day:02d}'}
+            for day in range(1, 8)
+        ],
+    }
+
+
+async def run_single(svc, parse_report, villages):
+    latencies, parsed = [], 0
+    with svc.usage_scope() as usage:
+        start = time.perf_counter()
+        for data in villages:
+            t0 = time.perf_counter()
+            text = await svc._invoke_bedrock(svc._village_prompt_text(data), priority=svc.BATCH)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if parse_report('village', text, svc.PROMPT_VERSION) is not None:
+                parsed += 1
+        wall = time.perf_counter() - start
+    return wall, latencies, parsed, dict(usage)
+
+
+async def run_batched(svc, villages, batch_size):
+    latencies, parsed = [], 0
+    with svc.usage_scope() as usage:
+        start = time.perf_counter()
+        for i in range(0, len(villages), batch_size):
+            chunk = villages[i:i + batch_size]
+            t0 = time.perf_counter()
+            entries = await svc._call_village_batch({d['village_id']: d for d in chunk}, svc.BATCH)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            parsed += len(entries)
+        wall = time.perf_counter() - start
+    return wall, latencies, parsed, dict(usage)
+
+
+def _report(name, n, wall, latencies, parsed, usage):
+    log.info(
+        "✔ %-8s %3d calls  %6.0f in / %5.0f out tokens per village  %7.1f ms per village  "
+        "p50 call %7.1f ms  parsed %d/%d",
+        name, usage['calls'], usage['input_tokens'] / n, usage['output_tokens'] / n,
+        wall * 1000 / n, statistics.median(latencies) if latencies else 0.0, parsed, n,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--villages', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--fake', action='store_true', help='use the local fake model (AI_FAKE_MODEL)')
+    args = parser.parse_args()
+
+    if args.fake:
+        os.environ['AI_FAKE_MODEL'] = 'true'
+        os.environ.setdefault('AI_FAKE_CHUNK_DELAY_MS', '5')
+    from backend_service.services import ai_analysis_service as svc
+    from backend_service.services.json_extract import parse_report
+
+    rng = random.Random(args.seed)
+    villages = [synthetic_prompt_data(rng) for _ in range(args.villages)]
+    log.info("%d synthetic villages, batch size %d, model %s%s",
+             args.villages, args.batch_size, svc.DEFAULT_MODEL, ' (fake)' if args.fake else '')
+
+    single = asyncio.run(run_single(svc, parse_report, villages))
+    _report('single', args.villages, *single)
+    batched = asyncio.run(run_batched(svc, villages, max(1, args.batch_size)))
+    _report('batched', args.villages, *batched)
+
+    s_usage, b_usage = single[3], batched[3]
+    if s_usage['input_tokens']:
+        log.info("✔ batching saves %.0f%% input tokens, %.0f%% wall time; %d entries need a single-call retry",
+                 100 * (1 - b_usage['input_tokens'] / s_usage['input_tokens']),
+                 100 * (1 - batched[0] / single[0]) if single[0] else 0.0,
+                 args.villages - batched[2])
+
+
+if __name__ == '__main__':
+    main()
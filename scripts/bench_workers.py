@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+RPS and p99 against gunicorn worker count, on a fixed core budget.
+
+For each worker count in --workers, this starts
+``gunicorn -c gunicorn.conf.py backend_service.main:app`` with that many
+uvicorn workers and pins it to the first --cores CPUs. It then drives one
+path with --concurrency keep-alive clients for --duration seconds. The load
+generator runs in --client-procs processes pinned to the other CPUs, so it
+does not compete with the server for the core budget. Output is one row per
+worker count: req/s, p50, p99 and non-2xx responses.
+
+Postgres and Redis come from the usual DB_* / REDIS_URL settings. The pools
+are sized by gunicorn.conf.py. Without a database, /health still answers
+(degraded), which measures the server stack alone.
+
+Usage:
+    SECRET_KEY=x python scripts/bench_workers.py --cores 2 --workers 1,2,3,4
+    python scripts/bench_workers.py --cores 4 --workers 2,4,8 --path /farmer/villages --login
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_server import free_port, wait_ready
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('bench_workers')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def start_server(workers: int, cores: List[int], port: int) -> subprocess.Popen:
+    env = {**os.environ, 'PYTHONPATH': ROOT, 'WEB_CONCURRENCY': str(workers),
+           'GUNICORN_BIND': f'127.0.0.1:{port}', 'LOOP_MONITOR_INTERVAL': '0'}
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+         '--log-level', 'warning', 'backend_service.main:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+        preexec_fn=lambda: os.sched_setaffinity(0, cores),
+    )
+
+
+# ── Load generator (runs in client processes) ───────────────────────
+async def _drive(url: str, headers: Dict[str, str], clients: int, duration: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(url)
+                    errors += resp.status_code >= 300
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies, errors
+
+
+def _client_proc(args) -> Tuple[List[float], int]:
+    url, headers, clients, duration, cores = args
+    if cores:
+        os.sched_setaffinity(0, cores)
+    return asyncio.run(_drive(url, headers, clients, duration))
+
+
+def run_load(pool, url: str, headers: Dict[str, str], concurrency: int, duration: float,
+             procs: int, cores: List[int]) -> Tuple[float, List[float], int]:
+    per_proc = [concurrency // procs + (i < concurrency % procs) for i in range(procs)]
+    start = time.perf_counter()
+    results = pool.map(_client_proc, [(url, headers, n, duration, cores) for n in per_proc if n])
+    elapsed = time.perf_counter() - start
+    latencies = sorted(l for lats, _ in results for l in lats)
+    errors = sum(e for _, e in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def _pct(sorted_values: List[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))] if sorted_values else 0.0
+
+
+def login(base_url: str, email: str, password: str) -> Dict[str, str]:
+    resp = httpx.post(f'{base_url}/auth/login', json={'email': email, 'password': password}, timeout=30)
+    resp.raise_for_status()
+    return {'Authorization': f"Bearer {resp.json()['access_token']}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated worker counts')
+    parser.add_argument('--cores', type=int, default=2, help='CPUs the server may use')
+    parser.add_argument('--path', default='/health')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--client-procs', type=int, default=None,
+                        help='load generator processes (default: one per CPU outside the server budget)')
+    parser.add_argument('--login', action='store_true', help='authenticate first (for protected paths)')
+    parser.add_argument('--email', default='admin@gramsight.in')
+    parser.add_argument('--password', default='Admin123!')
+    args = parser.parse_args()
+
+    available = sorted(os.sched_getaffinity(0))
+    if args.cores >= len(available):
+        log.warning('only %d CPU(s): server and load generator share them — numbers are indicative only',
+                    len(available))
+        server_cores = client_cores = available[:args.cores]
+    else:
+        server_cores, client_cores = available[:args.cores], available[args.cores:]
+    procs = args.client_procs or len(client_cores)
+    log.info('server on CPUs %s, %d client processes on CPUs %s', server_cores, procs, client_cores)
+
+    rows: List[Tuple[int, float, float, float, int]] = []
+    with multiprocessing.Pool(procs) as pool:
+        for workers in [int(w) for w in args.workers.split(',')]:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            proc = start_server(workers, server_cores, port)
+            try:
+                wait_ready(proc, base_url)
+                headers = login(base_url, args.email, args.password) if args.login else {}
+                url = base_url + args.path
+                run_load(pool, url, headers, args.concurrency, args.warmup, procs, client_cores)
+                rps, latencies, errors = run_load(pool, url, headers, args.concurrency, args.duration,
+                                                  procs, client_cores)
+            finally:
+                proc.terminate()
+                proc.wait()
+            rows.append((workers, rps, _pct(latencies, 50) * 1000, _pct(latencies, 99) * 1000, errors))
+            log.info('✔ %d worker(s): %.0f req/s, p50 %.1f ms, p99 %.1f ms, %d non-2xx',
+                     workers, rps, rows[-1][2], rows[-1][3], errors)
+
+    best: Optional[Tuple] = max(rows, key=lambda r: r[1]) if rows else None
+    log.info('%s on %d core(s), concurrency %d:', args.path, args.cores, args.concurrency)
+    log.info('  %7s  %9s  %8s  %8s  %7s', 'workers', 'req/s', 'p50 ms', 'p99 ms', 'non-2xx')
+    for workers, rps, p50, p99, errors in rows:
+        log.info('  %7d  %9.0f  %8.1f  %8.1f  %7d%s', workers, rps, p50, p99, errors,
+                 '  ← best' if best and workers == best[0] else '')
+
+
+if __name__ == '__main__':
+    main()
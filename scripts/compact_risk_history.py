@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Compact duplicate risk history left behind by repeated recalculation.
+
+Before latest_risk_scores existed every cache miss appended a RiskScore row,
+even when nothing changed. This removes rows that repeat the previous score
+and level for the same (village, farmer), refreshes latest_risk_scores and
+rebuilds the risk trend aggregates so the admin chart matches the history.
+
+Usage:
+    docker exec gramsight-ai-backend-1 python /app/scripts/compact_risk_history.py
+"""
+import sys
+import os
+import logging
+
+# Ensure the project root is on sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend_service.database import engine
+from backend_service.services.risk_engine_service import compact_risk_history
+from backend_service.services.stats_service import recompute_stats
+from backend_service.services.trend_service import rebuild_trends
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('compact_risk')
+
+
+def main():
+    with engine.begin() as conn:
+        removed = compact_risk_history(conn)
+        rebuild_trends(conn)
+        recompute_stats(conn)
+    log.info("✔ Removed %d duplicate risk_scores rows", removed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fuzz and benchmark the structured-output extractor.
+
+Fuzz: random JSON objects (nested, with braces, quotes, escapes and
+non-ASCII text inside strings) are wrapped in random prose, code fences and
+trailing chatter, then extracted whole and fed in random chunk sizes. Both
+must return the original object. Truncated and random inputs must never
+raise.
+
+Benchmark: the old fence-splitting + ``json.loads`` approach against
+``extract_json`` on clean, fenced and prose-wrapped replies, reporting
+µs per reply and how many each recovers.
+
+Usage:
+    python scripts/fuzz_json_extract.py --iterations 5000 --seed 1
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('fuzz_json_extract')
+logging.getLogger('backend.json_extract').setLevel(logging.ERROR)
+
+from backend_service.services.json_extract import JSONObjectScanner, extract_json, parse_report, get_parse_stats
+
+TRICKY = ['{', '}', '"', '\\', '```', '\n', 'ज़', '₹', '{"a": 1}', '\\"']
+
+
+def legacy_extract(text):
+    """The fence-splitting parser the analysis functions used before."""
+    try:
+        text = text.strip()
+        if '```json' in text:
+            text = text.split('```json')[1].split('```')[0].strip()
+        elif '```' in text:
+            text = text.split('```')[1].split('```')[0].strip()
+        parsed = json.loads(text)
+    except (json.JSONDecodeError, IndexError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def rand_string(rng):
+    parts = [rng.choice(string.ascii_letters + ' ') for _ in range(rng.randint(0, 12))]
+    for _ in range(rng.randint(0, 3)):
+        parts.insert(rng.randint(0, len(parts)), rng.choice(TRICKY))
+    return ''.join(parts)
+
+
+def rand_value(rng, depth=0):
+    kind = rng.choice(['str', 'str', 'num', 'bool', 'null', 'list', 'obj'] if depth < 4 else ['str', 'num'])
+    if kind == 'str':
+        return rand_string(rng)
+    if kind == 'num':
+        return rng.choice([rng.randint(-1000, 1000), round(rng.uniform(-100, 100), 3)])
+    if kind == 'bool':
+        return rng.random() < 0.5
+    if kind == 'null':
+        return None
+    if kind == 'list':
+        return [rand_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rand_object(rng, depth + 1)
+
+
+def rand_object(rng, depth=0):
+    return {rand_string(rng) or 'k': rand_value(rng, depth) for _ in range(rng.randint(1, 5))}
+
+
+def prose(rng):
+    """Chatter that never contains a parseable object."""
+    words = ['Here', 'is', 'the', 'analysis', 'note:', '{see below', 'braces }', '"quoted', '{x}', ':)']
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+
+
+def wrap(rng, body):
+    style = rng.choice(['bare', 'fence', 'fence_json', 'prose'])
+    if style == 'fence':
+        body = f'```\n{body}\n```'
+    elif style == 'fence_json':
+        body = f'```json\n{body}\n```'
+    before = prose(rng) + '\n' if style == 'prose' or rng.random() < 0.3 else ''
+    after = '\n' + prose(rng) if rng.random() < 0.5 else ''
+    return before + body + after
+
+
+def feed_chunks(rng, text):
+    scanner = JSONObjectScanner()
+    i = 0
+    while i < len(text):
+        n = rng.randint(1, 32)
+        scanner.feed(text[i:i + n])
+        i += n
+    return scanner.finish()
+
+
+def fuzz(rng, iterations):
+    failures = 0
+    for n in range(iterations):
+        obj = rand_object(rng)
+        text = wrap(rng, json.dumps(obj, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2])))
+        for name, got in (('whole', extract_json(text)), ('chunked', feed_chunks(rng, text))):
+            if got != obj:
+                failures += 1
+                if failures <= 5:
+                    log.error("✘ %s mismatch on iteration %d:\n%r", name, n, text)
+        # Truncated or random input: any result is fine, raising is not.
+        extract_json(text[:rng.randint(0, len(text))])
+        extract_json(''.join(rng.choice(string.printable + '{}"\\') for _ in range(rng.randint(0, 200))))
+    return failures
+
+
+def bench(rng, replies, repeat):
+    corpus = [
+        json.dumps({'summary': 'Stable.', 'recommendations': ['Irrigate', 'Scout'], 'risk_score': 40}),
+        '```json\n' + json.dumps({'summary': 'Stable {with braces}', 'risk_assessment': 'Low'}) + '\n```',
+        'Here is the analysis:\n' + json.dumps({'summary': 'Rain due', 'weather_analysis': 'Wet'}) + '\nHope this helps!',
+        'Note {see below}. ' + json.dumps({'summary': 'x' * 2000}) + ' Thanks.',
+    ]
+    corpus = [rng.choice(corpus) for _ in range(replies)]
+    for name, fn in (('legacy', legacy_extract), ('scanner', extract_json)):
+        ok = sum(1 for text in corpus if fn(text) is not None)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in corpus:
+                fn(text)
+        per_reply = (time.perf_counter() - start) / (repeat * len(corpus)) * 1e6
+        log.info("✔ %-8s %7.1f µs/reply  recovered %d/%d", name, per_reply, ok, len(corpus))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--replies', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = fuzz(rng, args.iterations)
+    if failures:
+        log.error("✘ fuzz: %d mismatches in %d iterations", failures, args.iterations)
+    else:
+        log.info("✔ fuzz: %d iterations, whole and chunked extraction match", args.iterations)
+
+    parse_report('farmland', '{"risk_score": "55", "risk_level": "moderate", "summary": "ok"}', 'fuzz')
+    parse_report('village', 'no json here', 'fuzz')
+    log.info("✔ schema check outcomes: %s", get_parse_stats())
+
+    bench(rng, args.replies, args.repeat)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of the API entry point, with a budget check.
+
+Runs ``python -X importtime -c "import backend_service.main"`` in a fresh
+interpreter ``--runs`` times and parses the timings from stderr. Then:
+
+* prints the modules with the largest cumulative import time, and the chain
+  that pulled each one in (``--why`` shows the chain for other modules);
+* fails (exit 1) when the median import of ``backend_service.main`` takes
+  longer than ``--budget-ms``, or when a module that should load on first
+  use (``--deferred``: boto3, jose, passlib, ...) is imported at startup.
+
+``--cold-start`` also measures the time from process start to the first
+successful ``/health`` response, for uvicorn and for the Mangum handler
+(with an API Gateway v2 event). ``/health`` returns 200 even when the DB or
+Redis are down, so the timing works without them; it includes their
+connect timeouts in that case.
+
+Usage:
+    SECRET_KEY=x python scripts/import_profile.py
+    SECRET_KEY=x python scripts/import_profile.py --budget-ms 1200 --why httpx --cold-start
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_server import free_port, start_uvicorn, wait_ready
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('import_profile')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+ENTRY = 'backend_service.main'
+# Heavy packages that the API only needs on some code paths.
+DEFERRED = ['boto3', 'botocore', 'jose', 'passlib', 'dateutil', 'requests', 'httpx']
+
+
+class Node:
+    __slots__ = ('name', 'depth', 'self_us', 'cumulative_us', 'parent')
+
+    def __init__(self, name: str, depth: int, self_us: int, cumulative_us: int):
+        self.name, self.depth = name, depth
+        self.self_us, self.cumulative_us = self_us, cumulative_us
+        self.parent: Optional['Node'] = None
+
+
+def parse_importtime(stderr: str) -> Dict[str, Node]:
+    """``-X importtime`` lines → nodes by module name, with parents. Children
+    are printed before their parent, one indent level deeper."""
+    nodes: Dict[str, Node] = {}
+    stack: List[Node] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        node = Node(name.strip(), depth, int(self_us), int(cumulative_us))
+        while stack and stack[-1].depth > depth:
+            stack.pop().parent = node
+        stack.append(node)
+        nodes[node.name] = node
+    return nodes
+
+
+def profile_once() -> Dict[str, Node]:
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {ENTRY}'],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(f'import {ENTRY} failed:\n{proc.stderr[-2000:]}')
+    return parse_importtime(proc.stderr)
+
+
+def chain(node: Node) -> str:
+    names = []
+    while node is not None:
+        names.append(node.name)
+        node = node.parent
+    return ' ← '.join(names)
+
+
+# ── Cold start to first /health ─────────────────────────────────────
+def cold_start_uvicorn(timeout: float = 60) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    proc = start_uvicorn(port, app=f'{ENTRY}:app')
+    try:
+        wait_ready(proc, f'http://127.0.0.1:{port}', timeout, poll_interval=0.02)
+        return time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+_MANGUM_SNIPPET = """
+import json, sys, time
+start = float(sys.argv[1])
+from backend_service.main import handler
+if handler is None:
+    sys.exit('mangum is not installed')
+event = {'version': '2.0', 'routeKey': '$default', 'rawPath': '/health', 'rawQueryString': '',
+         'headers': {'host': 'localhost'}, 'isBase64Encoded': False,
+         'requestContext': {'http': {'method': 'GET', 'path': '/health', 'protocol': 'HTTP/1.1',
+                                     'sourceIp': '127.0.0.1', 'userAgent': 'import_profile'},
+                            'stage': '$default', 'requestId': 'cold-start'}}
+resp = handler(event, None)
+print(json.dumps({'status': resp['statusCode'], 'seconds': time.time() - start}))
+"""
+
+
+def cold_start_mangum() -> float:
+    # Wall clock, since the timer has to span the process boundary.
+    proc = subprocess.run([sys.executable, '-c', _MANGUM_SNIPPET, repr(time.time())], cwd=ROOT,
+                          env={**os.environ, 'PYTHONPATH': ROOT, 'AWS_LAMBDA_FUNCTION_NAME': 'import-profile'},
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'Mangum handler failed:\n{proc.stderr[-2000:]}')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result['status'] != 200:
+        raise RuntimeError(f"Mangum /health returned {result['status']}")
+    return result['seconds']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000,
+                        help=f'max median cumulative import time of {ENTRY}')
+    parser.add_argument('--deferred', default=','.join(DEFERRED),
+                        help='comma-separated modules that must not load at startup')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--why', action='append', default=[], help='show who imports this module')
+    parser.add_argument('--cold-start', action='store_true', help='time first /health for uvicorn and Mangum')
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(args.runs)]
+    totals_ms = [r[ENTRY].cumulative_us / 1000 for r in runs]
+    nodes = runs[-1]
+
+    third_party = [n for n in nodes.values() if '.' not in n.name and n.name not in sys.stdlib_module_names
+                   and not n.name.startswith(('backend_service', '_'))]
+    log.info('Largest top-level packages (cumulative, last run):')
+    for n in sorted(third_party, key=lambda n: n.cumulative_us, reverse=True)[:args.top]:
+        log.info('  %8.1f ms  %s', n.cumulative_us / 1000, chain(n))
+    for name in args.why:
+        log.info('  why %s: %s', name, chain(nodes[name]) if name in nodes else 'not imported')
+
+    failures = []
+    median_ms = statistics.median(totals_ms)
+    log.info('import %s: median %.0f ms over %d runs (min %.0f, max %.0f), budget %.0f ms',
+             ENTRY, median_ms, len(totals_ms), min(totals_ms), max(totals_ms), args.budget_ms)
+    if median_ms > args.budget_ms:
+        failures.append(f'import time {median_ms:.0f} ms over budget {args.budget_ms:.0f} ms')
+    for name in filter(None, args.deferred.split(',')):
+        if name in nodes:
+            failures.append(f'{name} is imported at startup: {chain(nodes[name])}')
+
+    if args.cold_start:
+        for label, measure in (('uvicorn', cold_start_uvicorn), ('mangum', cold_start_mangum)):
+            try:
+                log.info('✔ cold start to first /health (%s): %.0f ms', label, measure() * 1000)
+            except Exception as exc:
+                log.warning('cold start (%s) not measured: %s', label, exc)
+
+    if failures:
+        for f in failures:
+            log.error('✘ %s', f)
+        sys.exit(1)
+    log.info('✔ import budget met; deferred modules stay unloaded at startup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the AI endpoints against the local stub model.
+
+Starts the deterministic stub model server in-process and drives a running
+backend at a fixed request rate (open loop: requests are fired on schedule
+whether or not earlier ones have returned). Nothing leaves the machine.
+Start the backend with ONE worker pointed at the stub, so the
+/ai/admin/stats counters cover all traffic:
+
+    AI_MODEL_BACKEND=stub AI_STUB_URL=http://127.0.0.1:8788 \\
+        uvicorn backend_service.main:app --port 8000
+    python scripts/load_test_ai.py --rps 200 --duration 20 --villages 5
+
+Phases, each reporting latency percentiles, status codes, fallbacks, model
+calls seen by the stub, and content-cache / single-flight / breaker
+counters from GET /ai/admin/stats:
+
+1. cold   – ai:village:{id} entries of the target villages are flushed;
+            concurrent misses for one village should cost one model call
+            (single-flight), not one per request;
+2. warm   – same load again; served from cache, no model calls;
+3. outage – the stub fails every call and fresh villages are flushed; the
+            circuit breaker should open and requests fall back fast.
+
+With --route advisory, villages that already have a stored 'advisory'
+report are answered from the database before the AI path; --route
+analysis (POST /ai/admin/ai-analysis/{id}) always reaches it on a miss.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import logging
+
+from stub_model_server import serve_in_thread, LATENCY_DISTS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('load_test_ai')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+FALLBACK_MARKERS = ('AI analysis temporarily unavailable', 'Please try again later')
+
+
+def _is_fallback(body) -> bool:
+    if not isinstance(body, dict):
+        return False
+    if body.get('is_fallback'):
+        return True
+    return any(marker in str(item) for item in body.get('items', []) for marker in FALLBACK_MARKERS)
+
+
+def flush_village_cache(redis_url: str, village_ids) -> None:
+    import redis
+
+    r = redis.Redis.from_url(redis_url)
+    if village_ids:
+        r.delete(*[f"ai:village:{vid}" for vid in village_ids])
+
+
+async def run_phase(client: httpx.AsyncClient, route: str, village_ids, rps: float, duration: float,
+                    max_in_flight: int):
+    latencies, statuses, fallbacks, dropped = [], Counter(), 0, 0
+    in_flight = 0
+
+    async def one(vid):
+        nonlocal in_flight, fallbacks
+        in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            if route == 'advisory':
+                resp = await client.get(f'/farmer/{vid}/advisory')
+            else:
+                resp = await client.post(f'/ai/admin/ai-analysis/{vid}')
+            statuses[resp.status_code] += 1
+            if resp.status_code == 200 and _is_fallback(resp.json()):
+                fallbacks += 1
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+        finally:
+            latencies.append((time.perf_counter() - t0) * 1000)
+            in_flight -= 1
+
+    tasks = []
+    total = int(rps * duration)
+    start = time.perf_counter()
+    for i in range(total):
+        delay = start + i / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if in_flight >= max_in_flight:
+            dropped += 1
+            continue
+        tasks.append(asyncio.ensure_future(one(village_ids[i % len(village_ids)])))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, latencies, statuses, fallbacks, dropped
+
+
+async def ai_stats(client: httpx.AsyncClient) -> dict:
+    resp = await client.get('/ai/admin/stats')
+    return resp.json() if resp.status_code == 200 else {}
+
+
+def _delta(after: dict, before: dict, section: str, key: str) -> int:
+    return (after.get(section, {}).get(key) or 0) - (before.get(section, {}).get(key) or 0)
+
+
+def report(name, wall, latencies, statuses, fallbacks, dropped, before, after, stub_before, stub_after):
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0] if latencies else 0.0] * 99
+    log.info(
+        "✔ %-6s %5d req in %4.1fs (%5.1f req/s)  p50 %7.1f  p95 %7.1f  p99 %7.1f ms  status %s  "
+        "fallback %d  dropped %d",
+        name, len(latencies), wall, len(latencies) / wall if wall else 0.0, q[49], q[94], q[98],
+        dict(statuses), fallbacks, dropped,
+    )
+    log.info(
+        "  %-6s model calls %d (stub saw %d)  cache redis %d / db %d / miss %d  coalesced %d  breaker %s",
+        name, _delta(after, before, 'bedrock_usage', 'calls'),
+        stub_after.get('requests', 0) - stub_before.get('requests', 0),
+        _delta(after, before, 'response_cache', 'redis_hits'), _delta(after, before, 'response_cache', 'db_hits'),
+        _delta(after, before, 'response_cache', 'misses'), _delta(after, before, 'response_cache', 'coalesced'),
+        after.get('bedrock_breaker', {}).get('state', '?'),
+    )
+
+
+async def main_async(args):
+    stub = serve_in_thread(args.stub_port, args.latency_ms, latency_dist=args.latency_dist, seed=args.seed)
+    stub_stats = lambda: dict(stub.stats)  # noqa: E731
+    log.info("Stub model on http://127.0.0.1:%d (%s %.0f ms)", stub.server_port, args.latency_dist, args.latency_ms)
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.base, timeout=60, limits=limits) as client:
+        resp = await client.post('/auth/login', json={'email': args.email, 'password': args.password})
+        resp.raise_for_status()
+        client.headers['Authorization'] = f"Bearer {resp.json()['access_token']}"
+        villages = [v['id'] for v in (await client.get('/farmer/villages')).json()]
+        if len(villages) < 2:
+            log.error("✘ need at least two villages (seed demo data first)")
+            return 1
+        n = max(1, min(args.villages, len(villages) // 2))
+        hot, spare = villages[:n], villages[n:2 * n]
+
+        phases = [('cold', hot, None), ('warm', hot, None), ('outage', spare, {'error_rate': 1.0})]
+        for name, targets, faults in phases:
+            if name != 'warm':
+                flush_village_cache(args.redis_url, targets)
+            if faults:
+                stub.settings.update(faults)
+            before, stub_before = await ai_stats(client), stub_stats()
+            result = await run_phase(client, args.route, targets, args.rps, args.duration, args.max_in_flight)
+            after, stub_after = await ai_stats(client), stub_stats()
+            report(name, *result, before, after, stub_before, stub_after)
+        stub.settings.update({'error_rate': 0.0})
+    stub.shutdown()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', default='http://localhost:8000')
+    parser.add_argument('--email', default='admin@gramsight.in')
+    parser.add_argument('--password', default='Admin123!')
+    parser.add_argument('--route', choices=['advisory', 'analysis'], default='advisory')
+    parser.add_argument('--rps', type=float, default=200)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--villages', type=int, default=5)
+    parser.add_argument('--max-in-flight', type=int, default=1000)
+    parser.add_argument('--stub-port', type=int, default=8788)
+    parser.add_argument('--latency-ms', type=float, default=800)
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTS, default='lognormal')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--redis-url', default=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == '__main__':
+    main()
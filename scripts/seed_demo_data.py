@@ -324,11 +324,21 @@ def seed():
         session.commit()
         log.info("✔ Advisory reports seeded (%d records)", len(DEMO_VILLAGES))
 
-        # ── 8. Flush Redis cache so fresh data is served ──────────────────
+        # ── 8. Rebuild maintained counters (/analytics/summary, /demo/status)
+        from backend_service.services.stats_service import recompute_stats
+        from backend_service.services.trend_service import rebuild_trends
+        from backend_service.services.risk_engine_service import sync_latest_from_history
+        with engine.begin() as conn:
+            sync_latest_from_history(conn)
+            recompute_stats(conn)
+            rebuild_trends(conn)
+        log.info("✔ Latest risk, stats counters and trend aggregates rebuilt")
+
+        # ── 9. Flush Redis cache so fresh data is served ──────────────────
         try:
             import redis
             r = redis.Redis(host=os.getenv('REDIS_HOST', 'redis'), port=6379, db=0)
-            keys = r.keys('risk:village:*') + r.keys('ai:village:*')
+            keys = r.keys('risk:village:*') + r.keys('ai:village:*') + r.keys('stats:*')
             if keys:
                 r.delete(*keys)
                 log.info("✔ Redis cache cleared (%d keys)", len(keys))
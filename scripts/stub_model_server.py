@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Deterministic local stand-in for the Bedrock runtime HTTP API.
+
+Serves POST /model/{id}/invoke and /model/{id}/invoke-with-response-stream
+with the fake model's canned Nova-format reply (keyed per village for batch
+prompts), so transports and load can be measured without AWS. Signatures
+are not checked.
+
+Each request draws its latency and injected faults from a generator seeded
+with ``--seed`` and the request's sequence number, so a run is repeatable:
+
+* latency: ``--latency-dist`` fixed | uniform | normal | lognormal |
+  exponential around ``--latency-ms`` (``--latency-spread`` is the relative
+  width for uniform/normal, and sigma for lognormal);
+* ``--throttle-rate``: 429 ThrottlingException;
+* ``--error-rate``: 500 InternalServerException;
+* ``--stream-error-rate``: a stream that fails part-way with a
+  modelStreamErrorException event.
+
+GET /stats returns request/fault counters; POST /control with a JSON body
+(e.g. ``{"error_rate": 1.0}``) changes settings while running.
+
+Usage:
+    python scripts/stub_model_server.py --port 8788 --latency-ms 800 --latency-dist lognormal
+    AI_MODEL_BACKEND=stub AI_STUB_URL=http://127.0.0.1:8788 uvicorn backend_service.main:app
+"""
+import argparse
+import base64
+import binascii
+import itertools
+import json
+import logging
+import math
+import random
+import struct
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend_service.services.fake_bedrock import reply_text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('stub_model_server')
+
+CHUNK_SIZE = 24
+LATENCY_DISTS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+
+class StubSettings:
+    def __init__(self, latency_ms: float = 800, latency_dist: str = 'fixed', latency_spread: float = 0.25,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, stream_error_rate: float = 0.0,
+                 seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_spread = latency_spread
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.stream_error_rate = stream_error_rate
+        self.seed = seed
+
+    def update(self, values: dict) -> None:
+        for key, value in values.items():
+            if not hasattr(self, key):
+                raise KeyError(key)
+            setattr(self, key, type(getattr(self, key))(value))
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds for one request."""
+        mean, spread = self.latency_ms, self.latency_spread
+        if self.latency_dist == 'uniform':
+            ms = rng.uniform(mean * (1 - spread), mean * (1 + spread))
+        elif self.latency_dist == 'normal':
+            ms = rng.gauss(mean, mean * spread)
+        elif self.latency_dist == 'lognormal':
+            ms = mean * math.exp(rng.gauss(0, spread))  # latency_ms is the median
+        elif self.latency_dist == 'exponential':
+            ms = rng.expovariate(1 / mean) if mean > 0 else 0
+        else:
+            ms = mean
+        return max(0.0, ms) / 1000.0
+
+
+# ── AWS event-stream encoding ───────────────────────────────────────
+def _header(name: str, value: str) -> bytes:
+    n, v = name.encode(), value.encode()
+    return struct.pack('!B', len(n)) + n + struct.pack('!BH', 7, len(v)) + v
+
+
+def _message(headers: bytes, body: bytes) -> bytes:
+    total = 12 + len(headers) + len(body) + 4
+    prelude = struct.pack('!II', total, len(headers))
+    prelude += struct.pack('!I', binascii.crc32(prelude) & 0xffffffff)
+    message = prelude + headers + body
+    return message + struct.pack('!I', binascii.crc32(message) & 0xffffffff)
+
+
+def encode_event(payload: dict, event_type: str = 'chunk', message_type: str = 'event') -> bytes:
+    headers = _header(':event-type', event_type) + _header(':message-type', message_type) \
+        + _header(':content-type', 'application/json')
+    return _message(headers, json.dumps(payload).encode())
+
+
+def exception_event(code: str, message: str) -> bytes:
+    headers = _header(':exception-type', code) + _header(':message-type', 'exception') \
+        + _header(':content-type', 'application/json')
+    return _message(headers, json.dumps({'message': message}).encode())
+
+
+def chunk_event(inner: dict) -> bytes:
+    return encode_event({'bytes': base64.b64encode(json.dumps(inner).encode()).decode()})
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoint
+
+    def log_message(self, fmt, *args):  # quiet
+        pass
+
+    def _count(self, key: str) -> None:
+        with self.server.lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def do_GET(self):
+        if self.path == '/stats':
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self._send_json(200, {**stats, 'settings': vars(self.server.settings)})
+        else:
+            self._send_json(404, {'message': 'Unknown operation'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length)
+        if self.path == '/control':
+            try:
+                self.server.settings.update(json.loads(request_body or b'{}'))
+            except (ValueError, KeyError, TypeError) as exc:
+                self._send_json(400, {'message': f'bad setting: {exc}'})
+                return
+            self._send_json(200, vars(self.server.settings))
+            return
+        if not (self.path.endswith('/invoke') or self.path.endswith('/invoke-with-response-stream')):
+            self._send_json(404, {'message': 'Unknown operation'})
+            return
+
+        settings = self.server.settings
+        rng = random.Random(f'{settings.seed}:{next(self.server.sequence)}')
+        latency = settings.sample_latency(rng)
+        self._count('requests')
+        if rng.random() < settings.throttle_rate:
+            self._count('throttled')
+            self._send_error(429, 'ThrottlingException', 'Too many requests, please wait before trying again.')
+        elif rng.random() < settings.error_rate:
+            time.sleep(latency)
+            self._count('errors')
+            self._send_error(500, 'InternalServerException', 'Injected failure')
+        elif self.path.endswith('/invoke'):
+            self._invoke(request_body, latency)
+        else:
+            self._stream(request_body, latency, fail=rng.random() < settings.stream_error_rate)
+
+    def _send_json(self, status: int, data: dict, headers: dict = None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, code: str, message: str):
+        self._send_json(status, {'message': message}, {'x-amzn-ErrorType': f'{code}:http://internal.amazon.com/'})
+
+    def _invoke(self, request_body: bytes, latency: float):
+        time.sleep(latency)
+        text = reply_text(request_body.decode('utf-8', 'replace'))
+        self._count('ok')
+        self._send_json(200, {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+            'stopReason': 'end_turn',
+            'usage': {'inputTokens': len(request_body) // 4, 'outputTokens': len(text) // 4},
+        })
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def _stream(self, request_body: bytes, latency: float, fail: bool = False):
+        text = reply_text(request_body.decode('utf-8', 'replace'))
+        pieces = [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+        if fail:
+            pieces = pieces[:len(pieces) // 2]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.amazon.eventstream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self._write_chunk(chunk_event({'messageStart': {'role': 'assistant'}}))
+        for piece in pieces:
+            time.sleep(latency / max(1, len(pieces)))
+            self._write_chunk(chunk_event({'contentBlockDelta': {'delta': {'text': piece}, 'contentBlockIndex': 0}}))
+        if fail:
+            self._count('stream_errors')
+            self._write_chunk(exception_event('modelStreamErrorException', 'Injected stream failure'))
+        else:
+            self._count('ok')
+            self._write_chunk(chunk_event({'messageStop': {'stopReason': 'end_turn'}}))
+            self._write_chunk(chunk_event({'metadata': {'usage': {
+                'inputTokens': len(request_body) // 4, 'outputTokens': len(text) // 4,
+            }}}))
+        self._write_chunk(b'')
+
+
+def make_server(port: int, latency_ms: float = 800, handler=StubHandler, **settings) -> ThreadingHTTPServer:
+    """``settings`` are :class:`StubSettings` fields (latency_dist, error_rate, ...)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.settings = StubSettings(latency_ms=latency_ms, **settings)
+    server.stats = {}
+    server.lock = threading.Lock()
+    server.sequence = itertools.count()
+    return server
+
+
+def serve_in_thread(port: int = 0, latency_ms: float = 800, handler=StubHandler, **settings) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; ``server.server_port`` has the
+    port and ``server.settings`` can be changed while it runs."""
+    server = make_server(port, latency_ms, handler, **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8788)
+    parser.add_argument('--latency-ms', type=float, default=800)
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTS, default='fixed')
+    parser.add_argument('--latency-spread', type=float, default=0.25)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--stream-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    server = make_server(
+        args.port, args.latency_ms, latency_dist=args.latency_dist, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        stream_error_rate=args.stream_error_rate, seed=args.seed,
+    )
+    log.info("✔ Stub Bedrock listening on http://127.0.0.1:%d (%s latency %.0f ms, errors %.0f%%, throttles %.0f%%)",
+             args.port, args.latency_dist, args.latency_ms, args.error_rate * 100, args.throttle_rate * 100)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
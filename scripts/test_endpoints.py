@@ -1,9 +1,10 @@
 """Comprehensive endpoint test suite for GramSight backend."""
 import httpx
 import json
+import os
 import sys
 
-BASE = 'http://localhost:8000'
+BASE = os.getenv('API_BASE', 'http://localhost:8000')
 VILLAGE_ID = None
 results = []
 
@@ -118,3 +119,4 @@ for name, status, expected, ok, body in results:
         print(f'       Response: {body[:200]}')
 print('=' * 80)
 print(f'TOTAL: {passed} passed, {failed} failed out of {len(results)}')
+sys.exit(1 if failed else 0)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Runs the API endpoint suite through PgBouncer in transaction mode.
+
+Start PgBouncer first, e.g. ``docker compose --profile pgbouncer up -d
+postgres redis pgbouncer``. Then:
+
+1. The script reads ``pool_mode`` from PgBouncer's admin console and stops
+   unless it is ``transaction``. The DB user must be in PgBouncer's
+   ``admin_users`` or ``stats_users``.
+2. It runs ``python -m backend_service.migrate`` against Postgres
+   directly, since migrations never go through PgBouncer.
+3. For each mode (``server``, and ``lambda`` with AWS_LAMBDA_FUNCTION_NAME
+   set, so the engines use NullPool), it starts uvicorn with
+   ``DB_PGBOUNCER=1``, with DB_HOST/DB_PORT pointing at PgBouncer and
+   ``SCHEMA_STARTUP=strict``. Against that server it runs:
+
+   * ``scripts/test_endpoints.py``, whose own DB lookups also go through
+     PgBouncer;
+   * a burst of --concurrency parallel requests on endpoints backed by
+     psycopg2 and asyncpg. Many client connections then take turns on the
+     same few server connections. Any session-level state, such as asyncpg
+     prepared statements, shows up here as 5xx responses
+     ("prepared statement ... already exists / does not exist").
+
+The suite needs the same setup as test_endpoints.py: the admin user, a
+seeded village, and the upstream API keys.
+
+Usage:
+    SECRET_KEY=x python scripts/test_pgbouncer.py
+    SECRET_KEY=x python scripts/test_pgbouncer.py --pgbouncer 127.0.0.1:6432 --direct 127.0.0.1:5432 --modes lambda
+"""
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_server import free_port, start_uvicorn, wait_ready
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('test_pgbouncer')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+MODES = {
+    'server': {},
+    'lambda': {'AWS_LAMBDA_FUNCTION_NAME': 'test-pgbouncer'},
+}
+
+
+def _split(hostport: str):
+    host, _, port = hostport.rpartition(':')
+    return host, port
+
+
+def check_pool_mode(host: str, port: str) -> str:
+    import psycopg2
+
+    conn = psycopg2.connect(host=host, port=port, dbname='pgbouncer', connect_timeout=5,
+                            user=os.getenv('DB_USER', 'gs_user'), password=os.getenv('DB_PASSWORD', 'gs_pass'))
+    conn.autocommit = True  # the admin console has no transactions
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SHOW CONFIG')
+            return next(row[1] for row in cur.fetchall() if row[0] == 'pool_mode')
+    finally:
+        conn.close()
+
+
+def app_env(pgbouncer: str, direct: str, mode: str) -> Dict[str, str]:
+    bouncer_host, bouncer_port = _split(pgbouncer)
+    direct_host, direct_port = _split(direct)
+    return {**os.environ, **MODES[mode], 'PYTHONPATH': ROOT,
+            'DB_HOST': bouncer_host, 'DB_PORT': bouncer_port, 'DB_PGBOUNCER': '1',
+            'DB_DIRECT_HOST': direct_host, 'DB_DIRECT_PORT': direct_port,
+            'SCHEMA_STARTUP': 'strict', 'LOOP_MONITOR_INTERVAL': '0'}
+
+
+async def burst(base_url: str, email: str, password: str, concurrency: int, total: int) -> Counter:
+    """``total`` requests, ``concurrency`` at a time; status code (or exception
+    name) → count."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        resp = await client.post('/auth/login', json={'email': email, 'password': password})
+        resp.raise_for_status()
+        client.headers['Authorization'] = f"Bearer {resp.json()['access_token']}"
+        villages = (await client.get('/farmer/villages')).json()
+        if not villages:
+            raise RuntimeError('no village found — seed the database first')
+        vid = villages[0]['id']
+        requests = [
+            ('GET', '/farmer/villages'),                 # psycopg2
+            ('GET', f'/farmer/{vid}/weather'),           # psycopg2
+            ('POST', f'/internal/calculate-risk/{vid}'),  # asyncpg
+        ]
+        outcomes: Counter = Counter()
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            method, path = requests[i % len(requests)]
+            async with sem:
+                try:
+                    outcomes[(await client.request(method, path)).status_code] += 1
+                except httpx.HTTPError as exc:
+                    outcomes[type(exc).__name__] += 1
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pgbouncer', default='127.0.0.1:6432', help='PgBouncer host:port')
+    parser.add_argument('--direct', default='127.0.0.1:5432', help='Postgres host:port, for migrations')
+    parser.add_argument('--modes', default=','.join(MODES), help=f'comma-separated, from {", ".join(MODES)}')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--skip-mode-check', action='store_true', help='no admin-console access to PgBouncer')
+    parser.add_argument('--email', default='admin@gramsight.in')
+    parser.add_argument('--password', default='Admin123!')
+    args = parser.parse_args()
+
+    if not args.skip_mode_check:
+        pool_mode = check_pool_mode(*_split(args.pgbouncer))
+        if pool_mode != 'transaction':
+            sys.exit(f'PgBouncer at {args.pgbouncer} runs pool_mode={pool_mode}, not transaction')
+        log.info('✔ PgBouncer at %s runs pool_mode=transaction', args.pgbouncer)
+
+    failures: List[str] = []
+    migrate = subprocess.run([sys.executable, '-m', 'backend_service.migrate'], cwd=ROOT,
+                             env=app_env(args.pgbouncer, args.direct, 'server'))
+    if migrate.returncode != 0:
+        sys.exit('migrations failed')
+    log.info('✔ migrations applied directly against %s', args.direct)
+
+    for mode in filter(None, args.modes.split(',')):
+        env = app_env(args.pgbouncer, args.direct, mode)
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        proc = start_uvicorn(port, env)
+        try:
+            wait_ready(proc, base_url)
+            suite = subprocess.run([sys.executable, os.path.join(ROOT, 'scripts', 'test_endpoints.py')],
+                                   cwd=ROOT, env={**env, 'API_BASE': base_url})
+            if suite.returncode != 0:
+                failures.append(f'{mode}: endpoint suite failed')
+            else:
+                log.info('✔ %s: endpoint suite passed through PgBouncer', mode)
+
+            outcomes = asyncio.run(burst(base_url, args.email, args.password, args.concurrency, args.requests))
+            bad = {k: v for k, v in outcomes.items() if not (isinstance(k, int) and k < 500)}
+            if bad:
+                failures.append(f'{mode}: burst of {args.requests} requests had failures {dict(bad)}')
+            else:
+                log.info('✔ %s: %d requests at concurrency %d, outcomes %s',
+                         mode, args.requests, args.concurrency, dict(outcomes))
+        except Exception as exc:
+            failures.append(f'{mode}: {exc}')
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    if failures:
+        for f in failures:
+            log.error('✘ %s', f)
+        sys.exit(1)
+    log.info('✔ API suite passes through PgBouncer in transaction mode')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+End-to-end test of the SSE endpoints against the fake model backend.
+
+Starts uvicorn with ``AI_MODEL_BACKEND=fake`` (no AWS calls) and checks:
+
+1. ``GET /farmer/{id}/advisory/stream`` on a cold cache: ``token`` events
+   arrive before the one final ``result`` event, none follow it, the tokens
+   join into the JSON the result was parsed from, and the result is stored
+   as an ``ai_reports`` row (report_type 'village') under the input hash.
+   The same request again is served from cache: one ``result``, no tokens.
+2. ``GET /farmland/{id}/ai-insight/stream`` for a farmland created by this
+   script (a unique name, so the input hash is new): same event order, and
+   the result is saved on ``farmlands.ai_insight`` and as an ``ai_reports``
+   row (report_type 'farmland'). The farmland is deleted afterwards.
+
+The cold-cache step clears the village's cached copies first: the
+``ai:village:{id}`` and ``ai:resp:{hash}`` Redis keys and the ``ai_reports``
+rows stored under the current input hash. Run it against a dev database.
+It needs Postgres, Redis, the admin user and a seeded village.
+
+Usage:
+    SECRET_KEY=x python scripts/test_sse_streams.py
+    SECRET_KEY=x python scripts/test_sse_streams.py --email farmer@example.com --password ...
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_server import free_port, start_uvicorn, wait_ready
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('test_sse_streams')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+Event = Tuple[str, Any]
+
+SERVER_ENV = {'AI_MODEL_BACKEND': 'fake', 'AI_FAKE_CHUNK_DELAY_MS': '5', 'LOOP_MONITOR_INTERVAL': '0'}
+
+
+def read_events(client: httpx.Client, path: str) -> List[Event]:
+    """``(event, data)`` pairs of one SSE response, in arrival order."""
+    events: List[Event] = []
+    event, data = None, []
+    with client.stream('GET', path, timeout=60) as resp:
+        resp.raise_for_status()
+        if not resp.headers.get('content-type', '').startswith('text/event-stream'):
+            raise AssertionError(f'{path}: content-type {resp.headers.get("content-type")!r}')
+        for line in resp.iter_lines():
+            if line.startswith('event:'):
+                event = line[len('event:'):].strip()
+            elif line.startswith('data:'):
+                data.append(line[len('data:'):].strip())
+            elif not line and event is not None:
+                events.append((event, json.loads('\n'.join(data))))
+                event, data = None, []
+    return events
+
+
+def check_streamed(path: str, events: List[Event]) -> Dict[str, Any]:
+    """Tokens first, then exactly one final result; returns the result."""
+    names = [e for e, _ in events]
+    if names.count('result') != 1 or names[-1] != 'result':
+        raise AssertionError(f'{path}: expected one final result event, got {names}')
+    tokens = [d['text'] for e, d in events if e == 'token']
+    if not tokens:
+        raise AssertionError(f'{path}: no token events before the result (served from cache?)')
+    if set(names[:-1]) != {'token'}:
+        raise AssertionError(f'{path}: unexpected events {sorted(set(names[:-1]) - {"token"})}')
+    result = events[-1][1]
+    if result.get('is_fallback'):
+        raise AssertionError(f'{path}: result is the fallback, not the model reply')
+    streamed = json.loads(''.join(tokens))
+    if streamed.get('summary') != result.get('summary'):
+        raise AssertionError(f'{path}: result does not match the streamed reply')
+    log.info('✔ %s: %d token events, then the result', path, len(tokens))
+    return result
+
+
+def forget_village(redis_url: str, village_id: str) -> str:
+    """Clear every cached copy of the village's current analysis; returns
+    its input hash."""
+    import redis
+    from backend_service.database import SessionLocal
+    from backend_service.models import AiReport
+    from backend_service.services.ai_analysis_service import village_input_hash
+
+    input_hash = asyncio.run(village_input_hash(UUID(village_id)))
+    redis.Redis.from_url(redis_url).delete(f'ai:village:{village_id}', f'ai:resp:{input_hash}')
+    with SessionLocal() as db:
+        db.query(AiReport).filter(AiReport.input_hash == input_hash).delete(synchronize_session=False)
+        db.commit()
+    return input_hash
+
+
+def check_report(report_type: str, input_hash: str, result: Dict[str, Any]) -> None:
+    from backend_service.database import SessionLocal
+    from backend_service.models import AiReport
+
+    with SessionLocal() as db:
+        rows = db.query(AiReport.content).filter(
+            AiReport.report_type == report_type, AiReport.input_hash == input_hash,
+        ).all()
+    if not any(content == result for content, in rows):
+        raise AssertionError(f'no {report_type} ai_reports row under {input_hash[:12]} holds the streamed result')
+    log.info('✔ %s result stored in ai_reports', report_type)
+
+
+def check_farmland(farmland_id: str, result: Dict[str, Any]) -> None:
+    from backend_service.database import SessionLocal
+    from backend_service.models import AiReport, Farmland
+
+    with SessionLocal() as db:
+        f = db.query(Farmland).filter(Farmland.id == UUID(farmland_id)).one()
+        insight = f.ai_insight
+        stored = db.query(AiReport.content).filter(
+            AiReport.report_type == 'farmland', AiReport.farmer_id == f.farmer_id,
+        ).all()
+    if insight != result:
+        raise AssertionError('farmlands.ai_insight does not hold the streamed result')
+    if not any(content == result for content, in stored):
+        raise AssertionError('no farmland ai_reports row holds the streamed result')
+    log.info('✔ farmland result saved on farmlands.ai_insight and in ai_reports')
+
+
+def run(base_url: str, args) -> None:
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        resp = client.post('/auth/login', json={'email': args.email, 'password': args.password})
+        resp.raise_for_status()
+        client.headers['Authorization'] = f"Bearer {resp.json()['access_token']}"
+        villages = client.get('/farmer/villages').json()
+        if not villages:
+            raise RuntimeError('no village found — seed the database first')
+        vid = villages[0]['id']
+
+        # 1. Village advisory
+        input_hash = forget_village(args.redis_url, vid)
+        path = f'/farmer/{vid}/advisory/stream'
+        result = check_streamed(path, read_events(client, path))
+        check_report('village', input_hash, result)
+        again = read_events(client, path)
+        if [e for e, _ in again] != ['result'] or again[0][1] != result:
+            raise AssertionError(f'{path}: repeat request was not a single cached result')
+        log.info('✔ %s: repeat request served from cache', path)
+
+        # 2. Farmland insight
+        resp = client.post('/farmland/', json={
+            'land_name': f'sse-test-{uuid4().hex[:8]}', 'total_acres': 2.5,
+            'crop_type': 'Wheat', 'soil_type': 'Loamy', 'village_id': vid,
+        })
+        resp.raise_for_status()
+        farmland_id = resp.json()['id']
+        try:
+            path = f'/farmland/{farmland_id}/ai-insight/stream'
+            result = check_streamed(path, read_events(client, path))
+            check_farmland(farmland_id, result)
+        finally:
+            client.delete(f'/farmland/{farmland_id}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--email', default='admin@gramsight.in')
+    parser.add_argument('--password', default='Admin123!')
+    parser.add_argument('--redis-url', default=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    proc = start_uvicorn(port, {**os.environ, **SERVER_ENV})
+    try:
+        wait_ready(proc, base_url)
+        run(base_url, args)
+    except Exception as exc:
+        log.error('✘ %s', exc)
+        sys.exit(1)
+    finally:
+        proc.terminate()
+        proc.wait()
+    log.info('✔ SSE endpoints stream tokens before the result and persist it')
+
+
+if __name__ == '__main__':
+    main()